@@ -1,10 +1,14 @@
 from django.contrib import admin
+from django.core.exceptions import ValidationError
+from django.forms.models import BaseInlineFormSet
 
 from airport.models import (
     Route,
     Airport,
     Crew,
     Flight,
+    FlightCrew,
+    FlightSchedule,
     Ticket,
     Airplane,
     AirplaneType,
@@ -17,6 +21,47 @@ class TicketInLine(admin.TabularInline):
     extra = 1
 
 
+class FlightCrewInlineFormSet(BaseInlineFormSet):
+    def clean(self):
+        """Reject crew with another flight during the flight's new times"""
+        super().clean()
+        flight = self.instance
+        if flight.departure_time is None or flight.arrival_time is None:
+            return
+        crew_ids = [
+            form.cleaned_data["crew"].pk
+            for form in self.forms
+            if form.cleaned_data.get("crew")
+            and not form.cleaned_data.get("DELETE")
+        ]
+        busy = (
+            FlightCrew.objects.filter(crew_id__in=crew_ids)
+            .exclude(flight_id=flight.pk)
+            .overlapping(flight.departure_time, flight.arrival_time)
+            .order_by("crew_id")
+            .values_list("crew_id", flat=True)
+            .distinct()
+        )
+        if busy:
+            raise ValidationError(
+                [
+                    f"Crew member {crew_id} has another flight at that time."
+                    for crew_id in busy
+                ]
+            )
+
+
+class FlightCrewInLine(admin.TabularInline):
+    model = FlightCrew
+    formset = FlightCrewInlineFormSet
+    extra = 1
+
+
+@admin.register(Flight)
+class FlightAdmin(admin.ModelAdmin):
+    inlines = [FlightCrewInLine]
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     inlines = [TicketInLine]
@@ -25,7 +70,7 @@ class OrderAdmin(admin.ModelAdmin):
 admin.site.register(Route)
 admin.site.register(Airport)
 admin.site.register(Crew)
-admin.site.register(Flight)
+admin.site.register(FlightSchedule)
 admin.site.register(Ticket)
 admin.site.register(Airplane)
 admin.site.register(AirplaneType)
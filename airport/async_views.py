@@ -0,0 +1,182 @@
+import math
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from airport.filters import distinct_if_needed, filter_flights
+from airport.models import Airport, Flight, Route
+from airport.serializers import (
+    AirportListSerializer,
+    FlightDetailSerializer,
+    FlightListSerializer,
+    RouteListSerializer,
+)
+
+
+class AsyncReadView(View):
+    """Read-only JSON endpoint served natively under ASGI
+
+    Rows are fetched with the async ORM and rendered with the same
+    serializers, pagination envelope and JSON renderer as the DRF
+    viewsets, so responses are byte-for-byte what the sync endpoints
+    return for ``?format=json``. Related rows are loaded up front with
+    select_related/prefetch_related because serializers must not hit
+    the database from the event loop.
+
+    Requests are checked against the same throttles as the viewsets,
+    run in a thread because authenticating the user may query it.
+    """
+
+    http_method_names = ["get", "head", "options"]
+    queryset = None
+    serializer_class = None
+    renderer = JSONRenderer()
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            await sync_to_async(self.check_throttles)(request)
+        except exceptions.APIException as exc:
+            response = self.render({"detail": exc.detail}, exc.status_code)
+            if getattr(exc, "wait", None) is not None:
+                response["Retry-After"] = str(math.ceil(exc.wait))
+            return response
+        return await super().dispatch(request, *args, **kwargs)
+
+    def get_throttles(self):
+        return [throttle() for throttle in self.throttle_classes]
+
+    def check_throttles(self, request):
+        request = Request(
+            request,
+            authenticators=[
+                authentication() for authentication
+                in self.authentication_classes
+            ],
+        )
+        durations = [
+            throttle.wait() for throttle in self.get_throttles()
+            if not throttle.allow_request(request, self)
+        ]
+        if durations:
+            durations = [
+                duration for duration in durations if duration is not None
+            ]
+            raise exceptions.Throttled(max(durations, default=None))
+
+    def get_queryset(self, request):
+        return self.queryset.all()
+
+    def get_serializer_context(self, request):
+        return {"request": request, "view": self}
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        return HttpResponse(
+            self.renderer.render(data),
+            content_type="application/json",
+            status=status_code,
+        )
+
+
+class AsyncListView(AsyncReadView):
+    pagination_class = LimitOffsetPagination
+
+    async def get(self, request, *args, **kwargs):
+        request = Request(request)
+        try:
+            queryset = self.get_queryset(request)
+        except ValueError:
+            return self.render(
+                {"detail": "Invalid filter value."},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        paginator = self.pagination_class()
+        paginator.request = request
+        paginator.limit = paginator.get_limit(request)
+        paginator.offset = paginator.get_offset(request)
+        if paginator.limit is not None:
+            paginator.count = await queryset.acount()
+            queryset = queryset[
+                paginator.offset:paginator.offset + paginator.limit
+            ]
+        rows = [
+            row async for row in queryset.aiterator(
+                chunk_size=paginator.limit or 2000
+            )
+        ]
+
+        data = self.serializer_class(
+            rows, many=True, context=self.get_serializer_context(request)
+        ).data
+        if paginator.limit is None:
+            return self.render(data)
+        return self.render(paginator.get_paginated_response(data).data)
+
+
+class AsyncDetailView(AsyncReadView):
+    async def get(self, request, pk, *args, **kwargs):
+        request = Request(request)
+        try:
+            instance = await self.get_queryset(request).aget(pk=pk)
+        except self.queryset.model.DoesNotExist:
+            return self.render(
+                {"detail": "No %s matches the given query."
+                    % self.queryset.model._meta.object_name},
+                status.HTTP_404_NOT_FOUND,
+            )
+
+        data = self.serializer_class(
+            instance, context=self.get_serializer_context(request)
+        ).data
+        return self.render(data)
+
+
+class AsyncFlightListView(AsyncListView):
+    throttle_scope = "search"
+    queryset = Flight.objects.select_related(
+        "route__source",
+        "route__destination",
+        "airplane__airplane_type",
+    ).prefetch_related("crew")
+    serializer_class = FlightListSerializer
+
+    def get_queryset(self, request):
+        return filter_flights(self.queryset.all(), request.query_params)
+
+
+class AsyncFlightDetailView(AsyncDetailView):
+    throttle_scope = "search"
+    queryset = Flight.objects.select_related(
+        "route__source",
+        "route__destination",
+        "airplane__airplane_type",
+    ).prefetch_related("crew")
+    serializer_class = FlightDetailSerializer
+
+
+class AsyncAirportListView(AsyncListView):
+    queryset = Airport.objects.all()
+    serializer_class = AirportListSerializer
+
+    def get_queryset(self, request):
+        city = request.query_params.get("city")
+
+        queryset = self.queryset.all()
+
+        if city:
+            queryset = queryset.filter(closest_big_city__icontains=city)
+
+        return distinct_if_needed(queryset)
+
+
+class AsyncRouteListView(AsyncListView):
+    queryset = Route.objects.select_related("source", "destination")
+    serializer_class = RouteListSerializer
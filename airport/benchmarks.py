@@ -0,0 +1,565 @@
+import io
+import json
+import shutil
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone as django_timezone
+from PIL import Image
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from airport.holds import hold_seats
+from airport.itineraries import flight_index
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    FlightCrew,
+    FlightSchedule,
+    Order,
+    Route,
+    Ticket,
+)
+from airport.reference_cache import reference_cache
+from airport.versions import bump_table_versions
+
+BENCHMARK_EMAIL = "benchmark-0@example.com"
+
+SEED_START = datetime(2030, 1, 1, tzinfo=timezone.utc)
+ROUTES_PER_AIRPORT = 5
+AIRPLANE_TYPES = 5
+AIRPLANES = 50
+CREW = 500
+CREW_PER_FLIGHT = 2
+SCHEDULES = 10
+TICKETS_PER_ORDER = 4
+ORDERS_PER_USER = 50
+# Full pages on every list, so query counts match at any seed size
+PAGE_LIMIT = 20
+
+METRICS = ("queries", "p50_ms", "p95_ms", "bytes")
+
+
+def seed_benchmark_data(airports=2000, flights=100_000, tickets=2_000_000,
+                        batch_size=5000, log=None):
+    """Fill an empty database with a deterministic benchmark dataset
+
+    The shape stays the same at every size: five routes per airport,
+    flights spread evenly over a year, two crew members per flight and
+    orders of four tickets, fifty orders per user. The user
+    BENCHMARK_EMAIL owns the first orders. Rows are written with
+    bulk_create, so caches are invalidated by hand at the end.
+    """
+    if Flight.objects.exists():
+        raise ValueError("The database already has flights")
+    if tickets > flights * 30 * 6:
+        raise ValueError("Not enough seats for that many tickets")
+    log = log or (lambda message: None)
+
+    def create(model, objects):
+        created = model.objects.bulk_create(objects, batch_size=batch_size)
+        log(f"{model._meta.verbose_name_plural}: {len(created)}")
+        return [instance.pk for instance in created]
+
+    with transaction.atomic():
+        type_ids = create(
+            AirplaneType,
+            [AirplaneType(name=f"Type {index}")
+             for index in range(AIRPLANE_TYPES)],
+        )
+        airplane_ids = create(
+            Airplane,
+            [
+                Airplane(
+                    name=f"Airplane {index}",
+                    rows=30,
+                    seats_in_row=6,
+                    airplane_type_id=type_ids[index % len(type_ids)],
+                )
+                for index in range(AIRPLANES)
+            ],
+        )
+        airport_ids = create(
+            Airport,
+            [
+                Airport(name=f"Airport {index}",
+                        closest_big_city=f"City {index}")
+                for index in range(airports)
+            ],
+        )
+        route_ids = create(
+            Route,
+            [
+                Route(
+                    source_id=source_id,
+                    destination_id=airport_ids[
+                        (index + step) % len(airport_ids)
+                    ],
+                    distance=100 * step + index % 1000,
+                )
+                for index, source_id in enumerate(airport_ids)
+                for step in range(1, ROUTES_PER_AIRPORT + 1)
+            ],
+        )
+        crew_ids = create(
+            Crew,
+            [
+                Crew(first_name=f"First {index}", last_name=f"Last {index}")
+                for index in range(CREW)
+            ],
+        )
+        create(
+            FlightSchedule,
+            [
+                FlightSchedule(
+                    route_id=route_ids[index],
+                    airplane_id=airplane_ids[index % len(airplane_ids)],
+                    weekdays="135",
+                    departure_time=(SEED_START + timedelta(hours=index))
+                    .time(),
+                    block_time=timedelta(hours=2),
+                    valid_from=SEED_START.date(),
+                    valid_until=SEED_START.date() + timedelta(days=365),
+                )
+                for index in range(min(SCHEDULES, len(route_ids)))
+            ],
+        )
+
+        spacing = timedelta(days=365) / flights
+        flight_rows = [
+            Flight(
+                route_id=route_ids[index % len(route_ids)],
+                airplane_id=airplane_ids[index % len(airplane_ids)],
+                departure_time=SEED_START + spacing * index,
+                arrival_time=SEED_START + spacing * index
+                + timedelta(hours=2),
+                seats_sold=tickets // flights
+                + (1 if index < tickets % flights else 0),
+            )
+            for index in range(flights)
+        ]
+        flight_ids = create(Flight, flight_rows)
+        create(
+            FlightCrew,
+            [
+                FlightCrew(
+                    flight_id=flight.pk,
+                    crew_id=crew_ids[
+                        (index * CREW_PER_FLIGHT + offset) % len(crew_ids)
+                    ],
+                    departure_time=flight.departure_time,
+                    arrival_time=flight.arrival_time,
+                )
+                for index, flight in enumerate(flight_rows)
+                for offset in range(CREW_PER_FLIGHT)
+            ],
+        )
+        del flight_rows
+
+        orders = -(-tickets // TICKETS_PER_ORDER)
+        password = make_password(None)
+        user_ids = create(
+            get_user_model(),
+            [
+                get_user_model()(
+                    email=f"benchmark-{index}@example.com",
+                    password=password,
+                )
+                for index in range(-(-orders // ORDERS_PER_USER) or 1)
+            ],
+        )
+
+        ticket_count = 0
+        for start in range(0, orders, batch_size):
+            order_ids = [
+                order.pk
+                for order in Order.objects.bulk_create(
+                    Order(user_id=user_ids[index // ORDERS_PER_USER])
+                    for index in range(start, min(start + batch_size, orders))
+                )
+            ]
+            ticket_rows = []
+            for order_id in order_ids:
+                for _ in range(TICKETS_PER_ORDER):
+                    if ticket_count == tickets:
+                        break
+                    slot = ticket_count // flights
+                    ticket_rows.append(
+                        Ticket(
+                            order_id=order_id,
+                            flight_id=flight_ids[ticket_count % flights],
+                            row=slot // 6 + 1,
+                            seat=slot % 6 + 1,
+                        )
+                    )
+                    ticket_count += 1
+            Ticket.objects.bulk_create(ticket_rows, batch_size=batch_size)
+            log(f"tickets: {ticket_count}")
+
+    reference_cache.invalidate(AirplaneType)
+    reference_cache.invalidate(Airport)
+    flight_index.invalidate_routes()
+    bump_table_versions(
+        AirplaneType, Airplane, Airport, Route, Crew, Flight, Ticket
+    )
+
+
+def url(name, pk=None, **params):
+    path = reverse(f"airport:{name}", args=[] if pk is None else [pk])
+    if params:
+        path += "?" + "&".join(
+            f"{key}={value}" for key, value in params.items()
+        )
+    return path
+
+
+def benchmark_requests(user):
+    """Return {case name: path} of the GET endpoints to benchmark
+
+    Detail endpoints use the first seeded rows and the user's first
+    order; lists ask for full pages.
+    """
+    flight = Flight.objects.select_related("route").order_by("id").first()
+    order = Order.objects.filter(user=user).order_by("id").first()
+    if flight is None or order is None:
+        raise ValueError("Seed the database first")
+
+    limit = {"limit": PAGE_LIMIT}
+    day = flight.departure_time.date().isoformat()
+    return {
+        "airplane_types-list": url("airplane_types-list", **limit),
+        "airplanes-list": url("airplanes-list", **limit),
+        "airplanes-detail": url("airplanes-detail", flight.airplane_id),
+        "airports-list": url("airports-list", **limit),
+        "airports-detail": url("airports-detail", flight.route.source_id),
+        "routes-list": url("routes-list", **limit),
+        "routes-detail": url("routes-detail", flight.route_id),
+        "crews-list": url("crews-list", **limit),
+        "crews-detail": url(
+            "crews-detail", flight.crew.order_by("id").first().pk
+        ),
+        "flights-list": url("flights-list", **limit),
+        "flights-list-filtered": url(
+            "flights-list",
+            date=day,
+            **{"departure-airport": flight.route.source_id},
+            **limit,
+        ),
+        "flights-list-cursor": url(
+            "flights-list", pagination="cursor", **limit
+        ),
+        "flights-detail": url("flights-detail", flight.pk),
+        "flights-seats": url("flights-seats", flight.pk),
+        "flights-itineraries": url(
+            "flights-itineraries",
+            date=day,
+            **{
+                "departure-airport": flight.route.source_id,
+                "arrival-airport": flight.route.destination_id,
+            },
+        ),
+        "flight_schedules-list": url("flight_schedules-list", **limit),
+        "orders-list": url("orders-list", **limit),
+        "orders-list-cursor": url(
+            "orders-list", pagination="cursor", **limit
+        ),
+        "orders-detail": url("orders-detail", order.pk),
+        "seat_holds-list": url("seat_holds-list", **limit),
+        "user-manage": reverse("user:manage"),
+        "async-flights-list": url("async-flights-list", **limit),
+        "async-flights-detail": url("async-flights-detail", flight.pk),
+        "async-airports-list": url("async-airports-list", **limit),
+        "async-routes-list": url("async-routes-list", **limit),
+    }
+
+
+def benchmark_actions(user, admin):
+    """Return {case name: prepare} of the write and admin endpoints
+
+    Each request runs in a transaction that is rolled back afterwards.
+    prepare() runs first in that transaction, creates the rows the
+    request needs, such as the seat hold to confirm, and returns the
+    request. Bookings take the last seat of the first seeded flight,
+    which the seeded tickets never reach. Exports are limited to that
+    flight's day; the whole-table ticket and order exports are left
+    out.
+    """
+    flight = Flight.objects.select_related("airplane").order_by("id").first()
+    airport = Airport.objects.order_by("id").first()
+    schedule = FlightSchedule.objects.order_by("id").first()
+    if flight is None or airport is None or schedule is None:
+        raise ValueError("Seed the database first")
+
+    factory = APIRequestFactory()
+    row, seat = flight.airplane.rows, flight.airplane.seats_in_row
+    ticket = {"row": row, "seat": seat, "flight": flight.pk}
+    day = flight.departure_time.date().isoformat()
+    image = io.BytesIO()
+    Image.new("RGB", (640, 480)).save(image, "JPEG")
+
+    def request(method, path, as_user=user, **kwargs):
+        built = getattr(factory, method)(path, **kwargs)
+        force_authenticate(built, as_user)
+        return built
+
+    def hold():
+        return hold_seats(user, flight, [(row, seat)])
+
+    def generate():
+        # Seeded schedules start in SEED_START's year, past the horizon
+        today = django_timezone.localdate()
+        FlightSchedule.objects.filter(pk=schedule.pk).update(
+            valid_from=today,
+            valid_until=today + timedelta(days=365),
+            generated_until=None,
+        )
+        return request(
+            "post", url("flight_schedules-generate", schedule.pk),
+            as_user=admin,
+        )
+
+    return {
+        "orders-create": lambda: request(
+            "post", url("orders-list"), data={"tickets": [ticket]},
+            format="json",
+        ),
+        "orders-create-idempotent": lambda: request(
+            "post", url("orders-list"), data={"tickets": [ticket]},
+            format="json", HTTP_IDEMPOTENCY_KEY=uuid.uuid4().hex,
+        ),
+        "seat_holds-create": lambda: request(
+            "post", url("seat_holds-list"),
+            data={
+                "flight": flight.pk, "seats": [{"row": row, "seat": seat}]
+            },
+            format="json",
+        ),
+        "seat_holds-confirm": lambda: request(
+            "post", url("seat_holds-confirm", hold().pk)
+        ),
+        "seat_holds-release": lambda: request(
+            "delete", url("seat_holds-detail", hold().pk)
+        ),
+        "airports-upload-image": lambda: request(
+            "post", url("airports-upload-image", airport.pk), as_user=admin,
+            data={
+                "image": SimpleUploadedFile(
+                    "benchmark.jpg", image.getvalue(), "image/jpeg"
+                )
+            },
+            format="multipart",
+        ),
+        "flight_schedules-generate": generate,
+        "exports-flights-csv": lambda: request(
+            "get",
+            reverse(
+                "airport:exports", args=["flights", "csv"]
+            ) + f"?date-from={day}&date-to={day}",
+            as_user=admin,
+        ),
+        "exports-flights-ndjson": lambda: request(
+            "get",
+            reverse(
+                "airport:exports", args=["flights", "ndjson"]
+            ) + f"?date-from={day}&date-to={day}",
+            as_user=admin,
+        ),
+    }
+
+
+def benchmark_view(path):
+    """Resolve path to its view, rebuilt without throttling
+
+    Async views are wrapped to be called like the sync ones.
+    """
+    match = resolve(path.partition("?")[0])
+    if hasattr(match.func, "cls"):
+        view_class, initkwargs = match.func.cls, match.func.initkwargs
+    else:
+        view_class = match.func.view_class
+        initkwargs = match.func.view_initkwargs
+    initkwargs = {**initkwargs, "throttle_classes": ()}
+    actions = getattr(match.func, "actions", None)
+    if actions:
+        view = view_class.as_view(actions, **initkwargs)
+    else:
+        view = view_class.as_view(**initkwargs)
+    if view_class.view_is_async:
+        view = async_to_sync(view)
+    return view, match.args, match.kwargs
+
+
+def response_content(response):
+    """Render response, reading streamed ones to the end"""
+    if hasattr(response, "render"):
+        response.render()
+    if response.streaming:
+        return b"".join(response.streaming_content)
+    return response.content
+
+
+def measure(prepare, iterations, warmup, rollback=False):
+    """Send the request prepare() returns repeatedly, return METRICS
+
+    Warm-up requests fill the in-process caches first, so the query
+    count is the steady-state one. With rollback, prepare() and the
+    request run in a transaction that is rolled back afterwards, so
+    write requests find the same rows every time and keep none.
+    """
+
+    def send():
+        request = prepare()
+        view, args, kwargs = benchmark_view(request.path)
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = view(request, *args, **kwargs)
+            content = response_content(response)
+            elapsed = time.perf_counter() - started
+        # As the request handler would, so uploads are cleaned up
+        request.close()
+        if not 200 <= response.status_code < 300:
+            raise ValueError(
+                f"{request.method} {request.get_full_path()} returned "
+                f"{response.status_code}"
+            )
+        return elapsed, len(context.captured_queries), content
+
+    def run():
+        if not rollback:
+            return send()
+        with transaction.atomic():
+            result = send()
+            transaction.set_rollback(True)
+        return result
+
+    for _ in range(warmup):
+        run()
+    timings, queries = [], []
+    for _ in range(iterations):
+        elapsed, count, content = run()
+        timings.append(elapsed)
+        queries.append(count)
+    if len(timings) > 1:
+        quantiles = statistics.quantiles(timings, n=100)
+        p50, p95 = quantiles[49], quantiles[94]
+    else:
+        p50 = p95 = timings[0]
+    return {
+        "queries": max(queries),
+        "p50_ms": round(p50 * 1000, 2),
+        "p95_ms": round(p95 * 1000, 2),
+        "bytes": len(content),
+    }
+
+
+def run_benchmarks(names=None, iterations=20, warmup=2):
+    """Measure every benchmark request
+
+    Reads run as the benchmark user, admin endpoints as an unsaved
+    staff user. Views run without throttling and with the flight
+    search response cache off, so the numbers reflect the database and
+    serializer work. Uploads go to a temporary MEDIA_ROOT; their
+    renditions are only rendered on commit, so they are not measured.
+    """
+    user = get_user_model().objects.get(email=BENCHMARK_EMAIL)
+    admin = get_user_model()(email="admin@example.com", is_staff=True)
+    factory = APIRequestFactory()
+
+    def get(path):
+        request = factory.get(path)
+        force_authenticate(request, user)
+        return request
+
+    cases = {
+        name: (lambda path=path: get(path), False)
+        for name, path in benchmark_requests(user).items()
+    }
+    cases.update(
+        (name, (prepare, True))
+        for name, prepare in benchmark_actions(user, admin).items()
+    )
+
+    results = {}
+    media_root = tempfile.mkdtemp()
+    try:
+        # Request factories send "testserver" as the Host header
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            FLIGHT_SEARCH_CACHE_TIMEOUT=0,
+            MEDIA_ROOT=media_root,
+            IMAGE_RENDITION_WORKERS=0,
+        ):
+            for name, (prepare, rollback) in cases.items():
+                if names is None or name in names:
+                    results[name] = measure(
+                        prepare, iterations, warmup, rollback
+                    )
+    finally:
+        shutil.rmtree(media_root, ignore_errors=True)
+    return results
+
+
+def baseline_path(path=None):
+    """Return the baseline file of the default database's vendor"""
+    return (path or settings.BENCHMARK_BASELINE).format(
+        vendor=connection.vendor
+    )
+
+
+def load_baseline(path=None):
+    with open(baseline_path(path)) as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_baseline(results, path=None):
+    with open(baseline_path(path), "w") as baseline_file:
+        json.dump(results, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write("\n")
+
+
+def find_regressions(results, baseline, latency_tolerance=None,
+                     bytes_tolerance=None, latency_slack_ms=0):
+    """Return messages for metrics that got worse than the baseline
+
+    Query counts must not grow at all. Latency and size may grow by
+    the given fraction, latency also by latency_slack_ms so timer noise
+    on millisecond-fast endpoints is not reported; pass None to skip
+    comparing them.
+    """
+    tolerances = {
+        "queries": 0,
+        "p50_ms": latency_tolerance,
+        "p95_ms": latency_tolerance,
+        "bytes": bytes_tolerance,
+    }
+    slack = {"p50_ms": latency_slack_ms, "p95_ms": latency_slack_ms}
+    regressions = []
+    for name, metrics in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            regressions.append(f"{name}: no baseline")
+            continue
+        for metric in METRICS:
+            tolerance = tolerances[metric]
+            if tolerance is None:
+                continue
+            limit = expected[metric] * (1 + tolerance) + slack.get(metric, 0)
+            if metrics[metric] > limit:
+                regressions.append(
+                    f"{name}: {metric} {metrics[metric]} > "
+                    f"baseline {expected[metric]}"
+                )
+    return regressions
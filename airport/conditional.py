@@ -0,0 +1,66 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from airport.versions import get_table_versions
+
+
+class ConditionalResponseMixin:
+    """ETag / Last-Modified support driven by table change versions
+
+    The validators are derived from the change versions of
+    `conditional_models` (see airport.versions) plus the action, lookup
+    and normalized query parameters, so a matching If-None-Match or
+    If-Modified-Since is answered with 304 before the queryset is
+    evaluated or anything is serialized.
+    """
+
+    conditional_models = ()
+    conditional_actions = ("list", "retrieve")
+
+    def get_conditional_key(self, request):
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        return "|".join(
+            (
+                self.action,
+                str(lookup or ""),
+                query,
+                request.get_host(),
+                request.accepted_renderer.media_type,
+            )
+        )
+
+    def get_conditional_validators(self, request):
+        versions = get_table_versions(self.conditional_models)
+        digest = hashlib.sha1(self.get_conditional_key(request).encode())
+        for token, _ in versions:
+            digest.update(token.encode())
+        last_modified = int(max(modified for _, modified in versions))
+        return quote_etag(digest.hexdigest()), last_modified
+
+    def conditional(self, handler, request, *args, **kwargs):
+        if (
+            self.action not in self.conditional_actions
+            or request.method not in ("GET", "HEAD")
+        ):
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = self.get_conditional_validators(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response.headers["ETag"] = etag
+            response.headers["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,102 @@
+import csv
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, F
+
+from airport.models import Flight, Order, Ticket
+
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+EXPORT_COLUMNS = {
+    "flights": (
+        "id",
+        "route_id",
+        "departure_airport",
+        "arrival_airport",
+        "airplane_id",
+        "airplane_name",
+        "departure_time",
+        "arrival_time",
+        "seats_sold",
+    ),
+    "tickets": ("id", "order_id", "user_id", "flight_id", "row", "seat"),
+    "orders": ("id", "user_id", "user_email", "created_at", "ticket_count"),
+}
+
+
+def export_queryset(dataset):
+    """Return the unprojected queryset of an export, ready for filtering"""
+    if dataset == "flights":
+        return Flight.objects.annotate(
+            departure_airport=F("route__source__closest_big_city"),
+            arrival_airport=F("route__destination__closest_big_city"),
+            airplane_name=F("airplane__name"),
+        )
+    if dataset == "tickets":
+        return Ticket.objects.annotate(user_id=F("order__user_id"))
+    if dataset == "orders":
+        return Order.objects.annotate(
+            user_email=F("user__email"),
+            ticket_count=Count("tickets"),
+        )
+    raise ValueError(f"Unknown export {dataset!r}")
+
+
+def export_rows(dataset, queryset=None, chunk_size=None):
+    """Yield the export's rows as tuples in EXPORT_COLUMNS order
+
+    Rows are read through a server-side cursor in id order, so memory use
+    does not depend on the size of the table.
+    """
+    if queryset is None:
+        queryset = export_queryset(dataset)
+    return (
+        queryset.order_by("id")
+        .values_list(*EXPORT_COLUMNS[dataset])
+        .iterator(chunk_size=chunk_size or settings.EXPORT_CHUNK_SIZE)
+    )
+
+
+class _Echo:
+    """File-like object handing back what csv.writer writes to it"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, (date, datetime)):
+        return DjangoJSONEncoder().default(value)
+    return value
+
+
+def render_export(dataset, file_format, rows, batch_size=None):
+    """Yield the rows as CSV or NDJSON text in blocks of batch_size rows"""
+    columns = EXPORT_COLUMNS[dataset]
+    batch_size = batch_size or settings.EXPORT_CHUNK_SIZE
+
+    if file_format == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns)
+
+        def render(row):
+            return writer.writerow([_csv_value(value) for value in row])
+    else:
+        encoder = DjangoJSONEncoder(separators=(",", ":"))
+
+        def render(row):
+            return encoder.encode(dict(zip(columns, row))) + "\n"
+
+    lines = []
+    for row in rows:
+        lines.append(render(row))
+        if len(lines) >= batch_size:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
@@ -0,0 +1,79 @@
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+
+def day_bounds(date_string):
+    """Return the [start, next day start) range of a YYYY-MM-DD date
+
+    Both ends are aware datetimes in the current time zone, so the range
+    compares directly against an indexed DateTimeField instead of casting
+    the column to a date.
+    """
+    day = datetime.strptime(date_string, "%Y-%m-%d").date()
+    return (
+        timezone.make_aware(datetime.combine(day, time.min)),
+        timezone.make_aware(
+            datetime.combine(day + timedelta(days=1), time.min)
+        ),
+    )
+
+
+def params_to_ints(value):
+    """Converts a comma separated string of IDs to a list of integers"""
+    return [int(str_id) for str_id in value.split(",")]
+
+
+def filter_flights(queryset, query_params):
+    """Apply the flight list filters of query_params to queryset"""
+    departure_airport = query_params.get("departure-airport")
+    arrival_airport = query_params.get("arrival-airport")
+    date = query_params.get("date")
+    date_from = query_params.get("date-from")
+    date_to = query_params.get("date-to")
+
+    if departure_airport:
+        queryset = queryset.filter(
+            route__source__id__in=params_to_ints(departure_airport)
+        )
+
+    if arrival_airport:
+        queryset = queryset.filter(
+            route__destination__id__in=params_to_ints(arrival_airport)
+        )
+
+    if date:
+        date_from = date_to = date
+
+    if date_from:
+        day_start, _ = day_bounds(date_from)
+        queryset = queryset.filter(departure_time__gte=day_start)
+
+    if date_to:
+        _, next_day_start = day_bounds(date_to)
+        queryset = queryset.filter(departure_time__lt=next_day_start)
+
+    return distinct_if_needed(queryset)
+
+
+def joins_to_many(queryset):
+    """Return True if the queryset joins a reverse FK or many-to-many"""
+    for join in queryset.query.alias_map.values():
+        join_field = getattr(join, "join_field", None)
+        if join_field is not None and (
+            join_field.one_to_many or join_field.many_to_many
+        ):
+            return True
+    return False
+
+
+def distinct_if_needed(queryset):
+    """Add DISTINCT only when a filter could have duplicated rows
+
+    Filtering through forward foreign keys or the model's own columns
+    never multiplies rows, and an unconditional DISTINCT makes the
+    database sort or hash the whole annotated result.
+    """
+    if joins_to_many(queryset):
+        return queryset.distinct()
+    return queryset
@@ -0,0 +1,131 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from airport.models import SeatHold, Ticket
+
+
+class SeatsContended(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Seats are being booked by another customer, retry."
+    default_code = "seats_contended"
+
+
+SEAT_HELD_MESSAGE = "Seat is held by another customer."
+
+
+def seat_lock_key(flight_id, seat_index):
+    """64-bit advisory lock key of one seat on one flight"""
+    return ((flight_id << 20) | seat_index) & 0x7FFFFFFFFFFFFFFF
+
+
+def try_lock_seats(keys):
+    """Take transaction-scoped advisory locks on seats without waiting
+
+    Returns False as soon as another transaction holds any of them, so a
+    contended booking gives up before writing anything. Other backends
+    serialize writers on their own and always get the locks.
+    """
+    if connection.vendor != "postgresql" or not keys:
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT bool_and(pg_try_advisory_xact_lock(key)) "
+            "FROM unnest(%s::bigint[]) AS key",
+            [sorted(set(keys))],
+        )
+        return cursor.fetchone()[0]
+
+
+def held_by_others(flights, user):
+    """Return {flight_id: mask} of seats other users hold on the flights
+
+    Masks are the flights' hold bitmaps OR-ed together as integers.
+    """
+    masks = {}
+    for flight_id, seats in (
+        SeatHold.objects.filter(
+            flight_id__in=flights,
+            expires_at__gt=timezone.now(),
+        )
+        .exclude(user=user)
+        .values_list("flight_id", "seats")
+    ):
+        masks[flight_id] = masks.get(flight_id, 0) | int.from_bytes(
+            seats, "big"
+        )
+    return masks
+
+
+def seat_mask(airplane, row, seat):
+    index = airplane.seat_index(row, seat)
+    size = (airplane.capacity + 7) // 8 * 8
+    return 1 << (size - 1 - index)
+
+
+def hold_seats(user, flight, seats, minutes=None):
+    """Hold seats on a flight for a user, or fail without writing"""
+    if minutes is None:
+        minutes = settings.SEAT_HOLD_MINUTES
+    airplane = flight.airplane
+    keys = [
+        seat_lock_key(flight.id, airplane.seat_index(row, seat))
+        for row, seat in seats
+    ]
+
+    contended, taken, hold = False, [], None
+    with transaction.atomic():
+        if not try_lock_seats(keys):
+            contended = True
+        else:
+            sold = set(
+                Ticket.objects.filter(
+                    flight=flight,
+                    row__in={row for row, _ in seats},
+                    seat__in={seat for _, seat in seats},
+                ).values_list("row", "seat")
+            )
+            held = held_by_others([flight.id], user).get(flight.id, 0)
+            taken = [
+                (row, seat)
+                for row, seat in seats
+                if (row, seat) in sold
+                or held & seat_mask(airplane, row, seat)
+            ]
+            if not taken:
+                hold = SeatHold.objects.create(
+                    flight=flight,
+                    user=user,
+                    seats=airplane.pack_seats(seats),
+                    expires_at=timezone.now() + timedelta(minutes=minutes),
+                )
+
+    if contended:
+        raise SeatsContended()
+    if taken:
+        raise ValidationError(
+            {
+                "seats": [
+                    f"Row {row} seat {seat} is not available."
+                    for row, seat in taken
+                ]
+            }
+        )
+    return hold
+
+
+def sweep_expired_holds(batch_size=1000):
+    """Delete one batch of expired holds, skipping rows being confirmed"""
+    with transaction.atomic():
+        ids = list(
+            SeatHold.objects.select_for_update(skip_locked=True)
+            .filter(expires_at__lte=timezone.now())
+            .order_by()
+            .values_list("id", flat=True)[:batch_size]
+        )
+        SeatHold.objects.filter(id__in=ids).delete()
+    return len(ids)
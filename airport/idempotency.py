@@ -0,0 +1,113 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from airport.models import IdempotencyKey
+
+
+class IdempotencyKeyInProgress(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = (
+        "A request with this Idempotency-Key is still being processed."
+    )
+    default_code = "idempotency_key_in_progress"
+
+
+class IdempotencyKeyMismatch(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = "This Idempotency-Key was used with a different request."
+    default_code = "idempotency_key_mismatch"
+
+
+class IdempotentCreateMixin:
+    """Replays the stored response of a create retried with the same key
+
+    The first request with an ``Idempotency-Key`` header reserves the key
+    for the user together with a hash of the request body; a successful
+    response is then stored under it. A retry is answered from that row
+    with a single lookup, without validating, locking or writing anything.
+    Failed attempts release the key so the client may try again.
+
+    The reservation only holds for ``IDEMPOTENCY_KEY_LEASE`` seconds, so
+    a key left behind by a worker that died mid-request is taken over by
+    the next retry; the stored response is kept for
+    ``IDEMPOTENCY_KEY_TTL``.
+    """
+
+    idempotency_header = "Idempotency-Key"
+
+    @staticmethod
+    def get_request_hash(request):
+        body = json.dumps(request.data, sort_keys=True, default=str)
+        return hashlib.sha256(body.encode()).hexdigest()
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(self.idempotency_header)
+        if not key:
+            return super().create(request, *args, **kwargs)
+        if len(key) > IdempotencyKey._meta.get_field("key").max_length:
+            raise ValidationError(
+                {
+                    self.idempotency_header:
+                        "Ensure this value has at most 255 characters."
+                }
+            )
+
+        request_hash = self.get_request_hash(request)
+        now = timezone.now()
+        lease = now + timedelta(seconds=settings.IDEMPOTENCY_KEY_LEASE)
+        record, created = IdempotencyKey.objects.get_or_create(
+            user=request.user,
+            key=key,
+            defaults={"request_hash": request_hash, "expires_at": lease},
+        )
+        if not created and record.expires_at <= now:
+            # Only one of several retries racing for the key takes it
+            created = IdempotencyKey.objects.filter(
+                pk=record.pk, expires_at=record.expires_at
+            ).update(
+                request_hash=request_hash,
+                response_status=None,
+                response_body=None,
+                expires_at=lease,
+            )
+            if not created:
+                raise IdempotencyKeyInProgress()
+
+        if not created:
+            if record.request_hash != request_hash:
+                raise IdempotencyKeyMismatch()
+            if record.response_status is None:
+                raise IdempotencyKeyInProgress()
+            return Response(
+                record.response_body,
+                status=record.response_status,
+                headers={"Idempotent-Replayed": "true"},
+            )
+
+        try:
+            response = super().create(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if status.is_success(response.status_code):
+            record.response_status = response.status_code
+            record.response_body = response.data
+            record.expires_at = timezone.now() + timedelta(
+                seconds=settings.IDEMPOTENCY_KEY_TTL
+            )
+            record.save(
+                update_fields=(
+                    "response_status", "response_body", "expires_at"
+                )
+            )
+        else:
+            record.delete()
+        return response
@@ -0,0 +1,535 @@
+import csv
+import json
+import time
+from itertools import islice
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connection
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from django.utils.dateparse import (
+    parse_date,
+    parse_datetime,
+    parse_duration,
+    parse_time,
+)
+
+from airport.itineraries import flight_index
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Flight,
+    FlightCrew,
+    FlightSchedule,
+    Route,
+)
+from airport.reference_cache import reference_cache
+from airport.rostering import conflicting_assignments
+from airport.versions import bump_table_versions
+
+
+class ScheduleImportError(ValueError):
+    """A row of an import file that cannot be loaded"""
+
+
+class ImportResult:
+    def __init__(self, kind):
+        self.kind = kind
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+        self.seconds = 0.0
+
+    @property
+    def rows(self):
+        return self.created + self.updated + self.skipped
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.kind}: {self.created} created, {self.updated} updated, "
+            f"{self.skipped} skipped in {self.seconds:.2f}s "
+            f"({self.rows_per_second:.0f} rows/s)"
+        )
+
+
+def read_rows(path):
+    """Yield the rows of a .csv, .json (list of objects) or .ndjson file"""
+    path = str(path)
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as source:
+            yield from csv.DictReader(source)
+    elif path.endswith((".ndjson", ".jsonl")):
+        with open(path, encoding="utf-8") as source:
+            yield from _objects(
+                json.loads(line) for line in source if line.strip()
+            )
+    elif path.endswith(".json"):
+        with open(path, encoding="utf-8") as source:
+            rows = json.load(source)
+        if not isinstance(rows, list):
+            raise ScheduleImportError("expected a list of objects")
+        yield from _objects(rows)
+    else:
+        raise ScheduleImportError(
+            f"{path}: expected a .csv, .json or .ndjson file"
+        )
+
+
+def _objects(rows):
+    for line, row in enumerate(rows, 1):
+        if not isinstance(row, dict):
+            raise ScheduleImportError(f"row {line}: expected an object")
+        yield row
+
+
+def batches(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def _parsed(parse):
+    """Turn a django.utils.dateparse parser into a strict cast"""
+
+    def cast(value):
+        parsed = parse(str(value))
+        if parsed is None:
+            raise ValueError(value)
+        return parsed
+
+    return cast
+
+
+class ScheduleImporter:
+    """Loads airports, routes, airplanes, flights and schedules in batches
+
+    Foreign keys are written as natural keys in the files (airport,
+    airplane and airplane type names) and resolved through in-memory
+    lookup dicts, so each batch costs one existence query at most plus
+    its bulk insert/update. Rows whose natural key already exists are
+    skipped, or updated when ``upsert`` is set. On Postgres new flights
+    are streamed with COPY instead of INSERT.
+
+    Bulk writes bypass model signals, so ``finish`` drops the cached
+    reference data, flight index and search results afterwards.
+    """
+
+    def __init__(self, batch_size=5000, upsert=False, use_copy=None):
+        self.batch_size = batch_size
+        self.upsert = upsert
+        if use_copy is None:
+            use_copy = connection.vendor == "postgresql"
+        self.use_copy = use_copy
+        self._airport_ids = None
+        self._route_ids = None
+        self._airplane_ids = None
+        self._airplane_type_ids = None
+        self._schedule_ids = None
+        self.touched = set()
+
+    # Natural key lookups
+
+    def airport_ids(self):
+        if self._airport_ids is None:
+            self._airport_ids = dict(
+                Airport.objects.values_list("name", "id")
+            )
+        return self._airport_ids
+
+    def route_ids(self):
+        if self._route_ids is None:
+            self._route_ids = {
+                (source_id, destination_id): route_id
+                for route_id, source_id, destination_id in (
+                    Route.objects.values_list(
+                        "id", "source_id", "destination_id"
+                    )
+                )
+            }
+        return self._route_ids
+
+    def airplane_ids(self):
+        if self._airplane_ids is None:
+            self._airplane_ids = dict(
+                Airplane.objects.values_list("name", "id")
+            )
+        return self._airplane_ids
+
+    def airplane_type_ids(self):
+        if self._airplane_type_ids is None:
+            self._airplane_type_ids = dict(
+                AirplaneType.objects.values_list("name", "id")
+            )
+        return self._airplane_type_ids
+
+    def schedule_ids(self):
+        if self._schedule_ids is None:
+            self._schedule_ids = {
+                (route_id, departure_time, valid_from): schedule_id
+                for schedule_id, route_id, departure_time, valid_from in (
+                    FlightSchedule.objects.values_list(
+                        "id", "route_id", "departure_time", "valid_from"
+                    )
+                )
+            }
+        return self._schedule_ids
+
+    @staticmethod
+    def _value(row, name, line, cast=str):
+        value = row.get(name)
+        if value in (None, ""):
+            raise ScheduleImportError(f"row {line}: {name} is required")
+        try:
+            return cast(value)
+        except (TypeError, ValueError):
+            raise ScheduleImportError(
+                f"row {line}: invalid {name} {value!r}"
+            )
+
+    @staticmethod
+    def _datetime(value):
+        parsed = parse_datetime(str(value))
+        if parsed is None:
+            raise ValueError(value)
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def _route_id(self, row, line):
+        airport_ids = self.airport_ids()
+        source_id = self._resolve(
+            airport_ids, self._value(row, "source", line), line, "airport"
+        )
+        destination_id = self._resolve(
+            airport_ids, self._value(row, "destination", line), line, "airport"
+        )
+        return self._resolve(
+            self.route_ids(), (source_id, destination_id), line, "route"
+        )
+
+    def _resolve(self, ids, name, line, label):
+        try:
+            return ids[name]
+        except KeyError:
+            raise ScheduleImportError(
+                f"row {line}: unknown {label} {name!r}"
+            )
+
+    # Generic batch loader
+
+    def _load(self, kind, model, rows, parse, update_fields, ids=None,
+              existing=None, insert=None, updated=None):
+        """Insert new rows and skip or update known ones, batch by batch
+
+        Natural keys are looked up in ``ids`` ({key: pk}, kept up to date
+        with the inserted rows) or, for tables too large to preload, with
+        ``existing(keys)`` once per batch. ``updated(instances)`` is
+        called after each bulk update, which skips model signals.
+        """
+        result = ImportResult(kind)
+        started = time.perf_counter()
+        line = 0
+        for batch in batches(rows, self.batch_size):
+            parsed = {}
+            for row in batch:
+                line += 1
+                key, instance = parse(row, line)
+                if key in parsed:
+                    result.skipped += 1
+                parsed[key] = instance
+
+            found = ids if ids is not None else existing(parsed.keys())
+            new, changed = {}, []
+            for key, instance in parsed.items():
+                if key not in found:
+                    new[key] = instance
+                elif self.upsert:
+                    instance.pk = found[key]
+                    changed.append(instance)
+                else:
+                    result.skipped += 1
+
+            if new and insert is not None:
+                insert(new.values())
+            elif new:
+                model.objects.bulk_create(new.values())
+                if ids is not None:
+                    for key, instance in new.items():
+                        ids[key] = instance.pk
+            if changed:
+                model.objects.bulk_update(changed, update_fields)
+                if updated is not None:
+                    updated(changed)
+            result.created += len(new)
+            result.updated += len(changed)
+
+        if result.created or result.updated:
+            self.touched.add(model)
+        result.seconds = time.perf_counter() - started
+        return result
+
+    # Tables
+
+    def import_airports(self, rows):
+        def parse(row, line):
+            name = self._value(row, "name", line)
+            return name, Airport(
+                name=name,
+                closest_big_city=self._value(row, "closest_big_city", line),
+            )
+
+        return self._load(
+            "airports",
+            Airport,
+            rows,
+            parse,
+            update_fields=("closest_big_city",),
+            ids=self.airport_ids(),
+        )
+
+    def import_routes(self, rows):
+        airport_ids = self.airport_ids()
+
+        def parse(row, line):
+            source_id = self._resolve(
+                airport_ids, self._value(row, "source", line), line, "airport"
+            )
+            destination_id = self._resolve(
+                airport_ids,
+                self._value(row, "destination", line),
+                line,
+                "airport",
+            )
+            return (source_id, destination_id), Route(
+                source_id=source_id,
+                destination_id=destination_id,
+                distance=self._value(row, "distance", line, int),
+            )
+
+        return self._load(
+            "routes",
+            Route,
+            rows,
+            parse,
+            update_fields=("distance",),
+            ids=self.route_ids(),
+        )
+
+    def _ensure_airplane_types(self, rows):
+        """Create missing airplane types named in the airplane rows"""
+        type_ids = self.airplane_type_ids()
+        missing = {
+            row.get("airplane_type") for row in rows
+        } - set(type_ids) - {None, ""}
+        if missing:
+            for airplane_type in AirplaneType.objects.bulk_create(
+                AirplaneType(name=name) for name in sorted(missing)
+            ):
+                type_ids[airplane_type.name] = airplane_type.id
+            self.touched.add(AirplaneType)
+        return type_ids
+
+    def import_airplanes(self, rows):
+        rows = list(rows)
+        type_ids = self._ensure_airplane_types(rows)
+
+        def parse(row, line):
+            name = self._value(row, "name", line)
+            return name, Airplane(
+                name=name,
+                rows=self._value(row, "rows", line, int),
+                seats_in_row=self._value(row, "seats_in_row", line, int),
+                airplane_type_id=type_ids[
+                    self._value(row, "airplane_type", line)
+                ],
+            )
+
+        return self._load(
+            "airplanes",
+            Airplane,
+            rows,
+            parse,
+            update_fields=("rows", "seats_in_row", "airplane_type"),
+            ids=self.airplane_ids(),
+        )
+
+    def import_flights(self, rows):
+        airplane_ids = self.airplane_ids()
+
+        def parse(row, line):
+            route_id = self._route_id(row, line)
+            departure_time = self._value(
+                row, "departure_time", line, self._datetime
+            )
+            arrival_time = self._value(
+                row, "arrival_time", line, self._datetime
+            )
+            if arrival_time <= departure_time:
+                raise ScheduleImportError(
+                    f"row {line}: arrival_time must be after departure_time"
+                )
+            return (route_id, departure_time), Flight(
+                route_id=route_id,
+                airplane_id=self._resolve(
+                    airplane_ids,
+                    self._value(row, "airplane", line),
+                    line,
+                    "airplane",
+                ),
+                departure_time=departure_time,
+                arrival_time=arrival_time,
+            )
+
+        def existing(keys):
+            keys = list(keys)
+            if not keys:
+                return {}
+            departures = [departure_time for _, departure_time in keys]
+            return {
+                (route_id, departure_time): flight_id
+                for flight_id, route_id, departure_time in (
+                    Flight.objects.filter(
+                        route_id__in={route_id for route_id, _ in keys},
+                        departure_time__gte=min(departures),
+                        departure_time__lte=max(departures),
+                    )
+                    .order_by()
+                    .values_list("id", "route_id", "departure_time")
+                )
+            }
+
+        return self._load(
+            "flights",
+            Flight,
+            rows,
+            parse,
+            update_fields=("airplane", "arrival_time"),
+            existing=existing,
+            insert=self.copy_flights if self.use_copy else None,
+            updated=self.move_flight_crew,
+        )
+
+    @staticmethod
+    def move_flight_crew(flights):
+        """Copy new flight times onto the crew, as the Flight signal would
+
+        Fails the import if a crew member ends up on overlapping flights.
+        """
+        flight_ids = [flight.pk for flight in flights]
+        flight = Flight.objects.filter(pk=OuterRef("flight_id"))
+        try:
+            FlightCrew.objects.filter(
+                flight_id__in=flight_ids
+            ).copy_flight_times(
+                Subquery(flight.values("departure_time")[:1]),
+                Subquery(flight.values("arrival_time")[:1]),
+            )
+        except DjangoValidationError as error:
+            raise ScheduleImportError(error.messages[0])
+        conflicts = conflicting_assignments(flight_ids)
+        if conflicts:
+            raise ScheduleImportError(
+                "crew members would be on overlapping flights: "
+                + ", ".join(
+                    f"crew {crew_id} on flight {flight_id}"
+                    for crew_id, flight_id in conflicts
+                )
+            )
+
+    def import_schedules(self, rows):
+        airplane_ids = self.airplane_ids()
+
+        def parse(row, line):
+            route_id = self._route_id(row, line)
+            schedule = FlightSchedule(
+                route_id=route_id,
+                airplane_id=self._resolve(
+                    airplane_ids,
+                    self._value(row, "airplane", line),
+                    line,
+                    "airplane",
+                ),
+                weekdays=self._value(row, "weekdays", line),
+                departure_time=self._value(
+                    row, "departure_time", line, _parsed(parse_time)
+                ),
+                block_time=self._value(
+                    row, "block_time", line, _parsed(parse_duration)
+                ),
+                valid_from=self._value(
+                    row, "valid_from", line, _parsed(parse_date)
+                ),
+                valid_until=self._value(
+                    row, "valid_until", line, _parsed(parse_date)
+                ),
+            )
+            FlightSchedule.validate_schedule(
+                schedule.weekdays,
+                schedule.block_time,
+                schedule.valid_from,
+                schedule.valid_until,
+                lambda errors: ScheduleImportError(
+                    f"row {line}: {'; '.join(errors.values())}"
+                ),
+            )
+            key = (route_id, schedule.departure_time, schedule.valid_from)
+            return key, schedule
+
+        return self._load(
+            "schedules",
+            FlightSchedule,
+            rows,
+            parse,
+            update_fields=(
+                "airplane",
+                "weekdays",
+                "block_time",
+                "valid_until",
+            ),
+            ids=self.schedule_ids(),
+        )
+
+    def copy_flights(self, flights):
+        """Stream new flights into Postgres with COPY"""
+        meta = Flight._meta
+        columns = [
+            meta.get_field(name).column
+            for name in (
+                "route",
+                "airplane",
+                "departure_time",
+                "arrival_time",
+                "seats_sold",
+            )
+        ]
+        statement = (
+            f"COPY {connection.ops.quote_name(meta.db_table)} "
+            f"({', '.join(map(connection.ops.quote_name, columns))}) "
+            f"FROM STDIN"
+        )
+        with connection.cursor() as cursor:
+            with cursor.copy(statement) as copy:
+                for flight in flights:
+                    copy.write_row(
+                        (
+                            flight.route_id,
+                            flight.airplane_id,
+                            flight.departure_time,
+                            flight.arrival_time,
+                            0,
+                        )
+                    )
+
+    def finish(self):
+        """Invalidate caches that signals would have refreshed"""
+        if not self.touched:
+            return
+        for model in self.touched:
+            reference_cache.invalidate(model)
+        flight_index.invalidate_routes()
+        bump_table_versions(*self.touched)
@@ -0,0 +1,316 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict, namedtuple
+from datetime import timedelta
+from operator import attrgetter
+
+from django.conf import settings
+from django.utils import timezone
+
+from airport.filters import day_bounds
+from airport.models import Flight, Route
+from airport.versions import get_table_version
+
+Leg = namedtuple(
+    "Leg",
+    (
+        "flight_id",
+        "source_id",
+        "destination_id",
+        "departure_time",
+        "arrival_time",
+        "distance",
+    ),
+)
+
+Itinerary = namedtuple(
+    "Itinerary",
+    (
+        "stops",
+        "departure_time",
+        "arrival_time",
+        "duration",
+        "distance",
+        "flights",
+    ),
+)
+
+departure_key = attrgetter("departure_time")
+
+
+class FlightIndex:
+    """Per-process, time-dependent index of the flight network
+
+    Routes are kept as an adjacency map and flights as day buckets of
+    legs grouped by source airport and sorted by departure time. Buckets
+    are loaded lazily per day, dropped when a flight of that day changes
+    in this process, and expire after ``ITINERARY_INDEX_TTL`` seconds so
+    changes made by other workers are picked up as well. At most
+    ``ITINERARY_INDEX_MAX_DAYS`` days are kept; the least recently used
+    one is dropped first. The route map is reloaded whenever the Route
+    table version moves, and once more when a flight refers to a route
+    it does not know yet.
+    """
+
+    def __init__(self, ttl=None, max_days=None):
+        self.ttl = ttl
+        self.max_days = max_days
+        self._lock = threading.RLock()
+        self._routes = None
+        self._routes_to = None
+        self._routes_version = None
+        self._buckets = OrderedDict()
+        self._flight_days = {}
+
+    def _get_ttl(self):
+        if self.ttl is not None:
+            return self.ttl
+        return getattr(settings, "ITINERARY_INDEX_TTL", 60)
+
+    def _get_max_days(self):
+        if self.max_days is not None:
+            return self.max_days
+        return getattr(settings, "ITINERARY_INDEX_MAX_DAYS", 60)
+
+    def _load_routes(self):
+        version = get_table_version(Route)
+        routes = {}
+        routes_to = defaultdict(set)
+        for route_id, source_id, destination_id, distance in (
+            Route.objects.order_by().values_list(
+                "id", "source_id", "destination_id", "distance"
+            )
+        ):
+            routes[route_id] = (source_id, destination_id, distance)
+            routes_to[destination_id].add(source_id)
+        self._routes, self._routes_to = routes, routes_to
+        self._routes_version = version
+
+    def _get_routes(self):
+        with self._lock:
+            if (
+                self._routes is None
+                or get_table_version(Route) != self._routes_version
+            ):
+                self._load_routes()
+            return self._routes
+
+    def _load_bucket(self, day):
+        routes = self._get_routes()
+        day_start, next_day_start = day_bounds(day.isoformat())
+        bucket = defaultdict(list)
+        for flight_id, route_id, departure_time, arrival_time in (
+            Flight.objects.filter(
+                departure_time__gte=day_start,
+                departure_time__lt=next_day_start,
+            )
+            .order_by("departure_time")
+            .values_list("id", "route_id", "departure_time", "arrival_time")
+        ):
+            if route_id not in routes:
+                # Created by a bulk insert that bumped no version
+                with self._lock:
+                    self._load_routes()
+                    routes = self._routes
+                if route_id not in routes:
+                    continue
+            source_id, destination_id, distance = routes[route_id]
+            bucket[source_id].append(
+                Leg(
+                    flight_id,
+                    source_id,
+                    destination_id,
+                    departure_time,
+                    arrival_time,
+                    distance,
+                )
+            )
+            self._flight_days[flight_id] = day
+        return bucket
+
+    def _drop_bucket(self, day):
+        """Forget a day bucket and the days of the flights it held"""
+        _, bucket = self._buckets.pop(day, (None, {}))
+        for legs in bucket.values():
+            for leg in legs:
+                if self._flight_days.get(leg.flight_id) == day:
+                    del self._flight_days[leg.flight_id]
+
+    def _get_bucket(self, day):
+        with self._lock:
+            loaded_at, bucket = self._buckets.get(day, (None, None))
+            if (
+                bucket is None
+                or time.monotonic() - loaded_at > self._get_ttl()
+            ):
+                self._drop_bucket(day)
+                bucket = self._load_bucket(day)
+                self._buckets[day] = (time.monotonic(), bucket)
+                while len(self._buckets) > max(self._get_max_days(), 1):
+                    self._drop_bucket(next(iter(self._buckets)))
+            else:
+                self._buckets.move_to_end(day)
+            return bucket
+
+    def departures(self, airport_id, earliest, latest):
+        """Yield legs leaving an airport within [earliest, latest]"""
+        day = timezone.localdate(earliest)
+        last_day = timezone.localdate(latest)
+        while day <= last_day:
+            legs = self._get_bucket(day).get(airport_id, ())
+            for leg in legs[bisect_left(legs, earliest, key=departure_key):]:
+                if leg.departure_time > latest:
+                    break
+                yield leg
+            day += timedelta(days=1)
+
+    def airports_reaching(self, airport_id, hops):
+        """Airports with a route path of at most `hops` legs to airport_id"""
+        self._get_routes()
+        reachable = {airport_id}
+        frontier = {airport_id}
+        for _ in range(hops):
+            frontier = {
+                source_id
+                for destination_id in frontier
+                for source_id in self._routes_to.get(destination_id, ())
+            } - reachable
+            reachable |= frontier
+        return reachable
+
+    def invalidate_flight(self, flight):
+        """Drop the day buckets that held or will hold this flight"""
+        departure_time = Flight._meta.get_field("departure_time").to_python(
+            flight.departure_time
+        )
+        if timezone.is_naive(departure_time):
+            departure_time = timezone.make_aware(departure_time)
+        with self._lock:
+            days = {
+                self._flight_days.pop(flight.pk, None),
+                timezone.localdate(departure_time),
+            }
+            for day in days:
+                self._drop_bucket(day)
+
+    def invalidate_routes(self):
+        with self._lock:
+            self._routes = None
+            self._routes_to = None
+            self._buckets.clear()
+            self._flight_days.clear()
+
+    def search(
+        self,
+        origin_id,
+        destination_id,
+        date,
+        min_layover,
+        max_layover,
+        max_stops=2,
+        max_paths=None,
+    ):
+        """Find itineraries departing origin on date with up to max_stops
+
+        Connections must leave between min_layover and max_layover after
+        the previous leg arrives, never revisit an airport, and are only
+        followed through airports the route graph says can still reach
+        the destination with the legs left. The search stops after
+        ``max_paths`` (default ``ITINERARY_SEARCH_MAX_PATHS``) partial
+        paths, so a dense day returns what was found by then instead of
+        exploring every connection.
+        """
+        if max_paths is None:
+            max_paths = getattr(settings, "ITINERARY_SEARCH_MAX_PATHS", 5000)
+        day_start, next_day_start = day_bounds(date)
+        reaching = [
+            self.airports_reaching(destination_id, hops)
+            for hops in range(max_stops + 1)
+        ]
+        found = []
+        explored = 0
+
+        def extend(path, visited):
+            nonlocal explored
+            explored += 1
+            last = path[-1]
+            if last.destination_id == destination_id:
+                found.append(path)
+                return
+            legs_left = max_stops + 1 - len(path)
+            if not legs_left:
+                return
+            for leg in self.departures(
+                last.destination_id,
+                last.arrival_time + min_layover,
+                last.arrival_time + max_layover,
+            ):
+                if explored >= max_paths:
+                    return
+                if (
+                    leg.destination_id not in visited
+                    and leg.destination_id in reaching[legs_left - 1]
+                ):
+                    extend(path + [leg], visited | {leg.destination_id})
+
+        for leg in self.departures(
+            origin_id, day_start, next_day_start - timedelta.resolution
+        ):
+            if explored >= max_paths:
+                break
+            if leg.destination_id in reaching[max_stops]:
+                extend([leg], {origin_id, leg.destination_id})
+
+        return found
+
+
+flight_index = FlightIndex()
+
+
+def find_itineraries(
+    origin_id,
+    destination_id,
+    date,
+    min_layover,
+    max_layover,
+    max_stops=2,
+    sort="duration",
+    limit=20,
+    queryset=None,
+):
+    """Search the flight index and return the best Itinerary tuples"""
+    paths = flight_index.search(
+        origin_id, destination_id, date, min_layover, max_layover, max_stops
+    )
+
+    def duration(path):
+        return path[-1].arrival_time - path[0].departure_time
+
+    def distance(path):
+        return sum(leg.distance for leg in path)
+
+    if sort == "distance":
+        paths.sort(key=lambda path: (distance(path), duration(path)))
+    else:
+        paths.sort(key=lambda path: (duration(path), distance(path)))
+    paths = paths[:limit]
+
+    if queryset is None:
+        queryset = Flight.objects.all()
+    flights = queryset.in_bulk(
+        {leg.flight_id for path in paths for leg in path}
+    )
+
+    return [
+        Itinerary(
+            stops=len(path) - 1,
+            departure_time=path[0].departure_time,
+            arrival_time=path[-1].arrival_time,
+            duration=duration(path),
+            distance=distance(path),
+            flights=[flights[leg.flight_id] for leg in path],
+        )
+        for path in paths
+        if all(leg.flight_id in flights for leg in path)
+    ]
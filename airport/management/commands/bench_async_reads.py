@@ -0,0 +1,129 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncRequestFactory, RequestFactory
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from airport.async_views import (
+    AsyncAirportListView,
+    AsyncFlightDetailView,
+    AsyncFlightListView,
+    AsyncRouteListView,
+)
+from airport.models import Flight
+from airport.views import AirportViewSet, FlightViewSet, RouteViewSet
+
+ENDPOINTS = {
+    "flights": (
+        FlightViewSet, "list", AsyncFlightListView, "flights-list"
+    ),
+    "flight": (
+        FlightViewSet, "retrieve", AsyncFlightDetailView, "flights-detail"
+    ),
+    "airports": (
+        AirportViewSet, "list", AsyncAirportListView, "airports-list"
+    ),
+    "routes": (RouteViewSet, "list", AsyncRouteListView, "routes-list"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput of the sync viewsets and the async read views "
+        "against the configured database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "endpoint", choices=sorted(ENDPOINTS), nargs="?", default="flights"
+        )
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=4,
+            help="Worker threads serving the sync views (default: 4)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=100,
+            help="Requests in flight at once on the event loop "
+                 "(default: 100)",
+        )
+        parser.add_argument(
+            "--client-delay",
+            type=int,
+            default=0,
+            help="Milliseconds each request keeps its worker busy after "
+                 "the response, to mimic slow clients (default: 0)",
+        )
+
+    def handle(self, *args, **options):
+        # Request factories send "testserver" as the Host header
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+        ):
+            self.run_benchmark(options)
+
+    def run_benchmark(self, options):
+        viewset, action, async_view, url_name = ENDPOINTS[
+            options["endpoint"]
+        ]
+        kwargs = {}
+        if action == "retrieve":
+            flight_id = Flight.objects.values_list("id", flat=True).first()
+            if flight_id is None:
+                raise CommandError("No flights to benchmark")
+            kwargs["pk"] = flight_id
+        path = reverse(f"airport:{url_name}", kwargs=kwargs)
+        delay = options["client_delay"] / 1000
+
+        sync_view = viewset.as_view({"get": action}, throttle_classes=())
+        async_view = async_view.as_view()
+
+        def sync_request(_):
+            request = RequestFactory().get(path)
+            response = sync_view(request, **kwargs)
+            response.render()
+            time.sleep(delay)
+            return response.status_code
+
+        async def async_requests():
+            semaphore = asyncio.Semaphore(options["concurrency"])
+            factory = AsyncRequestFactory()
+
+            async def async_request():
+                async with semaphore:
+                    response = await async_view(factory.get(path), **kwargs)
+                    await asyncio.sleep(delay)
+                    return response.status_code
+
+            return await asyncio.gather(
+                *(async_request() for _ in range(options["requests"]))
+            )
+
+        # Measure the database work, not flight search cache hits
+        started = time.perf_counter()
+        with override_settings(FLIGHT_SEARCH_CACHE_TIMEOUT=0):
+            with ThreadPoolExecutor(options["threads"]) as executor:
+                sync_statuses = list(
+                    executor.map(sync_request, range(options["requests"]))
+                )
+        self.report("sync", started, sync_statuses)
+
+        started = time.perf_counter()
+        async_statuses = asyncio.run(async_requests())
+        self.report("async", started, async_statuses)
+
+    def report(self, label, started, statuses):
+        elapsed = time.perf_counter() - started
+        failed = sum(1 for status_code in statuses if status_code != 200)
+        self.stdout.write(
+            f"{label:>5}: {len(statuses)} requests in {elapsed:.2f}s, "
+            f"{len(statuses) / elapsed:.1f} req/s, {failed} failed"
+        )
@@ -0,0 +1,221 @@
+import argparse
+import json
+import os
+import resource
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.settings import api_settings
+from rest_framework.test import force_authenticate
+
+from airport.models import Airport
+from airport.views import AirportViewSet
+
+MODES = ("default", "streaming")
+PAYLOADS = ("photo", "oversize", "bomb")
+
+
+def png_chunk(kind, data):
+    return (
+        struct.pack(">I", len(data)) + kind + data
+        + struct.pack(">I", zlib.crc32(kind + data))
+    )
+
+
+def write_bomb(path, width, height):
+    """Write a valid all-black RGB PNG without holding its pixels"""
+    compressor = zlib.compressobj(9)
+    row = b"\x00" * (1 + width * 3)
+    data = b"".join(compressor.compress(row) for _ in range(height))
+    data += compressor.flush()
+    with open(path, "wb") as bomb:
+        bomb.write(b"\x89PNG\r\n\x1a\n")
+        bomb.write(
+            png_chunk(
+                b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+            )
+        )
+        bomb.write(png_chunk(b"IDAT", data))
+        bomb.write(png_chunk(b"IEND", b""))
+
+
+def write_payloads(directory, options):
+    Image.effect_noise((4000, 3000), 32).convert("RGB").save(
+        os.path.join(directory, "photo.jpg"), quality=85
+    )
+    with open(os.path.join(directory, "oversize.jpg"), "wb") as oversize:
+        with open(os.path.join(directory, "photo.jpg"), "rb") as photo:
+            oversize.write(photo.read())
+        oversize.write(os.urandom(options["oversize_mb"] * 1024 * 1024))
+    write_bomb(
+        os.path.join(directory, "bomb.png"),
+        options["bomb_size"],
+        options["bomb_size"],
+    )
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare worker memory and time of concurrent image uploads with "
+        "the default parsers and the streaming upload handler"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=8)
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=4,
+            help="Uploads handled at once (default: 4)",
+        )
+        parser.add_argument(
+            "--oversize-mb",
+            type=int,
+            default=40,
+            help="Size of the too large upload in MB (default: 40)",
+        )
+        parser.add_argument(
+            "--bomb-size",
+            type=int,
+            default=8000,
+            help="Width and height of the decompression bomb (default: "
+                 "8000)",
+        )
+        # Set when running as one of the measured worker processes
+        parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+        parser.add_argument("--payload", choices=PAYLOADS,
+                            help=argparse.SUPPRESS)
+        parser.add_argument("--payload-dir", help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options["mode"]:
+            self.stdout.write(json.dumps(self.run_worker(options)))
+            return
+
+        directory = tempfile.mkdtemp()
+        try:
+            write_payloads(directory, options)
+            for payload in PAYLOADS:
+                for mode in MODES:
+                    self.report(
+                        payload, mode, self.spawn(payload, mode, directory,
+                                                  options)
+                    )
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def spawn(self, payload, mode, directory, options):
+        """Run one payload and mode in a fresh process for a clean peak"""
+        command = [
+            sys.executable, "-m", "django", "bench_image_uploads",
+            "--mode", mode,
+            "--payload", payload,
+            "--payload-dir", directory,
+            "--requests", str(options["requests"]),
+            "--threads", str(options["threads"]),
+        ]
+        environment = {
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join(
+                filter(None, [str(settings.BASE_DIR),
+                              os.environ.get("PYTHONPATH")])
+            ),
+        }
+        result = subprocess.run(
+            command, capture_output=True, text=True, env=environment
+        )
+        if result.returncode:
+            raise CommandError(
+                f"{payload}/{mode} failed:\n{result.stderr}"
+            )
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def run_worker(self, options):
+        airport = Airport.objects.create(
+            name="Upload benchmark", closest_big_city="Benchmark"
+        )
+        media_root = tempfile.mkdtemp()
+        try:
+            # Request factories send "testserver" as the Host header;
+            # renditions are rendered by the worker that took the upload
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+                MEDIA_ROOT=media_root,
+                IMAGE_RENDITION_WORKERS=0,
+            ):
+                return self.upload(airport, options)
+        finally:
+            Airport.objects.filter(pk=airport.pk).delete()
+            shutil.rmtree(media_root, ignore_errors=True)
+
+    def upload(self, airport, options):
+        initkwargs = {
+            **AirportViewSet.upload_image.kwargs,
+            "throttle_classes": (),
+        }
+        if options["mode"] == "default":
+            initkwargs["parser_classes"] = api_settings.DEFAULT_PARSER_CLASSES
+        view = AirportViewSet.as_view({"post": "upload_image"}, **initkwargs)
+        path = reverse("airport:airports-upload-image", args=[airport.pk])
+        user = get_user_model()(email="admin@example.com", is_staff=True)
+
+        name = next(
+            name for name in os.listdir(options["payload_dir"])
+            if name.startswith(options["payload"] + ".")
+        )
+        with open(os.path.join(options["payload_dir"], name), "rb") as file:
+            content = file.read()
+        requests = []
+        for _ in range(options["requests"]):
+            request = RequestFactory().post(
+                path, {"image": SimpleUploadedFile(name, content)}
+            )
+            force_authenticate(request, user)
+            requests.append(request)
+        del content
+
+        def post(request):
+            started = time.perf_counter()
+            response = view(request, pk=airport.pk)
+            response.render()
+            return response.status_code, time.perf_counter() - started
+
+        # Request bodies are built up front and count towards the start
+        start_rss = peak_rss_mb()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options["threads"]) as executor:
+            results = list(executor.map(post, requests))
+        return {
+            "seconds": time.perf_counter() - started,
+            "max_request_seconds": max(seconds for _, seconds in results),
+            "statuses": sorted({status for status, _ in results}),
+            "rss_growth_mb": peak_rss_mb() - start_rss,
+        }
+
+    def report(self, payload, mode, result):
+        self.stdout.write(
+            f"{payload:>8} {mode:>9}: "
+            f"statuses {','.join(map(str, result['statuses']))}, "
+            f"{result['seconds']:.2f}s total, "
+            f"{result['max_request_seconds']:.2f}s slowest, "
+            f"peak RSS +{result['rss_growth_mb']:.0f} MB"
+        )
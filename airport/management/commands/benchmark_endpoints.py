@@ -0,0 +1,113 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.benchmarks import (
+    METRICS,
+    baseline_path,
+    find_regressions,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure query count, p50/p95 latency and response size of every "
+        "endpoint on the seeded database and fail on regressions against "
+        "the stored baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help="Only run these cases, e.g. orders-list flights-detail",
+        )
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument(
+            "--baseline",
+            help="Baseline file (default: settings.BENCHMARK_BASELINE)",
+        )
+        parser.add_argument(
+            "--save",
+            action="store_true",
+            help="Write the results as the new baseline instead of checking",
+        )
+        parser.add_argument(
+            "--latency-tolerance",
+            type=float,
+            default=0.25,
+            help="Allowed p50/p95 growth as a fraction (default: 0.25)",
+        )
+        parser.add_argument(
+            "--latency-slack",
+            type=float,
+            default=5,
+            help="Allowed p50/p95 growth in milliseconds on top of the "
+                 "tolerance (default: 5)",
+        )
+        parser.add_argument(
+            "--bytes-tolerance",
+            type=float,
+            default=0.05,
+            help="Allowed response size growth as a fraction "
+                 "(default: 0.05)",
+        )
+        parser.add_argument(
+            "--queries-only",
+            action="store_true",
+            help="Only compare query counts, e.g. on a different machine "
+                 "or dataset than the baseline was recorded on",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            results = run_benchmarks(
+                names=options["names"] or None,
+                iterations=options["iterations"],
+                warmup=options["warmup"],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        self.stdout.write(
+            f"{'case':<24}" + "".join(f"{metric:>10}" for metric in METRICS)
+        )
+        for name, metrics in results.items():
+            self.stdout.write(
+                f"{name:<24}"
+                + "".join(f"{metrics[metric]:>10}" for metric in METRICS)
+            )
+
+        if options["save"]:
+            baseline = {}
+            if options["names"]:
+                baseline = load_baseline(options["baseline"])
+            save_baseline({**baseline, **results}, options["baseline"])
+            self.stdout.write(self.style.SUCCESS("Baseline saved"))
+            return
+
+        try:
+            baseline = load_baseline(options["baseline"])
+        except FileNotFoundError:
+            raise CommandError(
+                f"No baseline at {baseline_path(options['baseline'])}, "
+                f"record one with --save"
+            )
+        regressions = find_regressions(
+            results,
+            baseline,
+            latency_tolerance=None
+            if options["queries_only"]
+            else options["latency_tolerance"],
+            bytes_tolerance=None
+            if options["queries_only"]
+            else options["bytes_tolerance"],
+            latency_slack_ms=options["latency_slack"],
+        )
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(regression)
+            raise CommandError(f"{len(regressions)} regression(s)")
+        self.stdout.write(self.style.SUCCESS("No regressions"))
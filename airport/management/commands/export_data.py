@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from airport.exports import (
+    EXPORT_COLUMNS,
+    EXPORT_CONTENT_TYPES,
+    export_rows,
+    render_export,
+)
+
+
+class Command(BaseCommand):
+    help = "Stream all flights, tickets or orders as CSV or NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(EXPORT_COLUMNS))
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=sorted(EXPORT_CONTENT_TYPES),
+            default="csv",
+        )
+        parser.add_argument(
+            "--output",
+            help="File to write to (default: standard output)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="Rows per database round trip (default: EXPORT_CHUNK_SIZE)",
+        )
+
+    def handle(self, *args, **options):
+        dataset = options["dataset"]
+        rows = export_rows(dataset, chunk_size=options["chunk_size"])
+        blocks = render_export(
+            dataset, options["file_format"], rows, options["chunk_size"]
+        )
+
+        if options["output"]:
+            with open(
+                options["output"], "w", newline="", encoding="utf-8"
+            ) as output:
+                output.writelines(blocks)
+        else:
+            for block in blocks:
+                self.stdout.write(block, ending="")
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from airport.schedules import generate_flights
+
+
+class Command(BaseCommand):
+    help = (
+        "Materialize flights of recurring schedules for the coming days; "
+        "safe to run repeatedly (e.g. nightly)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.FLIGHT_SCHEDULE_HORIZON_DAYS,
+            help="Generate up to this many days ahead "
+                 "(default: FLIGHT_SCHEDULE_HORIZON_DAYS)",
+        )
+        parser.add_argument(
+            "--schedule",
+            type=int,
+            action="append",
+            dest="schedule_ids",
+            help="Only this schedule id (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        created = generate_flights(
+            schedule_ids=options["schedule_ids"],
+            days=options["days"],
+            log=lambda message: self.stdout.write(
+                self.style.WARNING(message)
+            ),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Generated {created} flight(s)")
+        )
@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from airport.renditions import IMAGE_MODELS, update_renditions
+
+
+class Command(BaseCommand):
+    help = (
+        "Render missing resized variants of airplane type, airport and "
+        "crew images"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-render every image, e.g. after changing "
+                 "IMAGE_RENDITIONS",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=max(settings.IMAGE_RENDITION_WORKERS, 1),
+            help="Images rendered at once (default: IMAGE_RENDITION_WORKERS)",
+        )
+
+    def handle(self, *args, **options):
+        jobs = []
+        for model in IMAGE_MODELS:
+            queryset = model.objects.exclude(image="").exclude(
+                image__isnull=True
+            )
+            if not options["all"]:
+                queryset = queryset.filter(image_renditions={})
+            jobs += [
+                (model, pk) for pk in queryset.values_list("pk", flat=True)
+            ]
+
+        def render(job):
+            try:
+                update_renditions(*job)
+            finally:
+                close_old_connections()
+
+        if options["workers"] > 1:
+            with ThreadPoolExecutor(options["workers"]) as executor:
+                list(executor.map(render, jobs))
+        else:
+            for job in jobs:
+                update_renditions(*job)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rendered {len(jobs)} image(s)")
+        )
@@ -0,0 +1,90 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from airport.importers import ScheduleImporter, read_rows
+
+TABLES = ("airports", "routes", "airplanes", "schedules", "flights")
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk load airports, routes, airplanes, recurring schedules and "
+        "flights from CSV, JSON or NDJSON files, in one transaction"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--airports", help="Columns: name, closest_big_city"
+        )
+        parser.add_argument(
+            "--routes",
+            help="Columns: source, destination (airport names), distance",
+        )
+        parser.add_argument(
+            "--airplanes",
+            help="Columns: name, rows, seats_in_row, airplane_type (name, "
+                 "created if missing)",
+        )
+        parser.add_argument(
+            "--schedules",
+            help="Columns: source, destination (airport names), airplane "
+                 "(name), weekdays (ISO digits, e.g. 135), departure_time "
+                 "(HH:MM), block_time (HH:MM:SS), valid_from, valid_until "
+                 "(YYYY-MM-DD); run generate_flights afterwards",
+        )
+        parser.add_argument(
+            "--flights",
+            help="Columns: source, destination (airport names), airplane "
+                 "(name), departure_time, arrival_time (ISO 8601)",
+        )
+        parser.add_argument(
+            "--upsert",
+            action="store_true",
+            help="Update rows whose natural key exists instead of "
+                 "skipping them",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--no-copy",
+            action="store_true",
+            help="Insert flights with INSERT even on Postgres",
+        )
+
+    def handle(self, *args, **options):
+        paths = [
+            (table, options[table]) for table in TABLES if options[table]
+        ]
+        if not paths:
+            raise CommandError(
+                "Nothing to import, pass at least one of --airports, "
+                "--routes, --airplanes, --schedules or --flights"
+            )
+
+        importer = ScheduleImporter(
+            batch_size=options["batch_size"],
+            upsert=options["upsert"],
+            use_copy=False if options["no_copy"] else None,
+        )
+        started = time.perf_counter()
+        rows = 0
+        with transaction.atomic():
+            for table, path in paths:
+                try:
+                    result = getattr(importer, f"import_{table}")(
+                        read_rows(path)
+                    )
+                except (OSError, ValueError) as error:
+                    raise CommandError(f"{path}: {error}")
+                rows += result.rows
+                self.stdout.write(str(result))
+            importer.finish()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {rows} rows in {elapsed:.2f}s "
+                f"({rows / elapsed if elapsed else 0:.0f} rows/s)"
+            )
+        )
@@ -0,0 +1,59 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Send concurrent GET requests to a running server and report "
+        "throughput and latency, e.g. to compare runserver with gunicorn"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "urls",
+            nargs="+",
+            help="Absolute URLs, requested in turn",
+        )
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--timeout", type=float, default=30)
+
+    def handle(self, *args, **options):
+        urls = options["urls"]
+
+        def fetch(index):
+            request = Request(
+                urls[index % len(urls)],
+                headers={"Accept": "application/json"},
+            )
+            started = time.perf_counter()
+            try:
+                with urlopen(request, timeout=options["timeout"]) as response:
+                    response.read()
+                    status_code = response.status
+            except HTTPError as error:
+                status_code = error.code
+            except (URLError, OSError):
+                status_code = None
+            return status_code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as executor:
+            results = list(executor.map(fetch, range(options["requests"])))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for _, latency in results)
+        failed = sum(1 for status_code, _ in results if status_code != 200)
+        quantiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"{len(results)} requests in {elapsed:.2f}s, "
+            f"{len(results) / elapsed:.1f} req/s, {failed} failed\n"
+            f"latency p50 {quantiles[49] * 1000:.1f}ms, "
+            f"p95 {quantiles[94] * 1000:.1f}ms, "
+            f"max {latencies[-1] * 1000:.1f}ms"
+        )
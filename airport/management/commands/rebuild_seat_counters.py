@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from airport.models import Flight, Ticket
+from airport.versions import bump_row_versions, bump_table_versions
+
+
+class Command(BaseCommand):
+    help = "Verify and rebuild the denormalized Flight.seats_sold counters"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drifted counters, exit with an error if any",
+        )
+
+    def handle(self, *args, **options):
+        drifted = list(
+            Flight.objects.annotate(actual=Count("tickets"))
+            .exclude(seats_sold=F("actual"))
+            .values_list("id", "seats_sold", "actual")
+        )
+
+        for flight_id, stored, actual in drifted:
+            self.stdout.write(
+                f"Flight {flight_id}: stored {stored}, actual {actual}"
+            )
+
+        if options["check"]:
+            if drifted:
+                raise CommandError(
+                    f"{len(drifted)} flight counter(s) out of sync"
+                )
+            self.stdout.write(self.style.SUCCESS("All counters in sync"))
+            return
+
+        sold = (
+            Ticket.objects.filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        drifted_ids = [flight_id for flight_id, _, _ in drifted]
+        with transaction.atomic():
+            # Bookings change the counter under the same row lock, so
+            # once it is held the recount below sees every ticket they
+            # committed and none can slip in before the update
+            drifted_ids = list(
+                Flight.objects.select_for_update()
+                .filter(id__in=drifted_ids)
+                .order_by("id")
+                .values_list("id", flat=True)
+            )
+            updated = Flight.objects.filter(id__in=drifted_ids).update(
+                seats_sold=Coalesce(Subquery(sold), 0)
+            )
+            if updated:
+                bump_table_versions(Ticket)
+                bump_row_versions(Flight, drifted_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {updated} flight counter(s)")
+        )
@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from airport.models import Flight, FlightCrew
+from airport.versions import bump_table_versions
+
+
+def crew_overlaps():
+    """Yield (crew_id, flight_id, earlier_flight_id) for every assignment
+    that overlaps an earlier flight kept for the same crew member
+
+    Reads the flight times through the crew join table only, so it also
+    runs before migration 0008 has copied them onto the assignments.
+    """
+    crew_id = busy = None
+    for row_crew_id, flight_id, departure_time, arrival_time in (
+        Flight.objects.filter(crew__isnull=False)
+        .order_by("crew", "departure_time", "id")
+        .values_list("crew", "id", "departure_time", "arrival_time")
+    ):
+        if row_crew_id != crew_id:
+            crew_id, busy = row_crew_id, None
+        if busy is not None and departure_time < busy[1]:
+            yield crew_id, flight_id, busy[0]
+        elif busy is None or arrival_time > busy[1]:
+            busy = (flight_id, arrival_time)
+
+
+class Command(BaseCommand):
+    help = (
+        "List crew members on overlapping flights, which keep migration "
+        "0008 from adding its exclusion constraint, and optionally take "
+        "them off the later flight"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--remove",
+            action="store_true",
+            help="Take each crew member off the later of two overlapping "
+                 "flights",
+        )
+
+    def handle(self, *args, **options):
+        overlaps = list(crew_overlaps())
+        for crew_id, flight_id, earlier_id in overlaps:
+            self.stdout.write(
+                f"Crew member {crew_id}: flight {flight_id} overlaps "
+                f"flight {earlier_id}"
+            )
+        if not overlaps:
+            self.stdout.write(self.style.SUCCESS("No overlapping crew"))
+            return
+        if not options["remove"]:
+            raise CommandError(
+                f"{len(overlaps)} overlapping assignment(s), rerun with "
+                "--remove to take crew off the later flights"
+            )
+
+        pairs = Q()
+        for crew_id, flight_id, _ in overlaps:
+            pairs |= Q(crew_id=crew_id, flight_id=flight_id)
+        with transaction.atomic():
+            removed, _ = FlightCrew.objects.filter(pairs).delete()
+            bump_table_versions(Flight)
+        self.stdout.write(
+            self.style.SUCCESS(f"Removed {removed} crew assignment(s)")
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.benchmarks import BENCHMARK_EMAIL, seed_benchmark_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill an empty database with the deterministic dataset "
+        "benchmark_endpoints runs against"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--airports", type=int, default=2000)
+        parser.add_argument("--flights", type=int, default=100_000)
+        parser.add_argument("--tickets", type=int, default=2_000_000)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        try:
+            seed_benchmark_data(
+                airports=options["airports"],
+                flights=options["flights"],
+                tickets=options["tickets"],
+                batch_size=options["batch_size"],
+                log=self.stdout.write,
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(
+            self.style.SUCCESS(f"Seeded; benchmarks run as {BENCHMARK_EMAIL}")
+        )
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from airport.holds import sweep_expired_holds
+
+
+class Command(BaseCommand):
+    help = "Delete expired seat holds, once or periodically"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep sweeping every N seconds (default: sweep once)",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        while True:
+            swept = 0
+            while True:
+                deleted = sweep_expired_holds(options["batch_size"])
+                swept += deleted
+                if deleted < options["batch_size"]:
+                    break
+            self.stdout.write(f"Swept {swept} expired seat hold(s)")
+
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
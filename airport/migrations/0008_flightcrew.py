@@ -0,0 +1,148 @@
+# Generated by Django 5.2.3 on 2026-10-17 10:05
+
+import django.contrib.postgres.fields.ranges
+import django.db.models.deletion
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+import airport.models
+
+
+def copy_flight_times(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+    FlightCrew = apps.get_model("airport", "FlightCrew")
+    flight = Flight.objects.filter(pk=OuterRef("flight_id"))
+    FlightCrew.objects.update(
+        departure_time=Subquery(flight.values("departure_time")[:1]),
+        arrival_time=Subquery(flight.values("arrival_time")[:1]),
+    )
+
+
+def check_crew_overlaps(apps, schema_editor):
+    """Stop before the exclusion constraint while crew schedules overlap
+
+    Nothing kept them apart before. Resolving an overlap means taking a
+    crew member off a flight, which is left to an operator running
+    manage.py resolve_crew_overlaps rather than done here.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    FlightCrew = apps.get_model("airport", "FlightCrew")
+    conflicts = []
+    crew_id = busy = None
+    for row in (
+        FlightCrew.objects.filter(departure_time__isnull=False)
+        .order_by("crew_id", "departure_time", "flight_id")
+        .values_list("crew_id", "flight_id", "departure_time",
+                     "arrival_time")
+    ):
+        if row[0] != crew_id:
+            crew_id, busy = row[0], None
+        if busy is not None and row[2] < busy[1]:
+            conflicts.append((row[0], row[1], busy[0]))
+        elif busy is None or row[3] > busy[1]:
+            busy = (row[1], row[3])
+    if conflicts:
+        raise RuntimeError(
+            "Crew members are on overlapping flights, run "
+            "manage.py resolve_crew_overlaps before migrating:\n"
+            + "\n".join(
+                f"  crew {crew}: flight {flight} overlaps flight {other}"
+                for crew, flight, other in conflicts
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0007_flightschedule"),
+    ]
+
+    operations = [
+        # Adopt the auto-created Flight.crew table as an explicit model
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="FlightCrew",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        (
+                            "crew",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                to="airport.crew",
+                            ),
+                        ),
+                        (
+                            "flight",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                to="airport.flight",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "db_table": "airport_flight_crew",
+                        "unique_together": {("flight", "crew")},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name="flight",
+                    name="crew",
+                    field=models.ManyToManyField(
+                        related_name="flights",
+                        through="airport.FlightCrew",
+                        to="airport.crew",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="flightcrew",
+            name="departure_time",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="flightcrew",
+            name="arrival_time",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(copy_flight_times, migrations.RunPython.noop),
+        migrations.RunPython(
+            check_crew_overlaps, migrations.RunPython.noop
+        ),
+        BtreeGistExtension(),
+        # Only created on PostgreSQL, see PostgresExclusionConstraint
+        migrations.AddConstraint(
+            model_name="flightcrew",
+            constraint=airport.models.PostgresExclusionConstraint(
+                condition=models.Q(("departure_time__isnull", False)),
+                expressions=[
+                    ("crew", "="),
+                    (
+                        airport.models.TsTzRange(
+                            "departure_time",
+                            "arrival_time",
+                            django.contrib.postgres.fields.ranges
+                            .RangeBoundary(),
+                        ),
+                        "&&",
+                    ),
+                ],
+                name="exclude_overlapping_crew_flights",
+                violation_error_message=(
+                    "This crew member has another flight at that time."
+                ),
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-17 04:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0008_flightcrew"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="airplanetype",
+            name="image_renditions",
+            field=models.JSONField(default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="airport",
+            name="image_renditions",
+            field=models.JSONField(default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="crew",
+            name="image_renditions",
+            field=models.JSONField(default=dict, editable=False),
+        ),
+    ]
@@ -1,10 +1,26 @@
 import os
 import uuid
 
-from django.db import models
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import (
+    DateTimeRangeField,
+    RangeBoundary,
+    RangeOperators,
+)
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    IntegrityError,
+    connections,
+    models,
+    transaction,
+)
+from django.db.models import F, Func
 from django.utils.text import slugify
 from rest_framework.exceptions import ValidationError
 
+from airport.versions import bump_row_versions, bump_table_versions
 from airport_api_service import settings
 
 
@@ -21,6 +37,7 @@ class AirplaneType(models.Model):
         null=True,
         upload_to=airplane_type_image_file_path
     )
+    image_renditions = models.JSONField(default=dict, editable=False)
 
     def __str__(self):
         return self.name
@@ -40,6 +57,34 @@ class Airplane(models.Model):
     def capacity(self):
         return self.rows * self.seats_in_row
 
+    def seat_index(self, row, seat):
+        """Row-major position of a seat, counted from 0"""
+        return (row - 1) * self.seats_in_row + (seat - 1)
+
+    def pack_seats(self, seats):
+        """Pack (row, seat) pairs into a bitset, most significant bit first
+
+        Seats outside the cabin, e.g. tickets sold before the airplane was
+        made smaller, are left out.
+        """
+        bitmap = bytearray((self.capacity + 7) // 8)
+        for row, seat in seats:
+            if not (
+                1 <= row <= self.rows and 1 <= seat <= self.seats_in_row
+            ):
+                continue
+            index = self.seat_index(row, seat)
+            bitmap[index >> 3] |= 0x80 >> (index & 7)
+        return bytes(bitmap)
+
+    def unpack_seats(self, bitmap):
+        """Return the (row, seat) pairs set in a bitset from pack_seats"""
+        return [
+            (index // self.seats_in_row + 1, index % self.seats_in_row + 1)
+            for index in range(min(len(bitmap) * 8, self.capacity))
+            if bitmap[index >> 3] & (0x80 >> (index & 7))
+        ]
+
     def __str__(self):
         return f"{self.name}: type {self.airplane_type.name}"
 
@@ -55,6 +100,7 @@ class Airport(models.Model):
     name = models.CharField(max_length=64)
     closest_big_city = models.CharField(max_length=64)
     image = models.ImageField(null=True, upload_to=airport_image_file_path)
+    image_renditions = models.JSONField(default=dict, editable=False)
 
     def __str__(self):
         return f"{self.name} ({self.closest_big_city})"
@@ -98,6 +144,7 @@ class Crew(models.Model):
     first_name = models.CharField(max_length=64)
     last_name = models.CharField(max_length=64)
     image = models.ImageField(null=True, upload_to=crew_image_file_path)
+    image_renditions = models.JSONField(default=dict, editable=False)
 
     @property
     def full_name(self):
@@ -107,6 +154,85 @@ class Crew(models.Model):
         return f"{self.first_name} {self.last_name}"
 
 
+class FlightSchedule(models.Model):
+    """Recurring flight, materialized into Flight rows ahead of time
+
+    ``weekdays`` holds ISO weekday digits (1 = Monday ... 7 = Sunday),
+    e.g. "135" for Monday, Wednesday and Friday. ``departure_time`` is
+    the local time of day in TIME_ZONE. ``generated_until`` is the last
+    date flights have been generated for.
+    """
+
+    route = models.ForeignKey(
+        Route,
+        on_delete=models.CASCADE,
+        related_name="schedules"
+    )
+    airplane = models.ForeignKey(
+        Airplane,
+        on_delete=models.CASCADE,
+        related_name="schedules"
+    )
+    crew = models.ManyToManyField(
+        Crew,
+        related_name="schedules",
+        blank=True
+    )
+    weekdays = models.CharField(max_length=7)
+    departure_time = models.TimeField()
+    block_time = models.DurationField()
+    valid_from = models.DateField()
+    valid_until = models.DateField()
+    generated_until = models.DateField(
+        null=True,
+        blank=True,
+        editable=False
+    )
+
+    @staticmethod
+    def validate_schedule(weekdays, block_time, valid_from, valid_until,
+                          error_to_raise):
+        if (
+            not weekdays
+            or set(weekdays) - set("1234567")
+            or len(set(weekdays)) != len(weekdays)
+        ):
+            raise error_to_raise(
+                {
+                    "weekdays": "Use distinct ISO weekday digits "
+                                "1 (Monday) to 7 (Sunday), e.g. 135"
+                }
+            )
+        if block_time.total_seconds() <= 0:
+            raise error_to_raise(
+                {"block_time": "block_time must be positive"}
+            )
+        if valid_until < valid_from:
+            raise error_to_raise(
+                {"valid_until": "valid_until must not be before valid_from"}
+            )
+
+    def clean(self):
+        FlightSchedule.validate_schedule(
+            self.weekdays,
+            self.block_time,
+            self.valid_from,
+            self.valid_until,
+            ValidationError,
+        )
+
+    @property
+    def iso_weekdays(self):
+        return {int(day) for day in self.weekdays}
+
+    def __str__(self):
+        return (f"{self.route} -- days {self.weekdays} at "
+                f"{self.departure_time:%H:%M}")
+
+    class Meta:
+        ordering = ("valid_from", "departure_time")
+
+
 class Flight(models.Model):
     route = models.ForeignKey(
         Route,
@@ -118,9 +244,39 @@ class Flight(models.Model):
         on_delete=models.CASCADE,
         related_name="flights"
     )
-    crew = models.ManyToManyField(Crew, related_name="flights")
+    crew = models.ManyToManyField(
+        Crew,
+        related_name="flights",
+        through="FlightCrew"
+    )
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
+    seats_sold = models.PositiveIntegerField(default=0, editable=False)
+    schedule = models.ForeignKey(
+        FlightSchedule,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="flights"
+    )
+
+    @staticmethod
+    def adjust_seats_sold(flight_id, delta):
+        """Atomically shift the denormalized sold-seats counter"""
+        Flight.objects.filter(pk=flight_id).update(
+            seats_sold=F("seats_sold") + delta
+        )
+        bump_table_versions(Ticket)
+        bump_row_versions(Flight, (flight_id,))
+
+    def occupied_seats_bitmap(self):
+        """Pack sold seats into a row-major bitset, most significant bit first
+
+        Seat (row, seat) maps to bit (row - 1) * seats_in_row + (seat - 1).
+        """
+        return self.airplane.pack_seats(
+            self.tickets.order_by().values_list("row", "seat")
+        )
 
     def __str__(self):
         return (f"Route: {self.route.source} -> {self.route.destination}\n"
@@ -129,9 +285,146 @@ class Flight(models.Model):
                 f"Arrival: {self.arrival_time}")
 
     class Meta:
+        indexes = [
+            models.Index(fields=("departure_time",)),
+            models.Index(fields=("route", "departure_time")),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=("schedule", "departure_time"),
+                name="unique_scheduled_departure",
+            ),
+        ]
         ordering = ("departure_time",)
 
 
+class TsTzRange(Func):
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
+class PostgresExclusionConstraint(ExclusionConstraint):
+    """Exclusion constraint that only exists on PostgreSQL
+
+    Other backends get neither the constraint nor its model validation
+    and rely on the checks in airport.rostering alone.
+    """
+
+    @staticmethod
+    def _supported(connection):
+        return connection.vendor == "postgresql"
+
+    def constraint_sql(self, model, schema_editor):
+        if self._supported(schema_editor.connection):
+            return super().constraint_sql(model, schema_editor)
+        return None
+
+    def create_sql(self, model, schema_editor):
+        if self._supported(schema_editor.connection):
+            return super().create_sql(model, schema_editor)
+        return None
+
+    def remove_sql(self, model, schema_editor):
+        if self._supported(schema_editor.connection):
+            return super().remove_sql(model, schema_editor)
+        return None
+
+    def validate(
+        self, model, instance, exclude=None, using=DEFAULT_DB_ALIAS
+    ):
+        if self._supported(connections[using]):
+            super().validate(model, instance, exclude, using)
+
+
+class FlightCrewQuerySet(models.QuerySet):
+    def overlapping(self, departure_time, arrival_time):
+        """Assignments whose flight overlaps [departure_time, arrival_time)
+
+        On PostgreSQL the test is a range overlap, so it is answered by
+        the GiST index behind the crew overlap exclusion constraint.
+        """
+        if connections[self.db].vendor == "postgresql":
+            return self.annotate(
+                period=TsTzRange(
+                    "departure_time", "arrival_time", RangeBoundary()
+                )
+            ).filter(
+                period__overlap=TsTzRange(
+                    departure_time, arrival_time, RangeBoundary()
+                )
+            )
+        return self.filter(
+            departure_time__lt=arrival_time,
+            arrival_time__gt=departure_time,
+        )
+
+    def copy_flight_times(self, departure_time, arrival_time):
+        """Update the copied flight times of these assignments
+
+        A crew member moved onto two overlapping flights fails the
+        exclusion constraint on PostgreSQL, which is raised as a
+        ValidationError rather than a bare IntegrityError.
+        """
+        try:
+            with transaction.atomic(using=self.db):
+                return self.update(
+                    departure_time=departure_time, arrival_time=arrival_time
+                )
+        except IntegrityError:
+            raise DjangoValidationError(
+                "A crew member of this flight has another flight at that "
+                "time.",
+                code="crew_overlap",
+            )
+
+
+class FlightCrew(models.Model):
+    """Crew assignment carrying a copy of its flight's times
+
+    The copy lets the database reject a crew member on two overlapping
+    flights with an exclusion constraint, which cannot look at another
+    table. Signals keep it in step with Flight.
+    """
+
+    flight = models.ForeignKey(Flight, on_delete=models.CASCADE)
+    crew = models.ForeignKey(Crew, on_delete=models.CASCADE)
+    departure_time = models.DateTimeField(null=True, editable=False)
+    arrival_time = models.DateTimeField(null=True, editable=False)
+
+    objects = FlightCrewQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        if self.departure_time is None:
+            self.departure_time = self.flight.departure_time
+            self.arrival_time = self.flight.arrival_time
+        super(FlightCrew, self).save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.crew} on flight {self.flight_id}"
+
+    class Meta:
+        db_table = "airport_flight_crew"
+        unique_together = ("flight", "crew")
+        constraints = [
+            PostgresExclusionConstraint(
+                name="exclude_overlapping_crew_flights",
+                expressions=[
+                    ("crew", RangeOperators.EQUAL),
+                    (
+                        TsTzRange(
+                            "departure_time", "arrival_time", RangeBoundary()
+                        ),
+                        RangeOperators.OVERLAPS,
+                    ),
+                ],
+                condition=models.Q(departure_time__isnull=False),
+                violation_error_message=(
+                    "This crew member has another flight at that time."
+                ),
+            ),
+        ]
+
+
 class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(
@@ -194,9 +487,32 @@ class Ticket(models.Model):
             update_fields=None,
     ):
         self.full_clean()
-        return super(Ticket, self).save(
-            force_insert, force_update, using, update_fields
-        )
+        adding = self._state.adding
+        with transaction.atomic(using=using):
+            stored_flight_id = None
+            if not adding and (
+                update_fields is None or "flight" in update_fields
+            ):
+                # Locked, so a concurrent move can't count it twice
+                stored_flight_id = (
+                    Ticket.objects.using(using)
+                    .select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("flight_id", flat=True)
+                    .first()
+                )
+            result = super(Ticket, self).save(
+                force_insert, force_update, using, update_fields
+            )
+            if adding:
+                Flight.adjust_seats_sold(self.flight_id, 1)
+            elif (
+                stored_flight_id is not None
+                and stored_flight_id != self.flight_id
+            ):
+                Flight.adjust_seats_sold(stored_flight_id, -1)
+                Flight.adjust_seats_sold(self.flight_id, 1)
+        return result
 
     def __str__(self):
         return f"Row: {self.row} Seat: {self.seat} Flight: {self.flight}"
@@ -204,3 +520,54 @@ class Ticket(models.Model):
     class Meta:
         unique_together = ("row", "seat", "flight")
         ordering = ("row", "seat")
+
+
+class SeatHold(models.Model):
+    flight = models.ForeignKey(
+        Flight,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE
+    )
+    seats = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    @property
+    def seat_list(self):
+        return [
+            {"row": row, "seat": seat}
+            for row, seat in self.flight.airplane.unpack_seats(
+                bytes(self.seats)
+            )
+        ]
+
+    def __str__(self):
+        return f"Hold on flight {self.flight_id} until {self.expires_at}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("flight", "expires_at"))
+        ]
+        ordering = ("expires_at",)
+
+
+class IdempotencyKey(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE
+    )
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True)
+    response_body = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.key
+
+    class Meta:
+        unique_together = ("user", "key")
@@ -0,0 +1,151 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """Cursor pagination on (ordering field, id) without COUNT or OFFSET
+
+    The cursor stores the full composite position of the boundary row, so
+    every page is an index range scan starting right after that row, no
+    matter how deep the client has paged. Positions are unique, so the
+    links point at the first and last row of the page and never need
+    the offset CursorPagination falls back on for duplicate positions.
+    """
+
+    page_size_query_param = "limit"
+    max_page_size = 100
+    ordering = ("id",)
+
+    def _get_position_from_instance(self, instance, ordering):
+        field_name = ordering[0]
+        if isinstance(instance, dict):
+            value, pk = instance[field_name], instance["id"]
+        else:
+            value, pk = getattr(instance, field_name), instance.pk
+        if hasattr(value, "isoformat"):
+            value = value.isoformat()
+        return f"{value}|{pk}"
+
+    def _parse_position(self, queryset, position):
+        value, _, pk = position.rpartition("|")
+        field = queryset.model._meta.get_field(self.ordering[0])
+        try:
+            return field.to_python(value), int(pk)
+        except (DjangoValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        field_name = self.ordering[0]
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            reverse = self.cursor.reverse
+            current_position = self.cursor.position
+
+        if reverse:
+            queryset = queryset.order_by(f"-{field_name}", "-id")
+        else:
+            queryset = queryset.order_by(field_name, "id")
+
+        if current_position is not None:
+            value, pk = self._parse_position(queryset, current_position)
+            lookup = "lt" if reverse else "gt"
+            # Expanded form of (field, id) > (value, pk) that still lets
+            # the planner use an index starting with the ordering field
+            queryset = queryset.filter(
+                **{f"{field_name}__{lookup}e": value}
+            ).filter(
+                Q(**{f"{field_name}__{lookup}": value})
+                | Q(**{f"id__{lookup}": pk})
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+
+        has_following = len(results) > len(self.page)
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = current_position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def _boundary_position(self, index):
+        # An empty page past either end links back from the cursor itself
+        if not self.page:
+            return self.cursor.position
+        return self._get_position_from_instance(
+            self.page[index], self.ordering
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(
+            Cursor(
+                offset=0,
+                reverse=False,
+                position=self._boundary_position(-1),
+            )
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(
+            Cursor(
+                offset=0,
+                reverse=True,
+                position=self._boundary_position(0),
+            )
+        )
+
+
+class FlightKeysetPagination(KeysetPagination):
+    ordering = ("departure_time", "id")
+
+
+class OrderKeysetPagination(KeysetPagination):
+    ordering = ("created_at", "id")
+
+
+class KeysetPaginationMixin:
+    """Lets clients opt into keyset pages with ?pagination=cursor
+
+    Without the parameter the view keeps the default limit/offset
+    pagination, so existing clients see no change.
+    """
+
+    keyset_pagination_class = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            request = getattr(self, "request", None)
+            if (
+                self.keyset_pagination_class is not None
+                and request is not None
+                and request.query_params.get("pagination") == "cursor"
+            ):
+                self._paginator = self.keyset_pagination_class()
+            else:
+                return super().paginator
+        return self._paginator
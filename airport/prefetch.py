@@ -0,0 +1,85 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+class PrefetchPlan:
+    """select_related/prefetch_related lookups a serializer reads
+
+    Forward foreign keys become select_related joins and to-many
+    relations become Prefetch lookups that carry the plan of their own
+    subtree, so rendering costs one query per to-many level no matter
+    how many rows there are.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.select = set()
+        self.prefetch = {}
+
+    def add_serializer(self, serializer, model, prefix=()):
+        # Fields a ReferenceDataMixin serializer takes from the cache
+        cached = set(getattr(serializer, "reference_fields", ()))
+        for field in serializer.fields.values():
+            if (
+                field.write_only
+                or field.source == "*"
+                or field.source_attrs[0] in cached
+            ):
+                continue
+            self.add_field(field, model, prefix)
+
+    def add_field(self, field, model, prefix=()):
+        plan = self
+        attrs = field.source_attrs
+        for index, attr in enumerate(attrs):
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                return
+            if not model_field.is_relation:
+                return
+            path = prefix + (attr,)
+            model = model_field.related_model
+            if model_field.many_to_many or model_field.one_to_many:
+                plan = plan.prefetch.setdefault(
+                    "__".join(path), PrefetchPlan(model)
+                )
+                prefix = ()
+                continue
+            if index == len(attrs) - 1 and isinstance(
+                field, serializers.PrimaryKeyRelatedField
+            ):
+                # Rendered from the <name>_id column alone
+                return
+            plan.select.add("__".join(path))
+            prefix = path
+
+        if isinstance(field, serializers.ListSerializer):
+            plan.add_serializer(field.child, model, prefix)
+        elif isinstance(field, serializers.BaseSerializer):
+            plan.add_serializer(field, model, prefix)
+
+    def apply(self, queryset):
+        if self.select:
+            queryset = queryset.select_related(*sorted(self.select))
+        return queryset.prefetch_related(
+            *(
+                Prefetch(
+                    lookup,
+                    queryset=plan.apply(plan.model._default_manager.all()),
+                )
+                for lookup, plan in sorted(self.prefetch.items())
+            )
+        )
+
+
+@lru_cache(maxsize=None)
+def prefetch_plan(serializer_class):
+    """Return the PrefetchPlan of a model serializer class"""
+    model = serializer_class.Meta.model
+    plan = PrefetchPlan(model)
+    plan.add_serializer(serializer_class(), model)
+    return plan
@@ -0,0 +1,111 @@
+import threading
+import time
+
+from django.conf import settings
+
+from airport.models import Airplane, AirplaneType, Airport, Route
+from airport.versions import get_table_versions
+
+
+class ReferenceCache:
+    """Per-process read-through cache of rarely changing catalog tables
+
+    Each table is loaded whole on first use and kept as ``{pk: instance}``
+    together with the change versions (see airport.versions) of the table
+    and of the tables it references. A save or delete drops the copy in
+    this process at once; other workers notice the new version at most
+    ``REFERENCE_CACHE_CHECK_INTERVAL`` seconds later. Cached instances
+    are shared between requests and must be treated as read-only.
+    """
+
+    models = (AirplaneType, Airplane, Airport, Route)
+    references = {
+        Airplane: (AirplaneType,),
+        Route: (Airport,),
+    }
+
+    def __init__(self, check_interval=None):
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._tables = {}
+
+    def _get_check_interval(self):
+        if self.check_interval is not None:
+            return self.check_interval
+        return getattr(settings, "REFERENCE_CACHE_CHECK_INTERVAL", 1)
+
+    def _shared_version(self, model):
+        return get_table_versions((model, *self.references.get(model, ())))
+
+    def _load(self, model):
+        if model is Airplane:
+            airplane_types = self.table(AirplaneType)
+            rows = Airplane.objects.all()
+            related = (("airplane_type", airplane_types),)
+        elif model is Route:
+            airports = self.table(Airport)
+            rows = Route.objects.all()
+            related = (("source", airports), ("destination", airports))
+        else:
+            rows = model.objects.all()
+            related = ()
+
+        table = {}
+        for instance in rows:
+            for field_name, objects in related:
+                field = model._meta.get_field(field_name)
+                target = objects.get(getattr(instance, field.attname))
+                if target is not None:
+                    field.set_cached_value(instance, target)
+            table[instance.pk] = instance
+        return table
+
+    def table(self, model):
+        """Return the ``{pk: instance}`` map of a reference model"""
+        with self._lock:
+            version, checked_at, table = self._tables.get(
+                model, (None, 0, None)
+            )
+            now = time.monotonic()
+            if now - checked_at >= self._get_check_interval():
+                shared_version = self._shared_version(model)
+                if shared_version != version:
+                    table = None
+                version, checked_at = shared_version, now
+            if table is None:
+                table = self._load(model)
+            self._tables[model] = (version, checked_at, table)
+            return table
+
+    def get(self, model, pk):
+        return self.table(model).get(pk)
+
+    def attach(self, instance, *field_names):
+        """Point forward foreign keys of instance at cached objects
+
+        Relations already loaded (e.g. by select_related) are kept, and
+        relations whose target is missing from the cache are left alone
+        and fall back to the regular lazy lookup.
+        """
+        for field_name in field_names:
+            field = instance._meta.get_field(field_name)
+            if field.is_cached(instance):
+                continue
+            target = self.get(
+                field.related_model, getattr(instance, field.attname)
+            )
+            if target is not None:
+                field.set_cached_value(instance, target)
+        return instance
+
+    def invalidate(self, model):
+        """Drop this process's copy of model and of tables referencing it"""
+        with self._lock:
+            for cached_model in self.models:
+                if cached_model is model or model in self.references.get(
+                    cached_model, ()
+                ):
+                    self._tables.pop(cached_model, None)
+
+
+reference_cache = ReferenceCache()
@@ -0,0 +1,157 @@
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from airport.models import AirplaneType, Airport, Crew
+from airport.reference_cache import reference_cache
+from airport.versions import bump_table_versions
+
+logger = logging.getLogger(__name__)
+
+IMAGE_MODELS = (AirplaneType, Airport, Crew)
+RENDITION_EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def rendition_name(image_name, rendition, file_format):
+    """Storage name of one rendition, next to the original upload"""
+    directory, filename = os.path.split(image_name)
+    stem, _ = os.path.splitext(filename)
+    return os.path.join(
+        directory,
+        "renditions",
+        f"{stem}-{rendition}.{RENDITION_EXTENSIONS[file_format]}",
+    )
+
+
+def render(image, size, file_format):
+    """Encode image cropped and scaled to size, without any metadata"""
+    rendition = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+    if file_format == "jpeg" or rendition.mode not in ("RGB", "RGBA"):
+        rendition = rendition.convert("RGB")
+    # EXIF, ICC profiles and comments are only written when passed in
+    rendition.info = {}
+    output = io.BytesIO()
+    rendition.save(
+        output,
+        format=file_format.upper(),
+        quality=settings.IMAGE_RENDITION_QUALITY,
+        optimize=file_format == "jpeg",
+    )
+    return output.getvalue()
+
+
+def generate_renditions(image_file):
+    """Write every IMAGE_RENDITIONS variant of an image field file
+
+    Returns ``{rendition: {format: storage name}}``.
+    """
+    storage = image_file.storage
+    largest = max(settings.IMAGE_RENDITIONS.values())
+    with storage.open(image_file.name, "rb") as source:
+        image = Image.open(source)
+        # JPEGs can be decoded at a fraction of their size straight away
+        image.draft("RGB", largest)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    renditions = {}
+    for rendition, size in settings.IMAGE_RENDITIONS.items():
+        renditions[rendition] = {}
+        for file_format in settings.IMAGE_RENDITION_FORMATS:
+            name = rendition_name(image_file.name, rendition, file_format)
+            if storage.exists(name):
+                storage.delete(name)
+            renditions[rendition][file_format] = storage.save(
+                name, ContentFile(render(image, size, file_format))
+            )
+    return renditions
+
+
+def delete_renditions(storage, renditions):
+    for formats in renditions.values():
+        for name in formats.values():
+            storage.delete(name)
+
+
+def update_renditions(model, pk):
+    """Render the current image of one row and record the renditions
+
+    Rows whose image changed while rendering keep their own renditions;
+    the files just written are removed again.
+    """
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or not instance.image:
+        return
+    image_name = instance.image.name
+    renditions = generate_renditions(instance.image)
+    updated = model.objects.filter(pk=pk, image=image_name).update(
+        image_renditions=renditions
+    )
+    if not updated:
+        delete_renditions(instance.image.storage, renditions)
+        return
+    reference_cache.invalidate(model)
+    bump_table_versions(model)
+
+
+def _run(model, pk):
+    close_old_connections()
+    try:
+        update_renditions(model, pk)
+    except Exception:
+        logger.exception(
+            "Rendering images of %s %s failed", model.__name__, pk
+        )
+    finally:
+        close_old_connections()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_RENDITION_WORKERS,
+                thread_name_prefix="renditions",
+            )
+        return _executor
+
+
+def schedule_renditions(model, pk):
+    """Render a row's image once the current transaction commits
+
+    Work goes to a pool of IMAGE_RENDITION_WORKERS threads; with 0
+    workers it runs in the calling thread.
+    """
+    def submit():
+        if settings.IMAGE_RENDITION_WORKERS:
+            get_executor().submit(_run, model, pk)
+        else:
+            update_renditions(model, pk)
+
+    transaction.on_commit(submit)
+
+
+def save_image(serializer):
+    """Save an image upload serializer and re-render the renditions
+
+    The renditions of the replaced image are dropped at once, so list
+    endpoints never point at a picture that is no longer there.
+    """
+    instance = serializer.instance
+    previous = instance.image_renditions
+    storage = instance.image.storage
+    serializer.save(image_renditions={})
+    if previous:
+        transaction.on_commit(lambda: delete_renditions(storage, previous))
+    schedule_renditions(type(instance), instance.pk)
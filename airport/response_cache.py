@@ -0,0 +1,89 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from airport.models import Flight
+from airport.versions import get_row_versions, get_table_versions
+
+
+class FlightSearchCacheMixin:
+    """Caches flight search pages in the shared cache
+
+    The key is built from the normalized search: sorted, de-duplicated
+    airport id lists, the date filters, the pagination window and the
+    caller's role, plus the change versions of the schedule tables in
+    `search_cache_models`. Each entry also records the row version of
+    every flight on the page, so a booking (which bumps only the row
+    versions of its flights) invalidates exactly the pages showing those
+    flights instead of the whole cache.
+    """
+
+    search_cache_prefix = "flight-search"
+    search_cache_models = ()
+    search_cache_params = (
+        "date",
+        "date-from",
+        "date-to",
+        "pagination",
+        "cursor",
+        "limit",
+        "offset",
+    )
+
+    @staticmethod
+    def get_user_role(user):
+        if user and user.is_staff:
+            return "staff"
+        if user and user.is_authenticated:
+            return "user"
+        return "anon"
+
+    def get_search_cache_key(self, request):
+        params = request.query_params
+        search = {
+            name: params.get(name) for name in self.search_cache_params
+        }
+        for name in ("departure-airport", "arrival-airport"):
+            value = params.get(name)
+            search[name] = (
+                sorted(set(self._params_to_ints(value))) if value else None
+            )
+        search["role"] = self.get_user_role(request.user)
+        search["host"] = request.get_host()
+        search["media_type"] = request.accepted_renderer.media_type
+
+        digest = hashlib.sha1(json.dumps(search, sort_keys=True).encode())
+        for token, _ in get_table_versions(self.search_cache_models):
+            digest.update(token.encode())
+        return f"{self.search_cache_prefix}:{digest.hexdigest()}"
+
+    def get_cached_search(self, key):
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        data, flight_versions = entry
+        if get_row_versions(Flight, flight_versions) != flight_versions:
+            return None
+        return data
+
+    def cache_search(self, key, data):
+        flight_ids = [flight["id"] for flight in data.get("results", ())]
+        cache.set(
+            key,
+            (data, get_row_versions(Flight, flight_ids)),
+            settings.FLIGHT_SEARCH_CACHE_TIMEOUT,
+        )
+
+    def list(self, request, *args, **kwargs):
+        key = self.get_search_cache_key(request)
+        data = self.get_cached_search(key)
+        if data is not None:
+            return Response(data)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            self.cache_search(key, response.data)
+        return response
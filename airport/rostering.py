@@ -0,0 +1,125 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from airport.models import Flight, FlightCrew
+from airport.versions import bump_table_versions
+
+
+class CrewConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Crew members would be on overlapping flights."
+    default_code = "crew_conflict"
+
+
+def conflicting_assignments(flight_ids, crew_ids=None):
+    """Return (crew_id, flight_id) pairs of the flights' assignments that
+    overlap another flight of the same crew member
+
+    One query: every assignment is matched against the crew member's
+    other assignments by interval overlap. crew_ids limits the check to
+    those crew members, None checks the whole crew of the flights.
+    """
+    clashes = (
+        FlightCrew.objects.filter(crew_id=OuterRef("crew_id"))
+        .exclude(flight_id=OuterRef("flight_id"))
+        .overlapping(OuterRef("departure_time"), OuterRef("arrival_time"))
+    )
+    assignments = FlightCrew.objects.filter(flight_id__in=flight_ids)
+    if crew_ids is not None:
+        assignments = assignments.filter(crew_id__in=crew_ids)
+    return sorted(
+        assignments.filter(Exists(clashes)).values_list(
+            "crew_id", "flight_id"
+        )
+    )
+
+
+def raise_for_conflicts(
+    conflicts,
+    message="Crew member {crew} has another flight overlapping flight "
+            "{flight}.",
+):
+    if conflicts:
+        raise CrewConflict(
+            {
+                "detail": CrewConflict.default_detail,
+                "conflicts": [
+                    message.format(crew=crew_id, flight=flight_id)
+                    for crew_id, flight_id in conflicts
+                ],
+            }
+        )
+
+
+def roster_crew(assignments):
+    """Add crew to many flights at once
+
+    assignments maps flight ids to iterables of crew ids. Pairs already
+    rostered are left alone and the rest go into the through table with
+    one bulk insert. If any crew member would end up on two overlapping
+    flights nothing is written and CrewConflict lists the clashes; on
+    PostgreSQL an exclusion constraint also rejects overlaps that race
+    past the check. Returns the number of assignments created.
+    """
+    flights = {
+        flight_id: (departure_time, arrival_time)
+        for flight_id, departure_time, arrival_time in Flight.objects.filter(
+            id__in=assignments
+        ).order_by().values_list("id", "departure_time", "arrival_time")
+    }
+    existing = set(
+        FlightCrew.objects.filter(flight_id__in=flights).values_list(
+            "flight_id", "crew_id"
+        )
+    )
+    rows = [
+        FlightCrew(
+            flight_id=flight_id,
+            crew_id=crew_id,
+            departure_time=flights[flight_id][0],
+            arrival_time=flights[flight_id][1],
+        )
+        for flight_id, crew_ids in assignments.items()
+        for crew_id in sorted(set(crew_ids))
+        if (flight_id, crew_id) not in existing
+    ]
+    if not rows:
+        return 0
+
+    try:
+        with transaction.atomic():
+            FlightCrew.objects.bulk_create(rows, batch_size=1000)
+            raise_for_conflicts(
+                conflicting_assignments(
+                    flights, {row.crew_id for row in rows}
+                )
+            )
+    except IntegrityError:
+        raise CrewConflict()
+
+    bump_table_versions(Flight)
+    return len(rows)
+
+
+def save_flight(serializer):
+    """Save a FlightSerializer unless its crew would be double-booked
+
+    New crew and a flight moved onto other flights of its crew are both
+    checked; on PostgreSQL the exclusion constraint turns a racing
+    overlap into the same CrewConflict.
+    """
+    try:
+        with transaction.atomic():
+            flight = serializer.save()
+            # The flight may not outlive the rollback, so it is not named
+            raise_for_conflicts(
+                conflicting_assignments([flight.pk]),
+                "Crew member {crew} has another flight at that time.",
+            )
+    except (IntegrityError, DjangoValidationError):
+        # Raised by the constraint, directly or through copy_flight_times
+        raise CrewConflict()
+    return flight
@@ -0,0 +1,188 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from airport.itineraries import flight_index
+from airport.models import Flight, FlightCrew, FlightSchedule
+from airport.versions import bump_table_versions
+
+
+def schedule_departures(schedule, start, end):
+    """Yield the aware departure datetimes of schedule in [start, end]"""
+    weekdays = schedule.iso_weekdays
+    day = start
+    while day <= end:
+        if day.isoweekday() in weekdays:
+            yield timezone.make_aware(
+                datetime.combine(day, schedule.departure_time)
+            )
+        day += timedelta(days=1)
+
+
+def pending_window(schedule, today, horizon):
+    """Return the (start, end) dates still to generate, or None"""
+    start = max(schedule.valid_from, today)
+    if schedule.generated_until is not None:
+        start = max(start, schedule.generated_until + timedelta(days=1))
+    end = min(schedule.valid_until, horizon)
+    if start > end:
+        return None
+    return start, end
+
+
+def generate_flights(schedule_ids=None, days=None, today=None,
+                     batch_size=500, log=None):
+    """Materialize Flight rows of active schedules up to `days` ahead
+
+    Each schedule remembers the last generated date, so a run only covers
+    dates past it and repeated runs insert nothing. Schedules are locked
+    batch by batch (skipping ones another run holds), their flights are
+    inserted with one bulk_create and their crews with one bulk insert
+    into the through table. Crew members who would be on two overlapping
+    flights are left off the later one and reported through log.
+    Returns the number of flights created.
+    """
+    log = log or (lambda message: None)
+    today = today or timezone.localdate()
+    if days is None:
+        days = settings.FLIGHT_SCHEDULE_HORIZON_DAYS
+    horizon = today + timedelta(days=days)
+
+    pending = (
+        FlightSchedule.objects.filter(
+            valid_from__lte=horizon,
+            valid_until__gte=today,
+        )
+        .filter(
+            Q(generated_until__isnull=True)
+            | (
+                Q(generated_until__lt=horizon)
+                & Q(generated_until__lt=F("valid_until"))
+            )
+        )
+        .order_by("id")
+    )
+    if schedule_ids is not None:
+        pending = pending.filter(id__in=schedule_ids)
+    pending_ids = list(pending.values_list("id", flat=True))
+
+    created = []
+    for offset in range(0, len(pending_ids), batch_size):
+        with transaction.atomic():
+            created += _generate_batch(
+                pending_ids[offset:offset + batch_size], today, horizon, log
+            )
+
+    if created:
+        bump_table_versions(Flight)
+        for flight in created:
+            flight_index.invalidate_flight(flight)
+    return len(created)
+
+
+def _without_crew_overlaps(rows, log):
+    """Drop crew rows that overlap another flight of the same member"""
+    if not rows:
+        return rows
+    busy = defaultdict(list)
+    for crew_id, departure_time, arrival_time in (
+        FlightCrew.objects.filter(crew_id__in={row.crew_id for row in rows})
+        .overlapping(
+            min(row.departure_time for row in rows),
+            max(row.arrival_time for row in rows),
+        )
+        .values_list("crew_id", "departure_time", "arrival_time")
+    ):
+        busy[crew_id].append((departure_time, arrival_time))
+
+    kept = []
+    for row in sorted(rows, key=lambda row: row.departure_time):
+        periods = busy[row.crew_id]
+        if any(
+            row.departure_time < arrival_time
+            and departure_time < row.arrival_time
+            for departure_time, arrival_time in periods
+        ):
+            log(
+                f"Crew member {row.crew_id} left off flight "
+                f"{row.flight_id}: it overlaps another of their flights."
+            )
+            continue
+        periods.append((row.departure_time, row.arrival_time))
+        kept.append(row)
+    return kept
+
+
+def _generate_batch(schedule_ids, today, horizon, log):
+    schedules = list(
+        FlightSchedule.objects.filter(id__in=schedule_ids)
+        .select_for_update(skip_locked=True)
+        .prefetch_related("crew")
+    )
+
+    windows = {}
+    for schedule in schedules:
+        window = pending_window(schedule, today, horizon)
+        if window is not None:
+            windows[schedule] = window
+    if not windows:
+        return []
+
+    existing = set(
+        Flight.objects.filter(
+            schedule__in=list(windows),
+            departure_time__gte=timezone.make_aware(
+                datetime.combine(
+                    min(start for start, _ in windows.values()),
+                    datetime.min.time(),
+                )
+            ),
+        )
+        .order_by()
+        .values_list("schedule_id", "departure_time")
+    )
+
+    flights = []
+    for schedule, (start, end) in windows.items():
+        for departure_time in schedule_departures(schedule, start, end):
+            if (schedule.id, departure_time) in existing:
+                continue
+            flights.append(
+                Flight(
+                    route_id=schedule.route_id,
+                    airplane_id=schedule.airplane_id,
+                    schedule=schedule,
+                    departure_time=departure_time,
+                    arrival_time=departure_time + schedule.block_time,
+                )
+            )
+        schedule.generated_until = end
+
+    Flight.objects.bulk_create(flights, batch_size=1000)
+
+    crew_ids = {
+        schedule.id: [member.id for member in schedule.crew.all()]
+        for schedule in windows
+    }
+    FlightCrew.objects.bulk_create(
+        _without_crew_overlaps(
+            [
+                FlightCrew(
+                    flight_id=flight.id,
+                    crew_id=crew_id,
+                    departure_time=flight.departure_time,
+                    arrival_time=flight.arrival_time,
+                )
+                for flight in flights
+                for crew_id in crew_ids[flight.schedule_id]
+            ],
+            log,
+        ),
+        batch_size=1000,
+    )
+    FlightSchedule.objects.bulk_update(windows, ("generated_until",))
+    return flights
@@ -1,7 +1,23 @@
-from django.db import transaction
+from collections import Counter
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
-
+from rest_framework.validators import UniqueTogetherValidator
+
+from airport.holds import (
+    SEAT_HELD_MESSAGE,
+    SeatsContended,
+    held_by_others,
+    hold_seats,
+    seat_lock_key,
+    seat_mask,
+    try_lock_seats,
+)
 from airport.models import (
     AirplaneType,
     Airplane,
@@ -9,9 +25,27 @@ from airport.models import (
     Route,
     Crew,
     Flight,
+    FlightSchedule,
     Ticket,
-    Order
+    Order,
+    SeatHold,
 )
+from airport.reference_cache import reference_cache
+from airport.rostering import roster_crew
+
+
+class ReferenceDataMixin:
+    """Resolves `reference_fields` from the reference data cache
+
+    Lets list and detail serializers render related airports, routes and
+    airplanes without select_related joins or per-row lookups.
+    """
+
+    reference_fields = ()
+
+    def to_representation(self, instance):
+        reference_cache.attach(instance, *self.reference_fields)
+        return super().to_representation(instance)
 
 
 class AirplaneTypeSerializer(serializers.ModelSerializer):
@@ -20,10 +54,40 @@ class AirplaneTypeSerializer(serializers.ModelSerializer):
         fields = ("id", "name")
 
 
+@extend_schema_field(
+    {
+        "type": "object",
+        "additionalProperties": {
+            "type": "object",
+            "additionalProperties": {"type": "string", "format": "uri"},
+        },
+    }
+)
+class ImageRenditionsField(serializers.ReadOnlyField):
+    """URLs of the image's renditions as {rendition: {format: url}}
+
+    Empty until the background renderer has finished with an upload.
+    """
+
+    def to_representation(self, renditions):
+        request = self.context.get("request")
+        urls = {}
+        for rendition, formats in renditions.items():
+            urls[rendition] = {}
+            for file_format, name in formats.items():
+                url = default_storage.url(name)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                urls[rendition][file_format] = url
+        return urls
+
+
 class AirplaneTypeListSerializer(serializers.ModelSerializer):
+    image_renditions = ImageRenditionsField()
+
     class Meta:
         model = AirplaneType
-        fields = ("id", "name", "image")
+        fields = ("id", "name", "image", "image_renditions")
 
 
 class AirplaneTypeImageSerializer(serializers.ModelSerializer):
@@ -46,7 +110,8 @@ class AirplaneSerializer(serializers.ModelSerializer):
         )
 
 
-class AirplaneListSerializer(AirplaneSerializer):
+class AirplaneListSerializer(ReferenceDataMixin, AirplaneSerializer):
+    reference_fields = ("airplane_type",)
     airplane_type = serializers.SlugRelatedField(
         many=False,
         read_only=True,
@@ -54,7 +119,8 @@ class AirplaneListSerializer(AirplaneSerializer):
     )
 
 
-class AirplaneDetailSerializer(AirplaneSerializer):
+class AirplaneDetailSerializer(ReferenceDataMixin, AirplaneSerializer):
+    reference_fields = ("airplane_type",)
     airplane_type = AirplaneTypeListSerializer()
 
 
@@ -65,9 +131,17 @@ class AirportSerializer(serializers.ModelSerializer):
 
 
 class AirportListSerializer(serializers.ModelSerializer):
+    image_renditions = ImageRenditionsField()
+
     class Meta:
         model = Airport
-        fields = ("id", "name", "closest_big_city", "image")
+        fields = (
+            "id",
+            "name",
+            "closest_big_city",
+            "image",
+            "image_renditions",
+        )
 
 
 class AirportImageSerializer(serializers.ModelSerializer):
@@ -82,12 +156,14 @@ class RouteSerializer(serializers.ModelSerializer):
         fields = ("id", "source", "destination", "distance")
 
 
-class RouteListSerializer(RouteSerializer):
+class RouteListSerializer(ReferenceDataMixin, RouteSerializer):
+    reference_fields = ("source", "destination")
     source = serializers.StringRelatedField(read_only=True)
     destination = serializers.StringRelatedField(read_only=True)
 
 
-class RouteDetailSerializer(RouteSerializer):
+class RouteDetailSerializer(ReferenceDataMixin, RouteSerializer):
+    reference_fields = ("source", "destination")
     source = AirportSerializer(read_only=True)
     destination = AirportSerializer(read_only=True)
 
@@ -99,9 +175,18 @@ class CrewSerializer(serializers.ModelSerializer):
 
 
 class CrewListSerializer(serializers.ModelSerializer):
+    image_renditions = ImageRenditionsField()
+
     class Meta:
         model = Crew
-        fields = ("id", "first_name", "last_name", "full_name", "image")
+        fields = (
+            "id",
+            "first_name",
+            "last_name",
+            "full_name",
+            "image",
+            "image_renditions",
+        )
 
 
 class CrewImageSerializer(serializers.ModelSerializer):
@@ -110,7 +195,47 @@ class CrewImageSerializer(serializers.ModelSerializer):
         fields = ("id", "image")
 
 
+class FlightScheduleSerializer(serializers.ModelSerializer):
+    def validate(self, attrs):
+        data = super(FlightScheduleSerializer, self).validate(attrs=attrs)
+        FlightSchedule.validate_schedule(
+            *(
+                attrs.get(name, getattr(self.instance, name, None))
+                for name in (
+                    "weekdays",
+                    "block_time",
+                    "valid_from",
+                    "valid_until",
+                )
+            ),
+            ValidationError,
+        )
+        return data
+
+    class Meta:
+        model = FlightSchedule
+        fields = (
+            "id",
+            "route",
+            "airplane",
+            "crew",
+            "weekdays",
+            "departure_time",
+            "block_time",
+            "valid_from",
+            "valid_until",
+            "generated_until",
+        )
+        read_only_fields = ("generated_until",)
+
+
 class FlightSerializer(serializers.ModelSerializer):
+    crew = serializers.PrimaryKeyRelatedField(
+        many=True,
+        queryset=Crew.objects.all(),
+        allow_empty=False,
+    )
+
     class Meta:
         model = Flight
         fields = (
@@ -123,7 +248,8 @@ class FlightSerializer(serializers.ModelSerializer):
         )
 
 
-class FlightListSerializer(serializers.ModelSerializer):
+class FlightListSerializer(ReferenceDataMixin, serializers.ModelSerializer):
+    reference_fields = ("route", "airplane")
     departure_airport = serializers.CharField(
         source="route.source.closest_big_city",
         read_only=True
@@ -138,7 +264,11 @@ class FlightListSerializer(serializers.ModelSerializer):
         read_only=True,
         slug_field="full_name",
     )
-    tickets_available = serializers.IntegerField(read_only=True)
+    tickets_available = serializers.SerializerMethodField()
+
+    @extend_schema_field(OpenApiTypes.INT)
+    def get_tickets_available(self, flight):
+        return flight.airplane.capacity - flight.seats_sold
 
     class Meta:
         model = Flight
@@ -154,13 +284,84 @@ class FlightListSerializer(serializers.ModelSerializer):
         )
 
 
-class FlightDetailSerializer(FlightSerializer):
+class FlightDetailSerializer(ReferenceDataMixin, FlightSerializer):
+    reference_fields = ("route", "airplane")
     route = RouteDetailSerializer(read_only=True)
     airplane = AirplaneListSerializer(read_only=True)
     crew = CrewSerializer(many=True, read_only=True)
 
 
+class CrewAssignmentSerializer(serializers.Serializer):
+    flight = serializers.IntegerField()
+    crew = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+    )
+
+
+class CrewRosterSerializer(serializers.Serializer):
+    assignments = CrewAssignmentSerializer(many=True, allow_empty=False)
+
+    def validate_assignments(self, value):
+        flight_ids = {assignment["flight"] for assignment in value}
+        crew_ids = {
+            crew_id for assignment in value for crew_id in assignment["crew"]
+        }
+        errors = {}
+        missing_flights = flight_ids - set(
+            Flight.objects.filter(id__in=flight_ids)
+            .order_by()
+            .values_list("id", flat=True)
+        )
+        if missing_flights:
+            errors["flight"] = (
+                f"Unknown flights: {sorted(missing_flights)}."
+            )
+        missing_crew = crew_ids - set(
+            Crew.objects.filter(id__in=crew_ids).values_list("id", flat=True)
+        )
+        if missing_crew:
+            errors["crew"] = f"Unknown crew members: {sorted(missing_crew)}."
+        if errors:
+            raise ValidationError(errors)
+        return value
+
+    def create(self, validated_data):
+        assignments = {}
+        for assignment in validated_data["assignments"]:
+            assignments.setdefault(assignment["flight"], set()).update(
+                assignment["crew"]
+            )
+        return roster_crew(assignments)
+
+
+class ItinerarySerializer(serializers.Serializer):
+    stops = serializers.IntegerField(read_only=True)
+    departure_time = serializers.DateTimeField(read_only=True)
+    arrival_time = serializers.DateTimeField(read_only=True)
+    duration = serializers.DurationField(read_only=True)
+    distance = serializers.IntegerField(read_only=True)
+    flights = FlightListSerializer(many=True, read_only=True)
+
+
+class PrefetchedFlightField(serializers.PrimaryKeyRelatedField):
+    """Resolves flights from the batch loaded by OrderSerializer first"""
+
+    def to_internal_value(self, data):
+        flights = self.context.get("flights_by_id")
+        if flights is not None:
+            try:
+                return flights[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
+
+
 class TicketSerializer(serializers.ModelSerializer):
+    flight = PrefetchedFlightField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
         Ticket.validate_ticket(
@@ -174,6 +375,9 @@ class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
         fields = ("id", "row", "seat", "flight")
+        # Seat uniqueness is checked for the whole order at once
+        # in OrderSerializer.validate_tickets
+        validators = []
 
 
 class TicketListSerializer(TicketSerializer):
@@ -191,13 +395,114 @@ class OrderSerializer(serializers.ModelSerializer):
         allow_empty=False
     )
 
+    seat_taken_message = UniqueTogetherValidator.message.format(
+        field_names="row, seat, flight"
+    )
+
+    def to_internal_value(self, data):
+        """Load every flight of the order with its airplane in one query"""
+        tickets = data.get("tickets") if hasattr(data, "get") else None
+        flight_ids = set()
+        if isinstance(tickets, list):
+            for ticket in tickets:
+                if not isinstance(ticket, dict):
+                    continue
+                try:
+                    flight_ids.add(int(ticket.get("flight")))
+                except (TypeError, ValueError):
+                    pass
+        self.context["flights_by_id"] = (
+            Flight.objects.select_related("airplane").in_bulk(flight_ids)
+        )
+        return super().to_internal_value(data)
+
+    def validate_tickets(self, tickets):
+        """Reject seats already sold or repeated, with a single query"""
+        seats = [
+            (ticket["flight"].id, ticket["row"], ticket["seat"])
+            for ticket in tickets
+        ]
+        taken = set(
+            Ticket.objects.filter(
+                flight_id__in={flight_id for flight_id, _, _ in seats},
+                row__in={row for _, row, _ in seats},
+                seat__in={seat for _, _, seat in seats},
+            ).values_list("flight_id", "row", "seat")
+        )
+
+        errors = []
+        for seat in seats:
+            if seat in taken:
+                errors.append({"non_field_errors": [self.seat_taken_message]})
+            else:
+                errors.append({})
+            taken.add(seat)
+
+        if any(errors):
+            raise ValidationError(errors)
+        return tickets
+
+    def _create_order(self, validated_data, tickets_data):
+        order = Order.objects.create(**validated_data)
+        try:
+            with transaction.atomic():
+                Ticket.objects.bulk_create(
+                    Ticket(order=order, **ticket_data)
+                    for ticket_data in tickets_data
+                )
+        except IntegrityError:
+            raise ValidationError({"tickets": [self.seat_taken_message]})
+        sold = Counter(
+            ticket_data["flight"].id for ticket_data in tickets_data
+        )
+        for flight_id, count in sold.items():
+            Flight.adjust_seats_sold(flight_id, count)
+        return order
+
     def create(self, validated_data):
+        """Lock the seats, skip seats held by others and insert the order
+
+        Contention on a seat lock or a seat held by another customer is
+        detected before anything is written, so those requests fail fast
+        instead of rolling back a transaction.
+        """
+        tickets_data = validated_data.pop("tickets")
+        seats = [
+            (ticket_data["flight"], ticket_data["row"], ticket_data["seat"])
+            for ticket_data in tickets_data
+        ]
+        lock_keys = [
+            seat_lock_key(flight.id, flight.airplane.seat_index(row, seat))
+            for flight, row, seat in seats
+        ]
+
+        contended, errors, order = False, [], None
         with transaction.atomic():
-            tickets_data = validated_data.pop("tickets")
-            order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
-            return order
+            if not try_lock_seats(lock_keys):
+                contended = True
+            else:
+                held = held_by_others(
+                    {flight.id for flight, _, _ in seats},
+                    validated_data.get("user"),
+                )
+                errors = [
+                    {"non_field_errors": [SEAT_HELD_MESSAGE]}
+                    if held.get(flight.id, 0)
+                    & seat_mask(flight.airplane, row, seat)
+                    else {}
+                    for flight, row, seat in seats
+                ]
+                if not any(errors):
+                    order = self._create_order(validated_data, tickets_data)
+                    seat_hold = self.context.get("seat_hold")
+                    if seat_hold is not None:
+                        seat_hold.delete()
+
+        if contended:
+            raise SeatsContended()
+        if any(errors):
+            raise ValidationError({"tickets": errors})
+        return order
 
     class Meta:
         model = Order
@@ -210,3 +515,48 @@ class OrderListSerializer(OrderSerializer):
 
 class OrderDetailSerializer(OrderSerializer):
     tickets = TicketDetailSerializer(many=True, read_only=True)
+
+
+class SeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    flight = serializers.PrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+    seats = SeatSerializer(many=True, allow_empty=False, source="seat_list")
+    minutes = serializers.IntegerField(
+        write_only=True,
+        required=False,
+        min_value=1,
+        max_value=settings.SEAT_HOLD_MAX_MINUTES,
+    )
+
+    def validate(self, attrs):
+        data = super(SeatHoldSerializer, self).validate(attrs=attrs)
+        seats = [(seat["row"], seat["seat"]) for seat in attrs["seat_list"]]
+        for row, seat in seats:
+            Ticket.validate_ticket(
+                row, seat, attrs["flight"].airplane, ValidationError
+            )
+        if len(set(seats)) != len(seats):
+            raise ValidationError({"seats": "Seats must be unique."})
+        return data
+
+    def create(self, validated_data):
+        return hold_seats(
+            validated_data["user"],
+            validated_data["flight"],
+            [
+                (seat["row"], seat["seat"])
+                for seat in validated_data["seat_list"]
+            ],
+            validated_data.get("minutes"),
+        )
+
+    class Meta:
+        model = SeatHold
+        fields = ("id", "flight", "seats", "minutes", "expires_at")
+        read_only_fields = ("expires_at",)
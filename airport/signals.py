@@ -0,0 +1,96 @@
+from django.db.models import OuterRef, Subquery
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from airport.itineraries import flight_index
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    FlightCrew,
+    Route,
+    Ticket,
+)
+from airport.reference_cache import reference_cache
+from airport.versions import bump_table_versions
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seat(sender, instance, **kwargs):
+    """Keep Flight.seats_sold in step when a ticket is removed"""
+    Flight.adjust_seats_sold(instance.flight_id, -1)
+
+
+@receiver(post_save, sender=Flight)
+def copy_flight_times_to_crew(sender, instance, created, **kwargs):
+    """Move the flight's crew assignments along with its times"""
+    if not created:
+        FlightCrew.objects.filter(flight=instance).copy_flight_times(
+            instance.departure_time, instance.arrival_time
+        )
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_delete, sender=Flight)
+def refresh_flight_index(sender, instance, **kwargs):
+    flight_index.invalidate_flight(instance)
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def refresh_route_index(sender, instance, **kwargs):
+    flight_index.invalidate_routes()
+
+
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_delete, sender=AirplaneType)
+@receiver(post_save, sender=Airplane)
+@receiver(post_delete, sender=Airplane)
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def refresh_reference_cache(sender, instance, **kwargs):
+    reference_cache.invalidate(sender)
+
+
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_delete, sender=AirplaneType)
+@receiver(post_save, sender=Airplane)
+@receiver(post_delete, sender=Airplane)
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+@receiver(post_save, sender=Crew)
+@receiver(post_delete, sender=Crew)
+@receiver(post_save, sender=Flight)
+@receiver(post_delete, sender=Flight)
+def bump_version(sender, instance, **kwargs):
+    bump_table_versions(sender)
+
+
+@receiver(m2m_changed, sender=FlightCrew)
+def copy_flight_times_to_added_crew(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """Fill in the times of rows inserted by crew.add() and crew.set()"""
+    if action != "post_add" or not pk_set:
+        return
+    if reverse:
+        added = FlightCrew.objects.filter(crew=instance, flight__in=pk_set)
+    else:
+        added = FlightCrew.objects.filter(flight=instance, crew__in=pk_set)
+    flight = Flight.objects.filter(pk=OuterRef("flight_id"))
+    added.filter(departure_time__isnull=True).copy_flight_times(
+        Subquery(flight.values("departure_time")[:1]),
+        Subquery(flight.values("arrival_time")[:1]),
+    )
+
+
+@receiver(m2m_changed, sender=FlightCrew)
+def bump_flight_crew_version(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_table_versions(Flight)
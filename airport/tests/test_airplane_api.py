@@ -1,15 +1,17 @@
 import os
+import shutil
 import tempfile
 
 from PIL import Image
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 from airport.models import AirplaneType, Airplane
 from airport.serializers import AirplaneTypeListSerializer, AirplaneListSerializer, AirplaneDetailSerializer
 
+MEDIA_ROOT = tempfile.mkdtemp()
 AIRPLANE_TYPE_URL = reverse("airport:airplane_types-list")
 AIRPLANE_URL = reverse("airport:airplanes-list")
 
@@ -211,6 +213,7 @@ class AdminAirplaneTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
 
 
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_RENDITION_WORKERS=0)
 class AirplaneTypeImageUploadTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -222,6 +225,7 @@ class AirplaneTypeImageUploadTests(TestCase):
 
     def tearDown(self):
         self.airplane_type.image.delete()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
 
     def test_upload_image_to_airplane_type(self):
         """Test uploading an image to airplane_type"""
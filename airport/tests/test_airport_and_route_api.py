@@ -1,15 +1,17 @@
 import os
+import shutil
 import tempfile
 
 from PIL import Image
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 from airport.models import Airport, Route
 from airport.serializers import AirportListSerializer, RouteListSerializer, RouteDetailSerializer
 
+MEDIA_ROOT = tempfile.mkdtemp()
 AIRPORT_URL = reverse("airport:airports-list")
 ROUTE_URL = reverse("airport:routes-list")
 
@@ -247,6 +249,7 @@ class AdminAirportTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
 
 
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_RENDITION_WORKERS=0)
 class AirportImageUploadTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -258,6 +261,7 @@ class AirportImageUploadTests(TestCase):
 
     def tearDown(self):
         self.airport.image.delete()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
 
     def test_upload_image_to_airport(self):
         """Test uploading an image to airport"""
@@ -0,0 +1,109 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+
+from airport.tests.test_flight_and_crew_api import sample_crew, sample_flight
+
+
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.flight = sample_flight()
+        self.flight.crew.add(sample_crew())
+        sample_flight(departure_time="2025-06-06T09:00:00Z")
+
+    def assert_same_content(self, sync_url, async_url, params=None):
+        expected = self.client.get(
+            sync_url, params, HTTP_ACCEPT="application/json"
+        )
+        res = self.client.get(async_url, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/json")
+        # Pagination links point at the endpoint that was called
+        self.assertEqual(
+            res.content.replace(async_url.encode(), sync_url.encode()),
+            expected.content,
+        )
+
+    def test_flight_list_matches_sync(self):
+        self.assert_same_content(
+            reverse("airport:flights-list"),
+            reverse("airport:async-flights-list"),
+        )
+
+    def test_flight_list_filters_match_sync(self):
+        self.assert_same_content(
+            reverse("airport:flights-list"),
+            reverse("airport:async-flights-list"),
+            {
+                "date": "2025-06-05",
+                "departure-airport": self.flight.route.source_id,
+            },
+        )
+
+    def test_flight_detail_matches_sync(self):
+        self.assert_same_content(
+            reverse("airport:flights-detail", args=[self.flight.id]),
+            reverse("airport:async-flights-detail", args=[self.flight.id]),
+        )
+
+    def test_airport_and_route_lists_match_sync(self):
+        self.assert_same_content(
+            reverse("airport:airports-list"),
+            reverse("airport:async-airports-list"),
+            {"city": "Source", "limit": 1},
+        )
+        self.assert_same_content(
+            reverse("airport:routes-list"),
+            reverse("airport:async-routes-list"),
+        )
+
+    async def test_served_from_async_client(self):
+        res = await self.async_client.get(
+            reverse("airport:async-flights-list"), {"limit": 1}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["count"], 2)
+        self.assertEqual(len(res.json()["results"]), 1)
+
+    def test_missing_flight_returns_404(self):
+        res = self.client.get(
+            reverse(
+                "airport:async-flights-detail", args=[self.flight.id + 100]
+            )
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_filter_returns_400(self):
+        res = self.client.get(
+            reverse("airport:async-flights-list"), {"date": "June 5"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_flight_search_is_throttled(self):
+        url = reverse("airport:async-flights-list")
+        res = self.client.get(url)
+
+        self.assertEqual(res["RateLimit-Limit"], "30")
+        self.assertEqual(res["RateLimit-Remaining"], "29")
+
+        for _ in range(29):
+            self.client.get(url)
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res["RateLimit-Remaining"], "0")
+        self.assertIn("Retry-After", res)
+        # The sync search shares the allowance
+        res = self.client.get(reverse("airport:flights-list"))
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_writes_not_allowed(self):
+        res = self.client.post(reverse("airport:async-flights-list"))
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -0,0 +1,66 @@
+import os
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from airport.benchmarks import (
+    baseline_path,
+    find_regressions,
+    load_baseline,
+    run_benchmarks,
+    seed_benchmark_data,
+)
+
+
+class EndpointQueryBudgetTests(TestCase):
+    """Query counts of every endpoint against the stored baseline
+
+    The seeded dataset keeps the full-size shape (full pages, four
+    tickets per order), so the counts match the ones recorded on the
+    full benchmark dataset. Counts differ between database backends,
+    so the test only runs where a baseline for the backend exists.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_benchmark_data(airports=30, flights=300, tickets=2400)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_query_counts_do_not_exceed_baseline(self):
+        if not os.path.exists(baseline_path()):
+            self.skipTest(f"No baseline at {baseline_path()}")
+
+        results = run_benchmarks(iterations=1, warmup=1)
+
+        self.assertEqual(find_regressions(results, load_baseline()), [])
+
+    def test_regressions_are_reported(self):
+        baseline = {
+            "orders-list": {
+                "queries": 5, "p50_ms": 10, "p95_ms": 20, "bytes": 1000
+            },
+        }
+        results = {
+            "orders-list": {
+                "queries": 6, "p50_ms": 12, "p95_ms": 30, "bytes": 1020
+            },
+            "orders-detail": {
+                "queries": 3, "p50_ms": 5, "p95_ms": 8, "bytes": 500
+            },
+        }
+
+        self.assertEqual(
+            find_regressions(
+                results,
+                baseline,
+                latency_tolerance=0.25,
+                bytes_tolerance=0.05,
+            ),
+            [
+                "orders-list: queries 6 > baseline 5",
+                "orders-list: p95_ms 30 > baseline 20",
+                "orders-detail: no baseline",
+            ],
+        )
@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.tests.test_airport_and_route_api import sample_airport
+from airport.tests.test_flight_and_crew_api import sample_flight
+
+AIRPORT_URL = reverse("airport:airports-list")
+FLIGHT_URL = reverse("airport:flights-list")
+ORDER_URL = reverse("airport:orders-list")
+
+
+class ConditionalRequestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_not_modified_without_queries(self):
+        sample_airport()
+        res = self.client.get(AIRPORT_URL)
+        self.assertIn("ETag", res.headers)
+        self.assertIn("Last-Modified", res.headers)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(
+                AIRPORT_URL, HTTP_IF_NONE_MATCH=res.headers["ETag"]
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_change_replaces_etag(self):
+        airport = sample_airport()
+        etag = self.client.get(AIRPORT_URL).headers["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            airport.name = "Renamed"
+            airport.save()
+        res = self.client.get(AIRPORT_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.headers["ETag"], etag)
+
+    def test_flight_etag_depends_on_filters(self):
+        sample_flight()
+
+        etag = self.client.get(FLIGHT_URL).headers["ETag"]
+        filtered_etag = self.client.get(
+            FLIGHT_URL, {"date": "2025-06-05"}
+        ).headers["ETag"]
+
+        self.assertNotEqual(etag, filtered_etag)
+
+    def test_booking_replaces_flight_etag(self):
+        flight = sample_flight()
+        etag = self.client.get(FLIGHT_URL).headers["ETag"]
+
+        user = get_user_model().objects.create_user(
+            email="test@test.test",
+            password="testpassword",
+        )
+        self.client.force_authenticate(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                ORDER_URL,
+                {"tickets": [{"row": 1, "seat": 1, "flight": flight.id}]},
+                format="json",
+            )
+        res = self.client.get(FLIGHT_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -0,0 +1,312 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import FlightCrew
+from airport.tests.test_flight_and_crew_api import sample_crew, sample_flight
+
+ROSTER_URL = reverse("airport:flights-roster")
+FLIGHT_URL = reverse("airport:flights-list")
+
+
+class CrewRosterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            "admin@myproject.com", "password"
+        )
+        self.client.force_authenticate(self.user)
+        self.morning = sample_flight()
+        self.evening = sample_flight(
+            departure_time="2025-06-05T15:00:00Z",
+            arrival_time="2025-06-05T18:00:00Z",
+        )
+        self.crew = [sample_crew(), sample_crew(first_name="Jane")]
+
+    def test_roster_many_flights_in_one_request(self):
+        payload = {
+            "assignments": [
+                {
+                    "flight": flight.id,
+                    "crew": [member.id for member in self.crew],
+                }
+                for flight in (self.morning, self.evening)
+            ]
+        }
+
+        with self.assertNumQueries(8):
+            res = self.client.post(ROSTER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"created": 4})
+        self.assertEqual(set(self.evening.crew.all()), set(self.crew))
+        self.evening.refresh_from_db()
+        self.assertEqual(
+            set(
+                FlightCrew.objects.filter(flight=self.evening).values_list(
+                    "departure_time", "arrival_time"
+                )
+            ),
+            {(self.evening.departure_time, self.evening.arrival_time)},
+        )
+
+    def test_already_rostered_crew_is_skipped(self):
+        self.morning.crew.add(self.crew[0])
+        payload = {
+            "assignments": [
+                {
+                    "flight": self.morning.id,
+                    "crew": [member.id for member in self.crew],
+                }
+            ]
+        }
+
+        res = self.client.post(ROSTER_URL, payload, format="json")
+
+        self.assertEqual(res.data, {"created": 1})
+        self.assertEqual(self.morning.crew.count(), 2)
+
+    def test_overlapping_flight_is_rejected(self):
+        overlapping = sample_flight(
+            departure_time="2025-06-05T12:00:00Z",
+            arrival_time="2025-06-05T16:00:00Z",
+        )
+        self.morning.crew.add(self.crew[0])
+        payload = {
+            "assignments": [
+                {"flight": self.evening.id, "crew": [self.crew[1].id]},
+                {"flight": overlapping.id, "crew": [self.crew[0].id]},
+            ]
+        }
+
+        res = self.client.post(ROSTER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["conflicts"],
+            [
+                f"Crew member {self.crew[0].id} has another flight "
+                f"overlapping flight {overlapping.id}."
+            ],
+        )
+        self.assertFalse(self.evening.crew.exists())
+
+    def test_overlaps_within_the_request_are_rejected(self):
+        overlapping = sample_flight(
+            departure_time="2025-06-05T12:00:00Z",
+            arrival_time="2025-06-05T16:00:00Z",
+        )
+        payload = {
+            "assignments": [
+                {"flight": self.morning.id, "crew": [self.crew[0].id]},
+                {"flight": overlapping.id, "crew": [self.crew[0].id]},
+            ]
+        }
+
+        res = self.client.post(ROSTER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(FlightCrew.objects.exists())
+
+    def test_back_to_back_flights_do_not_overlap(self):
+        connecting = sample_flight(
+            departure_time="2025-06-05T13:30:00Z",
+            arrival_time="2025-06-05T15:00:00Z",
+        )
+        payload = {
+            "assignments": [
+                {"flight": flight.id, "crew": [self.crew[0].id]}
+                for flight in (self.morning, connecting, self.evening)
+            ]
+        }
+
+        res = self.client.post(ROSTER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"created": 3})
+
+    def test_flight_with_busy_crew_is_rejected(self):
+        self.morning.crew.add(self.crew[0])
+        payload = {
+            "route": self.morning.route_id,
+            "airplane": self.morning.airplane_id,
+            "crew": [self.crew[0].id],
+            "departure_time": "2025-06-05T12:00:00Z",
+            "arrival_time": "2025-06-05T16:00:00Z",
+        }
+
+        res = self.client.post(FLIGHT_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["conflicts"],
+            [
+                f"Crew member {self.crew[0].id} has another flight "
+                f"at that time."
+            ],
+        )
+        self.assertEqual(FlightCrew.objects.count(), 1)
+
+    def test_rescheduling_into_an_overlap_is_rejected(self):
+        self.morning.crew.add(self.crew[0])
+        self.evening.crew.add(self.crew[0])
+
+        res = self.client.patch(
+            reverse("airport:flights-detail", args=[self.evening.id]),
+            {"departure_time": "2025-06-05T12:00:00Z"},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.evening.refresh_from_db()
+        self.assertEqual(self.evening.departure_time.hour, 15)
+
+    def test_unknown_ids_are_rejected(self):
+        payload = {
+            "assignments": [
+                {"flight": self.morning.id + 100, "crew": [0]},
+            ]
+        }
+
+        res = self.client.post(ROSTER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("flight", res.data["assignments"])
+        self.assertIn("crew", res.data["assignments"])
+
+    def test_roster_forbidden_for_regular_user(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test@test.test",
+                password="testpassword",
+            )
+        )
+        payload = {
+            "assignments": [
+                {"flight": self.morning.id, "crew": [self.crew[0].id]},
+            ]
+        }
+
+        res = self.client.post(ROSTER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class FlightCrewTimesTests(TestCase):
+    def test_crew_add_copies_flight_times(self):
+        flight = sample_flight()
+        crew = sample_crew()
+
+        flight.crew.add(crew)
+        crew.flights.add(sample_flight())
+
+        self.assertFalse(
+            FlightCrew.objects.filter(departure_time__isnull=True).exists()
+        )
+
+    def test_rescheduling_a_flight_moves_its_crew(self):
+        flight = sample_flight()
+        flight.crew.add(sample_crew())
+
+        flight.departure_time = "2025-06-06T09:00:00Z"
+        flight.arrival_time = "2025-06-06T13:30:00Z"
+        flight.save()
+
+        assignment = FlightCrew.objects.get(flight=flight)
+        self.assertEqual(assignment.departure_time.day, 6)
+        self.assertEqual(assignment.arrival_time.day, 6)
+
+
+class ResolveCrewOverlapsTests(TestCase):
+    def setUp(self):
+        self.crew = sample_crew()
+        self.morning = sample_flight()
+        self.overlapping = sample_flight(
+            departure_time="2025-06-05T12:00:00Z",
+            arrival_time="2025-06-05T14:00:00Z",
+        )
+        # Rows from before the overlap checks existed
+        FlightCrew.objects.bulk_create(
+            [
+                FlightCrew(
+                    flight=flight,
+                    crew=self.crew,
+                    departure_time=flight.departure_time,
+                    arrival_time=flight.arrival_time,
+                )
+                for flight in (self.morning, self.overlapping)
+            ]
+        )
+
+    def test_overlaps_are_listed_without_removing(self):
+        stdout = StringIO()
+
+        with self.assertRaisesMessage(CommandError, "1 overlapping"):
+            call_command("resolve_crew_overlaps", stdout=stdout)
+
+        self.assertIn(
+            f"flight {self.overlapping.id} overlaps flight {self.morning.id}",
+            stdout.getvalue(),
+        )
+        self.assertEqual(FlightCrew.objects.count(), 2)
+
+    def test_remove_keeps_the_earlier_flight(self):
+        call_command("resolve_crew_overlaps", "--remove", stdout=StringIO())
+
+        self.assertEqual(
+            list(FlightCrew.objects.values_list("flight_id", flat=True)),
+            [self.morning.id],
+        )
+
+
+class FlightAdminCrewTests(TestCase):
+    def setUp(self):
+        self.client.force_login(
+            get_user_model().objects.create_superuser(
+                "admin@myproject.com", "password"
+            )
+        )
+        self.crew = sample_crew()
+        sample_flight().crew.add(self.crew)
+        self.flight = sample_flight(
+            departure_time="2025-06-05T15:00:00Z",
+            arrival_time="2025-06-05T18:00:00Z",
+        )
+
+    def post(self, departure_time):
+        prefix = "flightcrew_set"
+        return self.client.post(
+            reverse("admin:airport_flight_change", args=[self.flight.id]),
+            {
+                "route": self.flight.route_id,
+                "airplane": self.flight.airplane_id,
+                "departure_time_0": "2025-06-05",
+                "departure_time_1": departure_time,
+                "arrival_time_0": "2025-06-05",
+                "arrival_time_1": "18:00:00",
+                f"{prefix}-TOTAL_FORMS": 1,
+                f"{prefix}-INITIAL_FORMS": 0,
+                f"{prefix}-0-crew": self.crew.id,
+            },
+        )
+
+    def test_busy_crew_is_a_form_error(self):
+        res = self.post("10:00:00")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertContains(res, "has another flight at that time")
+        self.assertFalse(self.flight.crew.exists())
+
+    def test_free_crew_is_saved(self):
+        res = self.post("15:00:00")
+
+        self.assertEqual(res.status_code, 302)
+        self.assertEqual(list(self.flight.crew.all()), [self.crew])
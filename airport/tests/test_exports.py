@@ -0,0 +1,111 @@
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Order, Ticket
+from airport.tests.test_flight_and_crew_api import sample_flight
+
+
+def export_url(dataset, file_format):
+    return reverse(
+        "airport:exports",
+        kwargs={"dataset": dataset, "file_format": file_format},
+    )
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            email="admin@test.test",
+            password="testpassword",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.admin)
+        self.flight = sample_flight()
+        self.order = Order.objects.create(user=self.admin)
+        for seat in (1, 2):
+            Ticket.objects.create(
+                row=1, seat=seat, flight=self.flight, order=self.order
+            )
+
+    def get_content(self, url, params=None):
+        res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return b"".join(res.streaming_content).decode()
+
+    def test_tickets_csv(self):
+        content = self.get_content(export_url("tickets", "csv"))
+
+        rows = list(csv.reader(content.splitlines()))
+        self.assertEqual(
+            rows[0], ["id", "order_id", "user_id", "flight_id", "row", "seat"]
+        )
+        self.assertEqual(
+            [row[-2:] for row in rows[1:]], [["1", "1"], ["1", "2"]]
+        )
+
+    def test_flights_ndjson(self):
+        content = self.get_content(export_url("flights", "ndjson"))
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["id"], self.flight.id)
+        self.assertEqual(rows[0]["departure_airport"], "Source City")
+        self.assertEqual(rows[0]["departure_time"], "2025-06-05T09:00:00Z")
+        self.assertEqual(rows[0]["seats_sold"], 2)
+
+    def test_flights_export_filtered_by_date(self):
+        content = self.get_content(
+            export_url("flights", "ndjson"), {"date-from": "2025-06-06"}
+        )
+
+        self.assertEqual(content, "")
+
+    def test_orders_csv_counts_tickets(self):
+        content = self.get_content(export_url("orders", "csv"))
+
+        rows = list(csv.DictReader(content.splitlines()))
+        self.assertEqual(rows[0]["user_email"], self.admin.email)
+        self.assertEqual(rows[0]["ticket_count"], "2")
+
+    def test_export_is_admin_only(self):
+        user = get_user_model().objects.create_user(
+            email="user@test.test",
+            password="testpassword",
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(export_url("tickets", "csv"))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_command_matches_endpoint(self):
+        expected = self.get_content(export_url("tickets", "ndjson"))
+        stdout = StringIO()
+
+        call_command(
+            "export_data", "tickets", "--format", "ndjson", stdout=stdout
+        )
+
+        self.assertEqual(stdout.getvalue(), expected)
+
+    def test_export_command_writes_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "orders.csv")
+
+            call_command(
+                "export_data", "orders", "--output", path, "--chunk-size", "1"
+            )
+
+            with open(path, newline="") as output:
+                self.assertEqual(len(list(csv.reader(output))), 2)
@@ -1,18 +1,22 @@
+import base64
 import os
+import shutil
 import tempfile
 
 from PIL import Image
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
-from airport.models import Crew, Flight
+from airport.models import Airplane, Crew, Flight, Order, Ticket
 from airport.serializers import CrewListSerializer, FlightListSerializer, FlightDetailSerializer
 from airport.tests.test_airplane_api import sample_airplane
 from airport.tests.test_airport_and_route_api import sample_route, sample_airport
 from airport.views import FlightViewSet
 
+MEDIA_ROOT = tempfile.mkdtemp()
 CREW_URL = reverse("airport:crews-list")
 FLIGHT_URL = reverse("airport:flights-list")
 
@@ -22,6 +26,9 @@ def detail_crew_url(crew_id):
 def detail_flight_url(flight_id):
     return reverse("airport:flights-detail", args=[flight_id])
 
+def seats_url(flight_id):
+    return reverse("airport:flights-seats", args=[flight_id])
+
 def sample_crew(**params):
     defaults = {
         "first_name": "John",
@@ -129,6 +136,17 @@ class BaseFlightApiTests(TestCase):
         self.assertIn(flight_2.id, res_departure_date_ids)
         self.assertNotIn(flight_3, res_departure_date_ids)
 
+    def test_filter_flights_by_malformed_date(self):
+        for params in (
+            {"date": "June 5"},
+            {"date-from": "2025-13-01"},
+            {"date-to": "2025-06-5x"},
+            {"departure-airport": "1,a"},
+        ):
+            res = self.client.get(FLIGHT_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class UnauthenticatedFlightApiTests(BaseFlightApiTests):
     def authenticate(self):
@@ -247,6 +265,7 @@ class AdminAirportTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
 
 
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_RENDITION_WORKERS=0)
 class CrewImageUploadTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -258,6 +277,7 @@ class CrewImageUploadTests(TestCase):
 
     def tearDown(self):
         self.crew.image.delete()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
 
     def test_upload_image_to_crew(self):
         """Test uploading an image to crew"""
@@ -301,3 +321,49 @@ class CrewImageUploadTests(TestCase):
         res = self.client.get(CREW_URL)
 
         self.assertIn("image", res.data["results"][0].keys())
+
+
+class FlightSeatMapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test",
+            password="testpassword",
+        )
+        self.flight = sample_flight(
+            airplane=sample_airplane(rows=2, seats_in_row=5)
+        )
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        Ticket.objects.create(row=2, seat=4, flight=self.flight, order=order)
+
+    def test_seat_map_bitmap(self):
+        res = self.client.get(seats_url(self.flight.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["rows"], 2)
+        self.assertEqual(res.data["seats_in_row"], 5)
+        # bits 0 and 8 set: 1000_0000 1000_0000
+        self.assertEqual(base64.b64decode(res.data["occupied"]), b"\x80\x80")
+
+    def test_seat_map_skips_seats_outside_smaller_airplane(self):
+        Airplane.objects.filter(pk=self.flight.airplane_id).update(
+            rows=1, seats_in_row=3
+        )
+
+        res = self.client.get(seats_url(self.flight.id), {"layout": "rows"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["seats"], [[True, False, False]])
+
+    def test_seat_map_rows_layout(self):
+        res = self.client.get(seats_url(self.flight.id), {"layout": "rows"})
+
+        self.assertEqual(
+            res.data["seats"],
+            [
+                [True, False, False, False, False],
+                [False, False, False, True, False],
+            ],
+        )
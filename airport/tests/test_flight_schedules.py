@@ -0,0 +1,193 @@
+from datetime import date, datetime, time, timedelta, timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Flight, FlightSchedule
+from airport.schedules import generate_flights
+from airport.tests.test_airplane_api import sample_airplane
+from airport.tests.test_airport_and_route_api import sample_route
+from airport.tests.test_flight_and_crew_api import sample_crew
+
+SCHEDULE_URL = reverse("airport:flight_schedules-list")
+
+# A Monday
+TODAY = date(2030, 1, 7)
+
+
+def generate_url(schedule_id):
+    return reverse("airport:flight_schedules-generate", args=[schedule_id])
+
+
+def sample_schedule(**params):
+    defaults = {
+        "route": sample_route(),
+        "airplane": sample_airplane(),
+        "weekdays": "135",
+        "departure_time": time(8, 30),
+        "block_time": timedelta(hours=2, minutes=15),
+        "valid_from": TODAY,
+        "valid_until": TODAY + timedelta(days=60),
+    }
+    defaults.update(params)
+    return FlightSchedule.objects.create(**defaults)
+
+
+class FlightScheduleGeneratorTests(TestCase):
+    def setUp(self):
+        self.schedule = sample_schedule()
+        self.crew = [sample_crew(), sample_crew(first_name="Jane")]
+        self.schedule.crew.set(self.crew)
+
+    def test_generates_flights_on_schedule_weekdays(self):
+        created = generate_flights(days=13, today=TODAY)
+
+        flights = list(Flight.objects.filter(schedule=self.schedule))
+        self.assertEqual(created, 6)
+        self.assertEqual(
+            [flight.departure_time.isoweekday() for flight in flights],
+            [1, 3, 5, 1, 3, 5],
+        )
+        self.assertEqual(flights[0].departure_time.time(), time(8, 30))
+        self.assertEqual(
+            flights[0].arrival_time - flights[0].departure_time,
+            timedelta(hours=2, minutes=15),
+        )
+        self.assertEqual(
+            set(flights[-1].crew.all()), set(self.crew)
+        )
+
+    def test_rerun_only_adds_new_dates(self):
+        generate_flights(days=6, today=TODAY)
+
+        self.assertEqual(generate_flights(days=6, today=TODAY), 0)
+        self.assertEqual(generate_flights(days=13, today=TODAY), 3)
+        self.assertEqual(
+            Flight.objects.filter(schedule=self.schedule).count(), 6
+        )
+        self.schedule.refresh_from_db()
+        self.assertEqual(
+            self.schedule.generated_until, TODAY + timedelta(days=13)
+        )
+
+    def test_query_count_does_not_grow_with_flights(self):
+        other = sample_schedule(weekdays="1234567")
+        other.crew.set([sample_crew(first_name="Ivan")])
+
+        with self.assertNumQueries(10):
+            created = generate_flights(days=30, today=TODAY)
+
+        self.assertEqual(created, 14 + 31)
+
+    def test_crew_on_overlapping_flight_left_off(self):
+        busy = Flight.objects.create(
+            route=self.schedule.route,
+            airplane=self.schedule.airplane,
+            departure_time=datetime(2030, 1, 7, 9, tzinfo=timezone.utc),
+            arrival_time=datetime(2030, 1, 7, 12, tzinfo=timezone.utc),
+        )
+        busy.crew.add(self.crew[0])
+        messages = []
+
+        self.assertEqual(
+            generate_flights(days=2, today=TODAY, log=messages.append), 2
+        )
+
+        monday, wednesday = Flight.objects.filter(schedule=self.schedule)
+        self.assertEqual(list(monday.crew.all()), [self.crew[1]])
+        self.assertEqual(set(wednesday.crew.all()), set(self.crew))
+        self.assertEqual(
+            messages,
+            [
+                f"Crew member {self.crew[0].id} left off flight "
+                f"{monday.id}: it overlaps another of their flights."
+            ],
+        )
+
+    def test_validity_range_respected(self):
+        self.schedule.valid_until = TODAY + timedelta(days=2)
+        self.schedule.save()
+
+        self.assertEqual(generate_flights(days=30, today=TODAY), 2)
+
+    def test_generate_flights_command(self):
+        stdout = StringIO()
+
+        call_command(
+            "generate_flights",
+            "--days", "0",
+            "--schedule", str(self.schedule.id),
+            stdout=stdout,
+        )
+
+        self.assertIn("Generated", stdout.getvalue())
+
+
+class FlightScheduleApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            email="admin@test.test",
+            password="testpassword",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.admin)
+
+    def test_create_schedule(self):
+        payload = {
+            "route": sample_route().id,
+            "airplane": sample_airplane().id,
+            "weekdays": "67",
+            "departure_time": "21:05",
+            "block_time": "01:50:00",
+            "valid_from": "2030-01-01",
+            "valid_until": "2030-03-31",
+        }
+
+        res = self.client.post(SCHEDULE_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(res.data["generated_until"])
+
+    def test_invalid_weekdays_rejected(self):
+        schedule = sample_schedule()
+
+        res = self.client.patch(
+            reverse("airport:flight_schedules-detail", args=[schedule.id]),
+            {"weekdays": "118"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("weekdays", res.data)
+
+    def test_generate_action(self):
+        schedule = sample_schedule(
+            valid_from=date.today(),
+            valid_until=date.today() + timedelta(days=365),
+            weekdays="1234567",
+        )
+
+        res = self.client.post(generate_url(schedule.id) + "?days=9")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"created": 10})
+
+    def test_generate_action_admin_only(self):
+        schedule = sample_schedule()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="user@test.test",
+                password="testpassword",
+            )
+        )
+
+        res = self.client.post(generate_url(schedule.id))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from airport.models import Order, Ticket
+from airport.tests.test_airport_and_route_api import (
+    sample_airport,
+    sample_route,
+)
+from airport.tests.test_flight_and_crew_api import sample_flight
+
+FLIGHT_URL = reverse("airport:flights-list")
+
+
+class FlightSearchCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.airport_1 = sample_airport(name="Airport 1")
+        self.airport_2 = sample_airport(name="Airport 2")
+        self.flight_1 = sample_flight(
+            route=sample_route(source=self.airport_1)
+        )
+        self.flight_2 = sample_flight(
+            route=sample_route(source=self.airport_2)
+        )
+
+    def test_normalized_search_is_served_from_cache(self):
+        first = self.client.get(
+            FLIGHT_URL,
+            {"departure-airport": f"{self.airport_2.id},{self.airport_1.id}"},
+        )
+
+        with self.assertNumQueries(0):
+            second = self.client.get(
+                FLIGHT_URL,
+                {
+                    "departure-airport": (
+                        f"{self.airport_1.id},{self.airport_2.id},"
+                        f"{self.airport_1.id}"
+                    )
+                },
+            )
+
+        self.assertEqual(first.data, second.data)
+
+    def test_booking_invalidates_only_pages_with_that_flight(self):
+        search_1 = {"departure-airport": self.airport_1.id}
+        search_2 = {"departure-airport": self.airport_2.id}
+        self.client.get(FLIGHT_URL, search_1)
+        self.client.get(FLIGHT_URL, search_2)
+
+        user = get_user_model().objects.create_user(
+            email="test@test.test",
+            password="testpassword",
+        )
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            flight=self.flight_1,
+            order=Order.objects.create(user=user),
+        )
+
+        with self.assertNumQueries(0):
+            self.client.get(FLIGHT_URL, search_2)
+
+        res = self.client.get(FLIGHT_URL, search_1)
+        self.assertEqual(
+            res.data["results"][0]["tickets_available"],
+            self.flight_1.airplane.capacity - 1,
+        )
+
+    def test_roles_do_not_share_entries(self):
+        self.client.get(FLIGHT_URL)
+        staff = get_user_model().objects.create_superuser(
+            "admin@myproject.com", "password"
+        )
+        self.client.force_authenticate(staff)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(FLIGHT_URL)
+
+        self.assertTrue(queries)
@@ -0,0 +1,146 @@
+import os
+import shutil
+import struct
+import tempfile
+import zlib
+from io import BytesIO
+
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from airport.tests.test_airport_and_route_api import sample_airport
+from airport.uploads import ImageTooLarge, ImageUploadHandler
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def png_header(width, height):
+    """PNG claiming width x height pixels, with almost no pixel data"""
+    def chunk(kind, data):
+        return (
+            struct.pack(">I", len(data)) + kind + data
+            + struct.pack(">I", zlib.crc32(kind + data))
+        )
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(b"\x00" * 1024))
+        + chunk(b"IEND", b"")
+    )
+
+
+def upload_file(content, name="photo.png"):
+    upload = BytesIO(content)
+    upload.name = name
+    return upload
+
+
+def png(size):
+    output = BytesIO()
+    Image.effect_noise(size, 64).save(output, format="PNG")
+    return output.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_RENDITION_WORKERS=0)
+class ImageUploadLimitTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                "admin@myproject.com", "password"
+            )
+        )
+        self.airport = sample_airport()
+
+    def upload(self, content):
+        return self.client.post(
+            reverse("airport:airports-upload-image", args=[self.airport.id]),
+            {"image": upload_file(content)},
+            format="multipart",
+        )
+
+    def test_image_within_limits_is_stored(self):
+        res = self.upload(png((64, 48)))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.airport.refresh_from_db()
+        self.assertTrue(os.path.exists(self.airport.image.path))
+
+    @override_settings(IMAGE_UPLOAD_MAX_BYTES=20 * 1024)
+    def test_too_many_bytes_rejected(self):
+        res = self.upload(png((200, 200)))
+
+        self.assertEqual(
+            res.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+        self.airport.refresh_from_db()
+        self.assertFalse(self.airport.image)
+
+    @override_settings(IMAGE_UPLOAD_MAX_DIMENSION=100)
+    def test_too_wide_rejected(self):
+        res = self.upload(png((101, 10)))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("image", res.data)
+
+    def test_decompression_bomb_rejected_from_header(self):
+        res = self.upload(png_header(50000, 50000))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("pixels", str(res.data["image"]))
+
+    def test_non_image_file_rejected(self):
+        res = self.upload(b"%PDF-1.4 " + b"x" * 1000)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("image", res.data)
+
+
+class ImageUploadHandlerTests(TestCase):
+    def handler(self):
+        handler = ImageUploadHandler(RequestFactory().post("/"))
+        handler.new_file("image", "photo.png", "image/png", None)
+        return handler
+
+    def test_streams_chunks_to_temporary_file(self):
+        content = png((300, 300))
+        handler = self.handler()
+
+        for start in range(0, len(content), handler.chunk_size):
+            handler.receive_data_chunk(
+                content[start:start + handler.chunk_size], start
+            )
+        upload = handler.file_complete(len(content))
+
+        self.assertIsInstance(upload, TemporaryUploadedFile)
+        self.assertIsNone(handler.header)
+        with open(upload.temporary_file_path(), "rb") as stored:
+            self.assertEqual(stored.read(), content)
+        upload.close()
+
+    def test_bomb_rejected_on_first_chunk(self):
+        handler = self.handler()
+
+        with self.assertRaises(ValidationError):
+            handler.receive_data_chunk(png_header(40000, 40000), 0)
+
+    @override_settings(IMAGE_UPLOAD_MAX_BYTES=1000)
+    def test_declared_length_rejected_before_reading(self):
+        handler = ImageUploadHandler(RequestFactory().post("/"))
+
+        with self.assertRaises(ImageTooLarge):
+            handler.handle_raw_input(None, {}, 10 ** 9, b"boundary")
@@ -0,0 +1,242 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from airport.models import (
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    FlightCrew,
+    FlightSchedule,
+    Route,
+)
+
+
+class ImportScheduleTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.airports = self.write_csv(
+            "airports.csv",
+            ("name", "closest_big_city"),
+            [("Heathrow", "London"), ("Boryspil", "Kyiv")],
+        )
+        self.routes = self.write_csv(
+            "routes.csv",
+            ("source", "destination", "distance"),
+            [("Heathrow", "Boryspil", 2140), ("Boryspil", "Heathrow", 2140)],
+        )
+        self.airplanes = self.write_json(
+            "airplanes.json",
+            [
+                {
+                    "name": "UR-PSA",
+                    "rows": 30,
+                    "seats_in_row": 6,
+                    "airplane_type": "Boeing 737",
+                }
+            ],
+        )
+        self.flights = self.write_csv(
+            "flights.csv",
+            ("source", "destination", "airplane", "departure_time",
+             "arrival_time"),
+            [
+                ("Heathrow", "Boryspil", "UR-PSA",
+                 f"2025-07-{day:02}T08:00:00Z", f"2025-07-{day:02}T11:30:00Z")
+                for day in range(1, 11)
+            ],
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_csv(self, name, header, rows):
+        path = os.path.join(self.directory, name)
+        with open(path, "w", newline="") as output:
+            writer = csv.writer(output)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return path
+
+    def write_json(self, name, rows):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as output:
+            json.dump(rows, output)
+        return path
+
+    def run_import(self, *args):
+        stdout = StringIO()
+        call_command(
+            "import_schedule",
+            "--airports", self.airports,
+            "--routes", self.routes,
+            "--airplanes", self.airplanes,
+            "--flights", self.flights,
+            "--batch-size", "4",
+            *args,
+            stdout=stdout,
+        )
+        return stdout.getvalue()
+
+    def test_import_resolves_natural_keys(self):
+        output = self.run_import()
+
+        self.assertEqual(Airport.objects.count(), 2)
+        self.assertEqual(Route.objects.count(), 2)
+        self.assertEqual(AirplaneType.objects.get().name, "Boeing 737")
+        self.assertEqual(Flight.objects.count(), 10)
+        flight = Flight.objects.select_related("route__source").first()
+        self.assertEqual(flight.route.source.name, "Heathrow")
+        self.assertEqual(flight.airplane.name, "UR-PSA")
+        self.assertIn("flights: 10 created", output)
+        self.assertIn("rows/s", output)
+
+    def test_rerun_skips_existing_rows(self):
+        self.run_import()
+
+        output = self.run_import()
+
+        self.assertEqual(Flight.objects.count(), 10)
+        self.assertIn("flights: 0 created, 0 updated, 10 skipped", output)
+
+    def test_upsert_updates_existing_rows(self):
+        self.run_import()
+        self.airports = self.write_csv(
+            "airports.csv",
+            ("name", "closest_big_city"),
+            [("Heathrow", "Greater London")],
+        )
+
+        output = self.run_import("--upsert")
+
+        self.assertEqual(
+            Airport.objects.get(name="Heathrow").closest_big_city,
+            "Greater London",
+        )
+        self.assertIn("airports: 0 created, 1 updated", output)
+        self.assertEqual(Flight.objects.count(), 10)
+
+    def test_upsert_moves_flight_crew(self):
+        self.run_import()
+        flight = Flight.objects.get(departure_time__day=1)
+        flight.crew.add(Crew.objects.create(first_name="Ann", last_name="Lee"))
+        self.write_later_arrivals("13:00")
+
+        self.run_import("--upsert")
+
+        self.assertEqual(
+            FlightCrew.objects.get().arrival_time,
+            Flight.objects.get(pk=flight.pk).arrival_time,
+        )
+        self.assertEqual(FlightCrew.objects.get().arrival_time.hour, 13)
+
+    def test_upsert_into_crew_overlap_rolls_back(self):
+        self.run_import()
+        crew = Crew.objects.create(first_name="Ann", last_name="Lee")
+        flight = Flight.objects.get(departure_time__day=1)
+        flight.crew.add(crew)
+        Flight.objects.create(
+            route=Route.objects.first(),
+            airplane=Flight.objects.first().airplane,
+            departure_time="2025-07-01T12:00:00Z",
+            arrival_time="2025-07-01T13:00:00Z",
+        ).crew.add(crew)
+        self.write_later_arrivals("13:00")
+
+        with self.assertRaisesMessage(CommandError, "overlapping flights"):
+            self.run_import("--upsert")
+
+        self.assertEqual(
+            FlightCrew.objects.get(flight=flight).arrival_time.hour, 11
+        )
+
+    def write_later_arrivals(self, arrival):
+        self.flights = self.write_csv(
+            "flights.csv",
+            ("source", "destination", "airplane", "departure_time",
+             "arrival_time"),
+            [("Heathrow", "Boryspil", "UR-PSA", "2025-07-01T08:00:00Z",
+              f"2025-07-01T{arrival}:00Z")],
+        )
+
+    def test_flight_batches_use_constant_queries(self):
+        self.run_import()
+        Flight.objects.all().delete()
+
+        # Savepoint and release, three lookup tables, then one existence
+        # query and one insert per batch of four flights
+        with self.assertNumQueries(2 + 3 + 3 * 2):
+            call_command(
+                "import_schedule",
+                "--flights", self.flights,
+                "--batch-size", "4",
+                stdout=StringIO(),
+            )
+
+    def test_unknown_airport_rolls_back(self):
+        self.routes = self.write_csv(
+            "routes.csv",
+            ("source", "destination", "distance"),
+            [("Heathrow", "Gatwick", 40)],
+        )
+
+        with self.assertRaisesMessage(CommandError, "unknown airport"):
+            self.run_import()
+
+        self.assertFalse(Airport.objects.exists())
+
+    def test_json_must_be_list_of_objects(self):
+        self.airplanes = self.write_json("airplanes.json", {"rows": []})
+
+        with self.assertRaisesMessage(CommandError, "list of objects"):
+            self.run_import()
+
+        self.airplanes = self.write_json("airplanes.json", [["UR-PSA"]])
+
+        with self.assertRaisesMessage(CommandError, "row 1: expected"):
+            self.run_import()
+
+    def test_import_schedules(self):
+        self.run_import()
+        schedules = self.write_csv(
+            "schedules.csv",
+            ("source", "destination", "airplane", "weekdays",
+             "departure_time", "block_time", "valid_from", "valid_until"),
+            [("Heathrow", "Boryspil", "UR-PSA", "246", "07:15", "03:30:00",
+              "2030-01-01", "2030-03-31")],
+        )
+
+        call_command(
+            "import_schedule", "--schedules", schedules, stdout=StringIO()
+        )
+        call_command(
+            "import_schedule", "--schedules", schedules, stdout=StringIO()
+        )
+
+        schedule = FlightSchedule.objects.get()
+        self.assertEqual(schedule.weekdays, "246")
+        self.assertEqual(schedule.block_time, timedelta(hours=3, minutes=30))
+
+    def test_invalid_schedule_rejected(self):
+        self.run_import()
+        schedules = self.write_csv(
+            "schedules.csv",
+            ("source", "destination", "airplane", "weekdays",
+             "departure_time", "block_time", "valid_from", "valid_until"),
+            [("Heathrow", "Boryspil", "UR-PSA", "9", "07:15", "03:30:00",
+              "2030-01-01", "2030-03-31")],
+        )
+
+        with self.assertRaisesMessage(CommandError, "row 1: Use distinct"):
+            call_command(
+                "import_schedule", "--schedules", schedules, stdout=StringIO()
+            )
@@ -0,0 +1,155 @@
+from datetime import date, datetime
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.itineraries import FlightIndex, flight_index
+from airport.models import Flight, Route
+from airport.tests.test_airplane_api import sample_airplane
+from airport.tests.test_airport_and_route_api import sample_airport
+
+ITINERARY_URL = reverse("airport:flights-itineraries")
+
+
+class ItinerarySearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        flight_index.invalidate_routes()
+        self.client = APIClient()
+        self.airplane = sample_airplane()
+        self.a, self.b, self.c, self.d = (
+            sample_airport(name=name) for name in "ABCD"
+        )
+
+    def flight(self, source, destination, departure, arrival, distance=1000):
+        route, _ = Route.objects.get_or_create(
+            source=source,
+            destination=destination,
+            defaults={"distance": distance},
+        )
+        return Flight.objects.create(
+            route=route,
+            airplane=self.airplane,
+            departure_time=f"2025-06-05T{departure}:00Z",
+            arrival_time=f"2025-06-05T{arrival}:00Z",
+        )
+
+    def search(self, **params):
+        defaults = {
+            "departure-airport": self.a.id,
+            "arrival-airport": self.d.id,
+            "date": "2025-06-05",
+        }
+        defaults.update(params)
+        return self.client.get(ITINERARY_URL, defaults)
+
+    @staticmethod
+    def flight_ids(itinerary):
+        return [flight["id"] for flight in itinerary["flights"]]
+
+    def test_direct_and_one_stop_sorted_by_duration(self):
+        leg_1 = self.flight(self.a, self.b, "08:00", "10:00", 500)
+        leg_2 = self.flight(self.b, self.d, "11:00", "13:00", 500)
+        direct = self.flight(self.a, self.d, "09:00", "15:00", 800)
+
+        res = self.search()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [self.flight_ids(itinerary) for itinerary in res.data],
+            [[leg_1.id, leg_2.id], [direct.id]],
+        )
+        self.assertEqual(res.data[0]["stops"], 1)
+        self.assertEqual(res.data[0]["distance"], 1000)
+
+        res = self.search(sort="distance")
+        self.assertEqual(self.flight_ids(res.data[0]), [direct.id])
+
+    def test_layover_window_is_respected(self):
+        self.flight(self.a, self.b, "08:00", "10:00")
+        self.flight(self.b, self.d, "10:20", "12:00")
+        self.flight(self.b, self.d, "18:00", "20:00")
+
+        self.assertEqual(self.search().data, [])
+        self.assertEqual(len(self.search(**{"min-layover": 10}).data), 1)
+        self.assertEqual(len(self.search(**{"max-layover": 600}).data), 1)
+
+    def test_two_stop_connection(self):
+        legs = [
+            self.flight(self.a, self.b, "06:00", "07:00"),
+            self.flight(self.b, self.c, "08:00", "09:00"),
+            self.flight(self.c, self.d, "10:00", "11:00"),
+        ]
+
+        res = self.search()
+        self.assertEqual(
+            [self.flight_ids(itinerary) for itinerary in res.data],
+            [[leg.id for leg in legs]],
+        )
+        self.assertEqual(self.search(**{"max-stops": 1}).data, [])
+
+    def test_index_picks_up_new_flights(self):
+        self.assertEqual(self.search().data, [])
+
+        direct = self.flight(self.a, self.d, "09:00", "15:00")
+
+        self.assertEqual(self.flight_ids(self.search().data[0]), [direct.id])
+
+    def test_index_picks_up_routes_created_without_signals(self):
+        self.search(date="2025-06-04")
+        route = Route.objects.bulk_create(
+            [Route(source=self.a, destination=self.d, distance=800)]
+        )[0]
+        direct = Flight.objects.create(
+            route=route,
+            airplane=self.airplane,
+            departure_time="2025-06-05T09:00:00Z",
+            arrival_time="2025-06-05T15:00:00Z",
+        )
+
+        res = self.search()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.flight_ids(res.data[0]), [direct.id])
+
+    def test_search_stops_after_max_paths(self):
+        for hour in range(6, 10):
+            self.flight(self.a, self.d, f"0{hour}:00", f"{hour + 10}:00")
+
+        with override_settings(ITINERARY_SEARCH_MAX_PATHS=2):
+            res = self.search()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 2)
+        self.assertEqual(len(self.search().data), 4)
+
+    def test_index_keeps_most_recently_used_days(self):
+        direct = self.flight(self.a, self.d, "09:00", "15:00")
+        index = FlightIndex(max_days=2)
+
+        for day in (5, 4, 5, 3):
+            noon = timezone.make_aware(datetime(2025, 6, day, 12))
+            list(index.departures(self.a.id, noon, noon))
+        self.assertEqual(
+            list(index._buckets), [date(2025, 6, 5), date(2025, 6, 3)]
+        )
+        self.assertIn(direct.id, index._flight_days)
+
+        list(index.departures(
+            self.a.id,
+            timezone.make_aware(datetime(2025, 6, 1, 12)),
+            timezone.make_aware(datetime(2025, 6, 2, 12)),
+        ))
+        self.assertEqual(
+            list(index._buckets), [date(2025, 6, 1), date(2025, 6, 2)]
+        )
+        self.assertEqual(index._flight_days, {})
+
+    def test_missing_parameters(self):
+        res = self.client.get(ITINERARY_URL, {"date": "2025-06-05"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
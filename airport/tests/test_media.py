@@ -0,0 +1,182 @@
+import os
+import shutil
+import tempfile
+import uuid
+
+from django.test import TestCase, override_settings
+from django.utils.http import http_date
+
+from airport_api_service.media import parse_range
+
+MEDIA_ROOT = tempfile.mkdtemp()
+STATIC_ROOT = tempfile.mkdtemp()
+CONTENT = bytes(range(256)) * 4
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_CACHE_MAX_AGE=3600)
+class MediaServingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.name = f"uploads/airports/lviv-{uuid.uuid4()}.jpg"
+        os.makedirs(os.path.join(MEDIA_ROOT, "uploads/airports"))
+        with open(os.path.join(MEDIA_ROOT, cls.name), "wb") as image:
+            image.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def get(self, path=None, **headers):
+        return self.client.get(
+            f"/media/{path or self.name}", headers=headers
+        )
+
+    def test_file_served_with_immutable_cache_headers(self):
+        res = self.get()
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT)
+        self.assertEqual(res["Content-Type"], "image/jpeg")
+        self.assertEqual(res["Content-Length"], str(len(CONTENT)))
+        self.assertEqual(res["Accept-Ranges"], "bytes")
+        self.assertEqual(
+            res["Cache-Control"], "public, max-age=3600, immutable"
+        )
+
+    def test_byte_range(self):
+        res = self.get(Range="bytes=100-199")
+
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT[100:200])
+        self.assertEqual(res["Content-Length"], "100")
+        self.assertEqual(
+            res["Content-Range"], f"bytes 100-199/{len(CONTENT)}"
+        )
+
+    def test_suffix_range(self):
+        res = self.get(Range="bytes=-24")
+
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT[-24:])
+
+    def test_unsatisfiable_range(self):
+        res = self.get(Range=f"bytes={len(CONTENT)}-")
+
+        self.assertEqual(res.status_code, 416)
+        self.assertEqual(res["Content-Range"], f"bytes */{len(CONTENT)}")
+
+    def test_stale_if_range_sends_whole_file(self):
+        res = self.get(Range="bytes=0-9", If_Range='"outdated"')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT)
+
+    def test_conditional_request_not_modified(self):
+        etag = self.get()["ETag"]
+
+        res = self.get(If_None_Match=etag)
+
+        self.assertEqual(res.status_code, 304)
+        self.assertIn("immutable", res["Cache-Control"])
+
+    def test_head_has_no_body(self):
+        res = self.client.head(f"/media/{self.name}")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.content, b"")
+        self.assertEqual(res["Content-Length"], str(len(CONTENT)))
+
+    def test_missing_file_and_traversal_not_found(self):
+        self.assertEqual(self.get("uploads/missing.jpg").status_code, 404)
+        self.assertEqual(self.get("uploads").status_code, 404)
+        self.assertEqual(self.get("../settings.py").status_code, 404)
+
+    def test_post_not_allowed(self):
+        res = self.client.post(f"/media/{self.name}")
+
+        self.assertEqual(res.status_code, 405)
+
+    @override_settings(
+        MEDIA_SENDFILE="x-accel-redirect",
+        MEDIA_ACCEL_PREFIX="/protected-media/",
+    )
+    def test_x_accel_redirect(self):
+        res = self.get()
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.content, b"")
+        self.assertEqual(
+            res["X-Accel-Redirect"], f"/protected-media/{self.name}"
+        )
+        self.assertEqual(res["Content-Type"], "image/jpeg")
+        self.assertIn("immutable", res["Cache-Control"])
+
+    @override_settings(MEDIA_SENDFILE="x-sendfile")
+    def test_x_sendfile(self):
+        res = self.get()
+
+        self.assertEqual(
+            res["X-Sendfile"], os.path.join(MEDIA_ROOT, self.name)
+        )
+        self.assertEqual(
+            res["Last-Modified"],
+            http_date(
+                int(os.stat(os.path.join(MEDIA_ROOT, self.name)).st_mtime)
+            ),
+        )
+
+
+@override_settings(STATIC_ROOT=STATIC_ROOT)
+class StaticServingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(STATIC_ROOT, "admin/css"))
+        with open(os.path.join(STATIC_ROOT, "admin/css/base.css"), "w") as css:
+            css.write("body {}")
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+
+    def test_collected_file_served_and_revalidated(self):
+        res = self.client.get("/static/admin/css/base.css")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b"".join(res.streaming_content), b"body {}")
+        self.assertEqual(res["Content-Type"], "text/css")
+        self.assertEqual(res["Cache-Control"], "public, no-cache")
+
+        res = self.client.get(
+            "/static/admin/css/base.css",
+            headers={"If-None-Match": res["ETag"]},
+        )
+        self.assertEqual(res.status_code, 304)
+
+    def test_missing_file_not_found(self):
+        self.assertEqual(
+            self.client.get("/static/admin/missing.css").status_code, 404
+        )
+
+    @override_settings(STATIC_ROOT=None)
+    def test_not_served_without_static_root(self):
+        res = self.client.get("/static/admin/css/base.css")
+
+        self.assertEqual(res.status_code, 404)
+
+
+class ParseRangeTests(TestCase):
+    def test_ranges(self):
+        self.assertEqual(parse_range("bytes=0-", 10), (0, 9))
+        self.assertEqual(parse_range("bytes=2-100", 10), (2, 9))
+        self.assertEqual(parse_range("bytes=-100", 10), (0, 9))
+        self.assertIsNone(parse_range(None, 10))
+        self.assertIsNone(parse_range("bytes=0-1,4-5", 10))
+        self.assertIsNone(parse_range("bytes=5-2", 10))
+        with self.assertRaises(ValueError):
+            parse_range("bytes=10-", 10)
+        with self.assertRaises(ValueError):
+            parse_range("bytes=-0", 10)
@@ -0,0 +1,289 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Flight, IdempotencyKey, Order, Ticket
+from airport.prefetch import prefetch_plan
+from airport.serializers import OrderDetailSerializer
+from airport.tests.test_flight_and_crew_api import sample_crew, sample_flight
+
+ORDER_URL = reverse("airport:orders-list")
+
+
+def order_detail_url(order_id):
+    return reverse("airport:orders-detail", args=[order_id])
+
+
+class SeatsSoldCounterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def test_order_create_increments_seats_sold(self):
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+                {"row": 1, "seat": 2, "flight": self.flight.id},
+            ]
+        }
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+        self.flight.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.flight.seats_sold, 2)
+
+    def test_ticket_and_order_delete_decrement_seats_sold(self):
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=order
+        )
+        Ticket.objects.create(row=1, seat=2, flight=self.flight, order=order)
+
+        ticket.delete()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_sold, 1)
+
+        order.delete()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_sold, 0)
+
+    def test_moving_ticket_moves_seats_sold(self):
+        other_flight = sample_flight(airplane=self.flight.airplane)
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=order
+        )
+
+        ticket.flight = other_flight
+        ticket.save()
+        ticket.save()
+        self.flight.refresh_from_db()
+        other_flight.refresh_from_db()
+
+        self.assertEqual(self.flight.seats_sold, 0)
+        self.assertEqual(other_flight.seats_sold, 1)
+
+        ticket.row = 2
+        ticket.save(update_fields=["row"])
+        other_flight.refresh_from_db()
+        self.assertEqual(other_flight.seats_sold, 1)
+
+    def test_flight_list_reads_counter(self):
+        Flight.objects.filter(pk=self.flight.pk).update(seats_sold=5)
+
+        res = self.client.get(reverse("airport:flights-list"))
+
+        self.assertEqual(
+            res.data["results"][0]["tickets_available"],
+            self.flight.airplane.capacity - 5,
+        )
+
+    def test_rebuild_seat_counters_command(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        Flight.objects.filter(pk=self.flight.pk).update(seats_sold=7)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_seat_counters", "--check", stdout=StringIO())
+
+        call_command("rebuild_seat_counters", stdout=StringIO())
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_sold, 1)
+
+        call_command("rebuild_seat_counters", "--check", stdout=StringIO())
+
+
+class BulkOrderCreateTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def book(self, seats):
+        payload = {
+            "tickets": [
+                {"row": row, "seat": seat, "flight": self.flight.id}
+                for row, seat in seats
+            ]
+        }
+        return self.client.post(ORDER_URL, payload, format="json")
+
+    def test_query_count_does_not_grow_with_ticket_count(self):
+        with CaptureQueriesContext(connection) as single:
+            self.book([(1, 1)])
+        with CaptureQueriesContext(connection) as group:
+            self.book([(2, seat) for seat in range(1, 10)])
+
+        self.assertEqual(len(single), len(group))
+        self.assertEqual(Ticket.objects.count(), 10)
+
+    def test_taken_seat_rejected(self):
+        self.book([(1, 1)])
+
+        res = self.book([(1, 2), (1, 1)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["tickets"][0], {})
+        self.assertIn("non_field_errors", res.data["tickets"][1])
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_seat_repeated_in_same_order_rejected(self):
+        res = self.book([(1, 1), (1, 1)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    def test_seat_out_of_airplane_range_rejected(self):
+        res = self.book([(self.flight.airplane.rows + 1, 1)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("row", res.data["tickets"][0])
+
+
+class IdempotentOrderCreateTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def book(self, key, seat=1):
+        return self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": 1, "seat": seat, "flight": self.flight.id}]},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_original_response(self):
+        first = self.book("key-1")
+
+        with self.assertNumQueries(1):
+            retry = self.book("key-1")
+
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry.headers["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_reused_with_other_body(self):
+        self.book("key-1")
+
+        res = self.book("key-1", seat=2)
+
+        self.assertEqual(
+            res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+
+    def test_failed_request_releases_key(self):
+        self.book("key-1")
+        self.assertEqual(
+            self.book("key-2").status_code, status.HTTP_400_BAD_REQUEST
+        )
+
+        res = self.book("key-2", seat=2)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_stored_response_kept_for_full_ttl(self):
+        self.book("key-1")
+
+        record = IdempotencyKey.objects.get(key="key-1")
+        self.assertGreater(
+            record.expires_at, timezone.now() + timedelta(hours=23)
+        )
+
+    def test_abandoned_reservation_is_taken_over(self):
+        self.book("key-1")
+        # The worker died before storing the response; its booking was
+        # rolled back
+        Order.objects.all().delete()
+        IdempotencyKey.objects.update(
+            response_status=None,
+            response_body=None,
+            expires_at=timezone.now() + timedelta(seconds=30),
+        )
+        self.assertEqual(
+            self.book("key-1").status_code, status.HTTP_409_CONFLICT
+        )
+
+        IdempotencyKey.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        res = self.book("key-1")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.book("key-1").data, res.data)
+
+
+class OrderHistoryQueryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+
+    def order_with_tickets(self, count):
+        order = Order.objects.create(user=self.user)
+        for index in range(count):
+            flight = sample_flight()
+            flight.crew.add(sample_crew(first_name=f"Crew {index}"))
+            Ticket.objects.create(order=order, flight=flight, row=1, seat=1)
+        return order
+
+    def queries(self, url):
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return len(context)
+
+    def test_retrieve_query_count_does_not_grow_with_tickets(self):
+        small = self.order_with_tickets(1)
+        large = self.order_with_tickets(5)
+
+        self.assertEqual(
+            self.queries(order_detail_url(small.id)),
+            self.queries(order_detail_url(large.id)),
+        )
+
+    def test_list_query_count_does_not_grow_with_tickets(self):
+        self.order_with_tickets(1)
+        single = self.queries(ORDER_URL)
+        self.order_with_tickets(5)
+
+        self.assertEqual(self.queries(ORDER_URL), single)
+
+    def test_prefetch_plan_follows_nested_serializers(self):
+        plan = prefetch_plan(OrderDetailSerializer)
+
+        tickets = plan.prefetch["tickets"]
+        self.assertEqual(tickets.select, {"flight"})
+        self.assertEqual(list(tickets.prefetch), ["flight__crew"])
@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Order
+from airport.tests.test_airplane_api import sample_airplane
+from airport.tests.test_airport_and_route_api import sample_route
+from airport.tests.test_flight_and_crew_api import sample_flight
+
+FLIGHT_URL = reverse("airport:flights-list")
+ORDER_URL = reverse("airport:orders-list")
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        route = sample_route()
+        airplane = sample_airplane()
+        self.flights = [
+            sample_flight(
+                route=route,
+                airplane=airplane,
+                departure_time=departure_time,
+            )
+            for departure_time in (
+                "2025-06-05T09:00:00Z",
+                "2025-06-05T09:00:00Z",
+                "2025-06-05T09:00:00Z",
+                "2025-06-04T09:00:00Z",
+                "2025-06-06T09:00:00Z",
+            )
+        ]
+        self.expected_ids = [
+            self.flights[3].id,
+            self.flights[0].id,
+            self.flights[1].id,
+            self.flights[2].id,
+            self.flights[4].id,
+        ]
+
+    def test_limit_offset_stays_default(self):
+        res = self.client.get(FLIGHT_URL)
+
+        self.assertIn("count", res.data)
+
+    def test_walk_forward_and_back_through_ties(self):
+        res = self.client.get(
+            FLIGHT_URL, {"pagination": "cursor", "limit": 2}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", res.data)
+        self.assertIsNone(res.data["previous"])
+
+        seen = [flight["id"] for flight in res.data["results"]]
+        pages = [list(seen)]
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            page = [flight["id"] for flight in res.data["results"]]
+            pages.append(page)
+            seen += page
+
+        self.assertEqual(seen, self.expected_ids)
+
+        for page in reversed(pages[:-1]):
+            res = self.client.get(res.data["previous"])
+            self.assertEqual(
+                [flight["id"] for flight in res.data["results"]], page
+            )
+        self.assertIsNone(res.data["previous"])
+
+    def test_invalid_cursor(self):
+        res = self.client.get(
+            FLIGHT_URL, {"pagination": "cursor", "cursor": "garbage"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_orders_keyset_pagination(self):
+        user = get_user_model().objects.create_user(
+            email="test@test.test",
+            password="testpassword",
+        )
+        self.client.force_authenticate(user)
+        orders = [Order.objects.create(user=user) for _ in range(3)]
+
+        res = self.client.get(ORDER_URL, {"pagination": "cursor", "limit": 2})
+        next_res = self.client.get(res.data["next"])
+
+        self.assertEqual(
+            [order["id"] for order in res.data["results"]]
+            + [order["id"] for order in next_res.data["results"]],
+            [order.id for order in orders],
+        )
+        self.assertIsNone(next_res.data["next"])
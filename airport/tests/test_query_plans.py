@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta, timezone
+
+from django.db import connection
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from airport.filters import distinct_if_needed
+from airport.models import Flight, Route
+from airport.tests.test_airplane_api import sample_airplane
+from airport.tests.test_airport_and_route_api import sample_airport
+from airport.tests.test_flight_and_crew_api import sample_flight
+from airport.views import AirportViewSet, FlightViewSet
+
+factory = APIRequestFactory()
+
+
+def view_queryset(viewset_class, params):
+    view = viewset_class(action="list", format_kwarg=None)
+    view.request = Request(factory.get("/", params))
+    return view.get_queryset()
+
+
+class DistinctQueryPlanTests(TestCase):
+    def setUp(self):
+        self.flight = sample_flight()
+
+    def assertNoDistinct(self, queryset):
+        self.assertFalse(queryset.query.distinct)
+        self.assertNotIn("DISTINCT", str(queryset.query).upper())
+        if connection.vendor == "postgresql":
+            plan = queryset.explain()
+            self.assertNotIn("HashAggregate", plan)
+            self.assertNotIn("Unique", plan)
+
+    def test_flight_filters_do_not_add_distinct(self):
+        airport_id = self.flight.route.source_id
+        for params in (
+            {},
+            {"date": "2025-06-05"},
+            {"departure-airport": airport_id},
+            {"arrival-airport": airport_id},
+            {
+                "departure-airport": airport_id,
+                "arrival-airport": airport_id,
+                "date": "2025-06-05",
+            },
+        ):
+            with self.subTest(params=params):
+                self.assertNoDistinct(view_queryset(FlightViewSet, params))
+
+    def test_airport_city_filter_does_not_add_distinct(self):
+        sample_airport(closest_big_city="City")
+
+        self.assertNoDistinct(view_queryset(AirportViewSet, {"city": "Ci"}))
+
+    def test_to_many_filter_adds_distinct(self):
+        queryset = distinct_if_needed(
+            Flight.objects.filter(crew__first_name="John")
+        )
+
+        self.assertTrue(queryset.query.distinct)
+
+
+class FlightSearchIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        airports = [
+            sample_airport(name=f"Airport {index}") for index in range(6)
+        ]
+        routes = [
+            Route.objects.create(source=source, destination=destination,
+                                 distance=1000)
+            for source in airports
+            for destination in airports
+            if source != destination
+        ]
+        airplane = sample_airplane()
+        start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        Flight.objects.bulk_create(
+            Flight(
+                route=routes[index % len(routes)],
+                airplane=airplane,
+                departure_time=start + timedelta(hours=index),
+                arrival_time=start + timedelta(hours=index + 3),
+            )
+            for index in range(3000)
+        )
+        cls.airports = airports
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def explain(self, params):
+        queryset = view_queryset(FlightViewSet, params)
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def test_date_filter_is_a_range_over_the_departure_index(self):
+        queryset = view_queryset(FlightViewSet, {"date": "2025-02-01"})
+        sql = str(queryset.query)
+
+        self.assertNotIn("django_datetime_cast_date", sql)
+        self.assertNotIn("::date", sql)
+        self.assertEqual(queryset.count(), 24)
+        self.assertIn(
+            "airport_fli_departu_abe547_idx",
+            self.explain({"date": "2025-02-01"}),
+        )
+
+    def test_route_and_date_search_uses_composite_index(self):
+        plan = self.explain(
+            {
+                "departure-airport": self.airports[0].id,
+                "arrival-airport": self.airports[1].id,
+                "date": "2025-02-01",
+            }
+        )
+
+        self.assertIn("airport_fli_route_i_baa295_idx", plan)
@@ -0,0 +1,58 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from airport.models import Airport
+from airport.reference_cache import reference_cache
+from airport.tests.test_airport_and_route_api import sample_route
+from airport.tests.test_flight_and_crew_api import sample_flight
+
+FLIGHT_URL = reverse("airport:flights-list")
+ROUTE_URL = reverse("airport:routes-list")
+
+
+class ReferenceCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_flight_list_does_not_join_reference_tables(self):
+        sample_flight()
+        self.client.get(FLIGHT_URL)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(FLIGHT_URL)
+
+        for query in queries:
+            self.assertNotIn("airport_airport", query["sql"])
+            self.assertNotIn("airport_airplanetype", query["sql"])
+
+    def test_route_list_query_count_does_not_grow(self):
+        sample_route()
+        self.client.get(ROUTE_URL)
+        with CaptureQueriesContext(connection) as single:
+            self.client.get(ROUTE_URL)
+
+        for _ in range(4):
+            sample_route()
+        self.client.get(ROUTE_URL)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(ROUTE_URL)
+
+        self.assertEqual(len(single), len(many))
+
+    def test_save_invalidates_cached_rows(self):
+        route = sample_route()
+        self.assertEqual(
+            reference_cache.get(Airport, route.source_id).name,
+            "Source Airport",
+        )
+
+        route.source.name = "Renamed Airport"
+        route.source.save()
+
+        res = self.client.get(ROUTE_URL)
+        self.assertIn("Renamed Airport", res.data["results"][0]["source"])
@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Airport
+from airport.tests.test_airport_and_route_api import sample_airport
+from airport.tests.test_flight_and_crew_api import sample_crew
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def photo(size=(1200, 900), exif=True):
+    image = Image.new("RGB", size, "steelblue")
+    output = BytesIO()
+    extra = {}
+    if exif:
+        metadata = Image.Exif()
+        metadata[0x010F] = "Camera maker"
+        extra["exif"] = metadata.tobytes()
+    image.save(output, format="JPEG", **extra)
+    output.seek(0)
+    output.name = "photo.jpg"
+    return output
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_RENDITION_WORKERS=0)
+class ImageRenditionTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                "admin@myproject.com", "password"
+            )
+        )
+        self.airport = sample_airport()
+
+    def upload(self, image):
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                reverse("airport:airports-upload-image",
+                        args=[self.airport.id]),
+                {"image": image},
+                format="multipart",
+            )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.airport.refresh_from_db()
+
+    def test_upload_renders_fixed_size_variants(self):
+        self.upload(photo())
+
+        renditions = self.airport.image_renditions
+        self.assertEqual(set(renditions), {"thumbnail", "medium"})
+        for name, size in (("thumbnail", (160, 160)), ("medium", (640, 480))):
+            for file_format in ("webp", "jpeg"):
+                with default_storage.open(
+                    renditions[name][file_format]
+                ) as rendition:
+                    image = Image.open(rendition)
+                    self.assertEqual(image.size, size)
+                    self.assertEqual(image.format, file_format.upper())
+                    self.assertFalse(image.getexif())
+                    self.assertNotIn("icc_profile", image.info)
+
+    def test_renditions_are_smaller_than_original(self):
+        self.upload(photo(size=(3000, 2000)))
+
+        thumbnail = self.airport.image_renditions["thumbnail"]["webp"]
+        self.assertLess(
+            default_storage.size(thumbnail) * 10,
+            self.airport.image.size,
+        )
+
+    def test_list_serializer_exposes_rendition_urls(self):
+        self.upload(photo())
+
+        res = self.client.get(reverse("airport:airports-list"))
+
+        urls = res.data["results"][0]["image_renditions"]
+        self.assertTrue(
+            urls["thumbnail"]["webp"].startswith("http://testserver/media/")
+        )
+        self.assertTrue(urls["medium"]["jpeg"].endswith("-medium.jpg"))
+
+    def test_new_upload_replaces_renditions(self):
+        self.upload(photo())
+        previous = self.airport.image_renditions["thumbnail"]["webp"]
+
+        self.upload(photo(exif=False))
+
+        self.assertFalse(default_storage.exists(previous))
+        self.assertTrue(
+            default_storage.exists(
+                self.airport.image_renditions["thumbnail"]["webp"]
+            )
+        )
+
+    def test_command_renders_missing_renditions(self):
+        self.upload(photo())
+        crew = sample_crew()
+        crew.image = self.airport.image.name
+        crew.save()
+        Airport.objects.update(image_renditions={})
+        out = StringIO()
+
+        call_command("generate_renditions", "--workers", "1", stdout=out)
+
+        self.assertIn("Rendered 2 image(s)", out.getvalue())
+        self.airport.refresh_from_db()
+        crew.refresh_from_db()
+        self.assertIn("thumbnail", self.airport.image_renditions)
+        self.assertTrue(
+            os.path.basename(
+                crew.image_renditions["thumbnail"]["jpeg"]
+            ).endswith("-thumbnail.jpg")
+        )
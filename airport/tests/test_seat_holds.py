@@ -0,0 +1,108 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Order, SeatHold
+from airport.tests.test_flight_and_crew_api import sample_flight
+
+SEAT_HOLD_URL = reverse("airport:seat_holds-list")
+ORDER_URL = reverse("airport:orders-list")
+
+
+def confirm_url(seat_hold_id):
+    return reverse("airport:seat_holds-confirm", args=[seat_hold_id])
+
+
+class SeatHoldTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test",
+            password="testpassword",
+        )
+        self.other_client = APIClient()
+        self.other_client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="other@test.test",
+                password="testpassword",
+            )
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def hold(self, client, seats):
+        return client.post(
+            SEAT_HOLD_URL,
+            {
+                "flight": self.flight.id,
+                "seats": [{"row": row, "seat": seat} for row, seat in seats],
+            },
+            format="json",
+        )
+
+    def test_hold_and_confirm(self):
+        res = self.hold(self.client, [(1, 1), (2, 3)])
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            res.data["seats"],
+            [{"row": 1, "seat": 1}, {"row": 2, "seat": 3}],
+        )
+
+        res = self.client.post(confirm_url(res.data["id"]))
+        self.flight.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["tickets"]), 2)
+        self.assertEqual(self.flight.seats_sold, 2)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_held_seat_unavailable_to_others(self):
+        self.hold(self.client, [(1, 1)])
+
+        res = self.hold(self.other_client, [(1, 2), (1, 1)])
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.other_client.post(
+            ORDER_URL,
+            {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]},
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    def test_contended_seats_fail_fast(self):
+        with mock.patch("airport.holds.try_lock_seats", return_value=False):
+            res = self.hold(self.client, [(1, 1)])
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(SeatHold.objects.exists())
+
+        with mock.patch(
+            "airport.serializers.try_lock_seats", return_value=False
+        ):
+            res = self.client.post(
+                ORDER_URL,
+                {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]},
+                format="json",
+            )
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Order.objects.exists())
+
+    def test_expired_holds_are_ignored_and_swept(self):
+        res = self.hold(self.client, [(1, 1)])
+        SeatHold.objects.update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        res = self.hold(self.other_client, [(1, 1)])
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        call_command("sweep_seat_holds", stdout=StringIO())
+        self.assertEqual(SeatHold.objects.count(), 1)
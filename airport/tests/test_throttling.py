@@ -0,0 +1,104 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+
+from airport_api_service.throttling import ScopedThrottle
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+FLIGHT_URL = reverse("airport:flights-list")
+
+
+class FakeView:
+    throttle_scope = "test"
+
+
+class SlidingWindowThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 6000.0
+        self.request = Request(RequestFactory().get("/"))
+        self.request._force_auth_user = None
+
+    def allow(self):
+        throttle = ScopedThrottle()
+        throttle.timer = lambda: self.now
+        with mock.patch.object(
+            ScopedThrottle, "THROTTLE_RATES", {"test": "3/min"}
+        ):
+            return throttle, throttle.allow_request(self.request, FakeView())
+
+    def test_limit_within_window(self):
+        results = [self.allow()[1] for _ in range(4)]
+
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_state_is_one_counter_per_window(self):
+        for _ in range(3):
+            self.allow()
+        self.now += 90
+        self.allow()
+
+        self.assertEqual(
+            cache.get_many(
+                [f"throttle_test_127.0.0.1:{window}" for window in (100, 101)]
+            ),
+            {
+                "throttle_test_127.0.0.1:100": 3,
+                "throttle_test_127.0.0.1:101": 1,
+            },
+        )
+
+    def test_previous_window_is_weighted(self):
+        for _ in range(3):
+            self.allow()
+
+        # A third into the next window, two thirds of the old count remain
+        self.now += 80
+        self.assertTrue(self.allow()[1])
+        throttle, allowed = self.allow()
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(throttle.wait(), 20)
+
+        self.now += 20
+        self.assertTrue(self.allow()[1])
+
+    def test_refused_requests_are_not_counted(self):
+        for _ in range(10):
+            self.allow()
+
+        self.now += 120
+        self.assertEqual([self.allow()[1] for _ in range(3)], [True] * 3)
+
+
+class RateLimitHeadersTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_headers_report_tightest_limit(self):
+        res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["RateLimit-Limit"], "30")
+        self.assertEqual(res["RateLimit-Remaining"], "29")
+        self.assertLessEqual(int(res["RateLimit-Reset"]), 60)
+
+    def test_auth_scope_throttled(self):
+        for _ in range(10):
+            res = self.client.post(TOKEN_URL, {})
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.post(TOKEN_URL, {})
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res["RateLimit-Remaining"], "0")
+        self.assertIn("Retry-After", res)
+        # Other scopes keep their own allowance
+        self.assertEqual(
+            self.client.get(FLIGHT_URL).status_code, status.HTTP_200_OK
+        )
@@ -0,0 +1,119 @@
+import io
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from PIL import Image
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.parsers import MultiPartParser
+
+# Bytes of an upload searched for the image header (JPEG EXIF blocks
+# can push the frame size well past the first chunk)
+IMAGE_HEADER_BYTES = 256 * 1024
+# Room for the multipart boundaries and form fields around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class ImageTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_code = "image_too_large"
+
+    def __init__(self):
+        super(ImageTooLarge, self).__init__(
+            f"Image must not be larger than "
+            f"{settings.IMAGE_UPLOAD_MAX_BYTES} bytes."
+        )
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """Streams uploaded images to a temporary file within size limits
+
+    The byte limit is checked against Content-Length before anything is
+    read and again as chunks arrive. Width and height come from the
+    image header as soon as it is in, so oversized images and
+    decompression bombs are refused before the rest is received. Pixels
+    are never decoded here, and at most one chunk and the header are
+    held in memory.
+    """
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        if content_length > (
+            settings.IMAGE_UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD_BYTES
+        ):
+            raise ImageTooLarge()
+
+    def new_file(self, *args, **kwargs):
+        super(ImageUploadHandler, self).new_file(*args, **kwargs)
+        self.received = 0
+        self.header = bytearray()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.IMAGE_UPLOAD_MAX_BYTES:
+            self.reject(ImageTooLarge())
+        if self.header is not None:
+            self.header += raw_data
+            self.check_header(complete=False)
+        return super(ImageUploadHandler, self).receive_data_chunk(
+            raw_data, start
+        )
+
+    def file_complete(self, file_size):
+        if self.header is not None:
+            self.check_header(complete=True)
+        return super(ImageUploadHandler, self).file_complete(file_size)
+
+    def check_header(self, complete):
+        try:
+            with Image.open(io.BytesIO(self.header)) as image:
+                width, height = image.size
+        except Image.DecompressionBombError:
+            self.reject(self.dimension_error())
+        except Exception:
+            # Not enough of the header yet, or not an image at all
+            if complete or len(self.header) >= IMAGE_HEADER_BYTES:
+                self.reject(
+                    ValidationError(
+                        {
+                            "image": "Upload a valid image. The file you "
+                                     "uploaded was either not an image or "
+                                     "a corrupted image."
+                        }
+                    )
+                )
+            return
+        self.header = None
+        if (
+            max(width, height) > settings.IMAGE_UPLOAD_MAX_DIMENSION
+            or width * height > settings.IMAGE_UPLOAD_MAX_PIXELS
+        ):
+            self.reject(self.dimension_error())
+
+    @staticmethod
+    def dimension_error():
+        return ValidationError(
+            {
+                "image": f"Image must not be wider or taller than "
+                         f"{settings.IMAGE_UPLOAD_MAX_DIMENSION} pixels "
+                         f"nor have more than "
+                         f"{settings.IMAGE_UPLOAD_MAX_PIXELS} pixels."
+            }
+        )
+
+    def reject(self, error):
+        self.file.close()
+        raise error
+
+
+class ImageUploadParser(MultiPartParser):
+    """Multipart parser handing file fields to ImageUploadHandler"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = parser_context["request"]
+        request._request.upload_handlers = [
+            ImageUploadHandler(request._request)
+        ]
+        return super(ImageUploadParser, self).parse(
+            stream, media_type, parser_context
+        )
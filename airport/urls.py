@@ -1,13 +1,24 @@
-from django.urls import path, include
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
+
+from airport.async_views import (
+    AsyncAirportListView,
+    AsyncFlightDetailView,
+    AsyncFlightListView,
+    AsyncRouteListView,
+)
 from airport.views import (
     AirplaneViewSet,
     AirplaneTypeViewSet,
     AirportViewSet,
     RouteViewSet,
     CrewViewSet,
+    ExportView,
+    FlightScheduleViewSet,
     FlightViewSet,
-    OrderViewSet)
+    OrderViewSet,
+    SeatHoldViewSet,
+)
 
 app_name = "airport"
 
@@ -26,8 +37,40 @@ router.register("airports", AirportViewSet, basename="airports")
 router.register("routes", RouteViewSet, basename="routes")
 router.register("crews", CrewViewSet, basename="crews")
 router.register("flights", FlightViewSet, basename="flights")
+router.register(
+    "flight_schedules",
+    FlightScheduleViewSet,
+    basename="flight_schedules"
+)
 router.register("orders", OrderViewSet, basename="orders")
+router.register("seat_holds", SeatHoldViewSet, basename="seat_holds")
 
 urlpatterns = [
     path("", include(router.urls)),
+    re_path(
+        r"^exports/(?P<dataset>flights|tickets|orders)"
+        r"\.(?P<file_format>csv|ndjson)$",
+        ExportView.as_view(),
+        name="exports",
+    ),
+    path(
+        "async/flights/",
+        AsyncFlightListView.as_view(),
+        name="async-flights-list",
+    ),
+    path(
+        "async/flights/<int:pk>/",
+        AsyncFlightDetailView.as_view(),
+        name="async-flights-detail",
+    ),
+    path(
+        "async/airports/",
+        AsyncAirportListView.as_view(),
+        name="async-airports-list",
+    ),
+    path(
+        "async/routes/",
+        AsyncRouteListView.as_view(),
+        name="async-routes-list",
+    ),
 ]
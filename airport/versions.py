@@ -0,0 +1,86 @@
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+KEY_PREFIX = "table-version"
+ROW_KEY_PREFIX = "row-version"
+
+
+def _version_key(model):
+    return f"{KEY_PREFIX}:{model._meta.label_lower}"
+
+
+def _row_version_key(model, pk):
+    return f"{ROW_KEY_PREFIX}:{model._meta.label_lower}:{pk}"
+
+
+def _new_version():
+    return uuid.uuid4().hex, time.time()
+
+
+def get_table_version(model):
+    """Return the ``(token, modified timestamp)`` change version of a table"""
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        candidate = _new_version()
+        cache.add(key, candidate, None)
+        version = cache.get(key) or candidate
+    return version
+
+
+def get_table_versions(models):
+    """Return change versions of several tables with one cache round trip"""
+    keys = {model: _version_key(model) for model in models}
+    found = cache.get_many(keys.values())
+    return [
+        found.get(key) or get_table_version(model)
+        for model, key in keys.items()
+    ]
+
+
+def bump_table_versions(*models):
+    """Give tables a new change version now and again after commit
+
+    The second bump keeps a concurrent reader that paired the first new
+    version with data read before the change became visible from holding
+    on to that pairing.
+    """
+    def bump():
+        version = _new_version()
+        cache.set_many(
+            {_version_key(model): version for model in models}, None
+        )
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def get_row_versions(model, pks):
+    """Return ``{pk: token}`` change versions of single rows"""
+    keys = {_row_version_key(model, pk): pk for pk in pks}
+    found = cache.get_many(keys)
+    missing = {
+        key: uuid.uuid4().hex for key in keys if key not in found
+    }
+    if missing:
+        for key, token in missing.items():
+            cache.add(key, token, None)
+        found.update(cache.get_many(missing))
+    return {
+        pk: found.get(key, missing.get(key)) for key, pk in keys.items()
+    }
+
+
+def bump_row_versions(model, pks):
+    """Give single rows a new change version now and again after commit"""
+    def bump():
+        token = uuid.uuid4().hex
+        cache.set_many(
+            {_row_version_key(model, pk): token for pk in pks}, None
+        )
+
+    bump()
+    transaction.on_commit(bump)
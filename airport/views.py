@@ -1,14 +1,35 @@
-from datetime import datetime
+import base64
+from datetime import timedelta
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 
-from django.db.models import F, Count
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
 
+from airport.conditional import ConditionalResponseMixin
+from airport.exports import (
+    EXPORT_CONTENT_TYPES,
+    export_queryset,
+    export_rows,
+    render_export,
+)
+from airport.filters import (
+    day_bounds,
+    distinct_if_needed,
+    filter_flights,
+    params_to_ints,
+)
+from airport.idempotency import IdempotentCreateMixin
+from airport.itineraries import find_itineraries
 from airport.models import (
     Airplane,
     AirplaneType,
@@ -16,16 +37,32 @@ from airport.models import (
     Route,
     Crew,
     Flight,
+    FlightSchedule,
     Order,
+    SeatHold,
+    Ticket,
+)
+from airport.pagination import (
+    FlightKeysetPagination,
+    KeysetPaginationMixin,
+    OrderKeysetPagination,
 )
 from airport.permissions import IsAdminOrReadOnly
+from airport.prefetch import prefetch_plan
+from airport.renditions import save_image
+from airport.uploads import ImageUploadParser
+from airport.response_cache import FlightSearchCacheMixin
+from airport.rostering import save_flight
+from airport.schedules import generate_flights
 from airport.serializers import (
     AirplaneSerializer,
     AirplaneTypeSerializer,
     AirportSerializer,
     RouteSerializer,
     CrewSerializer,
+    CrewRosterSerializer,
     FlightSerializer,
+    FlightScheduleSerializer,
     OrderSerializer,
     AirplaneListSerializer,
     RouteListSerializer,
@@ -41,12 +78,18 @@ from airport.serializers import (
     CrewListSerializer,
     CrewImageSerializer,
     AirplaneDetailSerializer,
+    ItinerarySerializer,
+    SeatHoldSerializer,
 )
 
 
-class AirplaneTypeViewSet(viewsets.ModelViewSet):
+class AirplaneTypeViewSet(
+    ConditionalResponseMixin,
+    viewsets.ModelViewSet,
+):
     queryset = AirplaneType.objects.all()
     permission_classes = (IsAdminOrReadOnly,)
+    conditional_models = (AirplaneType,)
 
     def get_serializer_class(self):
         if self.action in ("list", "retrieve"):
@@ -60,6 +103,7 @@ class AirplaneTypeViewSet(viewsets.ModelViewSet):
         detail=True,
         url_path="upload-image",
         permission_classes=[IsAdminUser],
+        parser_classes=[ImageUploadParser],
     )
     def upload_image(self, request, pk=None):
         """Endpoint for uploading image to specific airplane type"""
@@ -67,15 +111,16 @@ class AirplaneTypeViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(airplane_type, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            save_image(serializer)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class AirplaneViewSet(viewsets.ModelViewSet):
-    queryset = Airplane.objects.all().select_related("airplane_type")
+class AirplaneViewSet(ConditionalResponseMixin, viewsets.ModelViewSet):
+    queryset = Airplane.objects.all()
     permission_classes = (IsAdminOrReadOnly, )
+    conditional_models = (Airplane, AirplaneType)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -85,19 +130,20 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         return AirplaneSerializer
 
 
-class AirportViewSet(viewsets.ModelViewSet):
+class AirportViewSet(ConditionalResponseMixin, viewsets.ModelViewSet):
     queryset = Airport.objects.all()
     permission_classes = (IsAdminOrReadOnly, )
+    conditional_models = (Airport,)
 
     def get_queryset(self):
         city = self.request.query_params.get("city")
 
-        queryset = self.queryset
+        queryset = self.queryset.all()
 
         if city:
             queryset = queryset.filter(closest_big_city__icontains=city)
 
-        return queryset.distinct()
+        return distinct_if_needed(queryset)
 
     def get_serializer_class(self):
         if self.action in ("list", "retrieve"):
@@ -111,6 +157,7 @@ class AirportViewSet(viewsets.ModelViewSet):
         detail=True,
         url_path="upload-image",
         permission_classes=[IsAdminUser],
+        parser_classes=[ImageUploadParser],
     )
     def upload_image(self, request, pk=None):
         """Endpoint for uploading image to specific airport"""
@@ -118,7 +165,7 @@ class AirportViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(airport, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            save_image(serializer)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -137,9 +184,10 @@ class AirportViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class RouteViewSet(viewsets.ModelViewSet):
-    queryset = Route.objects.all().select_related("source", "destination")
+class RouteViewSet(ConditionalResponseMixin, viewsets.ModelViewSet):
+    queryset = Route.objects.all()
     permission_classes = (IsAdminOrReadOnly, )
+    conditional_models = (Route, Airport)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -149,9 +197,10 @@ class RouteViewSet(viewsets.ModelViewSet):
         return RouteSerializer
 
 
-class CrewViewSet(viewsets.ModelViewSet):
+class CrewViewSet(ConditionalResponseMixin, viewsets.ModelViewSet):
     queryset = Crew.objects.all()
     permission_classes = (IsAdminOrReadOnly, )
+    conditional_models = (Crew,)
 
     def get_serializer_class(self):
         if self.action in ("list", "retrieve"):
@@ -165,6 +214,7 @@ class CrewViewSet(viewsets.ModelViewSet):
         detail=True,
         url_path="upload-image",
         permission_classes=[IsAdminUser],
+        parser_classes=[ImageUploadParser],
     )
     def upload_image(self, request, pk=None):
         """Endpoint for uploading image to specific crew"""
@@ -172,68 +222,225 @@ class CrewViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(crew, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            save_image(serializer)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class FlightViewSet(viewsets.ModelViewSet):
-    queryset = (
-        Flight.objects.all()
-        .select_related(
-            "route__source",
-            "route__destination",
-            "airplane__airplane_type",
-        )
-        .prefetch_related("crew")
-        .annotate(
-            tickets_available=(
-                F("airplane__rows") * F("airplane__seats_in_row")
-                - Count("tickets")
-            )
-        )
-    )
+class FlightViewSet(
+    ConditionalResponseMixin,
+    FlightSearchCacheMixin,
+    KeysetPaginationMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = Flight.objects.all().prefetch_related("crew")
     permission_classes = (IsAdminOrReadOnly, )
+    throttle_scope = "search"
+    search_cache_models = (
+        Flight,
+        Route,
+        Airport,
+        Airplane,
+        AirplaneType,
+        Crew,
+    )
+    conditional_models = search_cache_models + (Ticket,)
+    keyset_pagination_class = FlightKeysetPagination
 
     @staticmethod
     def _params_to_ints(qs):
         """Converts a list of string IDs to a list of integers"""
-        return [int(str_id) for str_id in qs.split(",")]
+        try:
+            return params_to_ints(qs)
+        except ValueError:
+            raise ValidationError("Invalid filter value.")
 
     def get_queryset(self):
         """Retrieve the flights with filters"""
-        departure_airport = self.request.query_params.get("departure-airport")
-        arrival_airport = self.request.query_params.get("arrival-airport")
-        date = self.request.query_params.get("date")
+        if self.action == "seats":
+            return Flight.objects.select_related("airplane")
 
-        queryset = self.queryset
-
-        if departure_airport:
-            departure_airport_ids = self._params_to_ints(departure_airport)
-            queryset = queryset.filter(
-                route__source__id__in=departure_airport_ids
-            )
-
-        if arrival_airport:
-            arrival_airport_ids = self._params_to_ints(arrival_airport)
-            queryset = queryset.filter(
-                route__destination__id__in=arrival_airport_ids
+        try:
+            return filter_flights(
+                self.queryset.all(), self.request.query_params
             )
-
-        if date:
-            date = datetime.strptime(date, "%Y-%m-%d").date()
-            queryset = queryset.filter(departure_time__date=date)
-
-        return queryset.distinct()
+        except ValueError:
+            raise ValidationError("Invalid filter value.")
 
     def get_serializer_class(self):
         if self.action == "list":
             return FlightListSerializer
         elif self.action == "retrieve":
             return FlightDetailSerializer
+        elif self.action == "itineraries":
+            return ItinerarySerializer
+        elif self.action == "roster":
+            return CrewRosterSerializer
         return FlightSerializer
 
+    def perform_create(self, serializer):
+        save_flight(serializer)
+
+    def perform_update(self, serializer):
+        save_flight(serializer)
+
+    @staticmethod
+    def _int_param(query_params, name, default=None):
+        value = query_params.get(name)
+        if value is None:
+            if default is None:
+                raise ValidationError({name: "This parameter is required."})
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise ValidationError({name: "A valid integer is required."})
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "departure-airport",
+                type=OpenApiTypes.INT,
+                required=True,
+                description="Origin airport id (ex. ?departure-airport=2)",
+            ),
+            OpenApiParameter(
+                "arrival-airport",
+                type=OpenApiTypes.INT,
+                required=True,
+                description="Destination airport id (ex. ?arrival-airport=5)",
+            ),
+            OpenApiParameter(
+                "date",
+                type=OpenApiTypes.DATE,
+                required=True,
+                description="Departure date of the first leg "
+                            "(ex. ?date=2025-10-23)",
+            ),
+            OpenApiParameter(
+                "min-layover",
+                type=OpenApiTypes.INT,
+                description="Minimum connection time in minutes, "
+                            "default 45 (ex. ?min-layover=60)",
+            ),
+            OpenApiParameter(
+                "max-layover",
+                type=OpenApiTypes.INT,
+                description="Maximum connection time in minutes, "
+                            "default 360 (ex. ?max-layover=240)",
+            ),
+            OpenApiParameter(
+                "max-stops",
+                type=OpenApiTypes.INT,
+                enum=[0, 1, 2],
+                description="Maximum number of stops, default 2",
+            ),
+            OpenApiParameter(
+                "sort",
+                type=OpenApiTypes.STR,
+                enum=["duration", "distance"],
+                description="Sort by total duration (default) "
+                            "or total route distance",
+            ),
+            OpenApiParameter(
+                "limit",
+                type=OpenApiTypes.INT,
+                description="Maximum number of itineraries, default 20",
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False, url_path="itineraries")
+    def itineraries(self, request):
+        """Endpoint for direct and connecting itineraries between airports"""
+        params = request.query_params
+        date = params.get("date")
+        if not date:
+            raise ValidationError({"date": "This parameter is required."})
+        try:
+            day_bounds(date)
+        except ValueError:
+            raise ValidationError({"date": "Use the YYYY-MM-DD format."})
+
+        min_layover = self._int_param(params, "min-layover", 45)
+        max_layover = self._int_param(params, "max-layover", 360)
+        if not 0 <= min_layover <= max_layover:
+            raise ValidationError(
+                {"max-layover": "Must not be less than min-layover."}
+            )
+
+        itineraries = find_itineraries(
+            origin_id=self._int_param(params, "departure-airport"),
+            destination_id=self._int_param(params, "arrival-airport"),
+            date=date,
+            min_layover=timedelta(minutes=min_layover),
+            max_layover=timedelta(minutes=max_layover),
+            max_stops=min(max(self._int_param(params, "max-stops", 2), 0), 2),
+            sort=params.get("sort", "duration"),
+            limit=min(max(self._int_param(params, "limit", 20), 1), 100),
+            queryset=self.queryset,
+        )
+        serializer = self.get_serializer(itineraries, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "layout",
+                type=OpenApiTypes.STR,
+                enum=["bitmap", "rows"],
+                description=(
+                    "bitmap (default): base64 row-major bitset of sold "
+                    "seats, most significant bit first; "
+                    "rows: list of rows with true for every sold seat "
+                    "(ex. ?layout=rows)"
+                ),
+            ),
+        ],
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    @action(methods=["GET"], detail=True, url_path="seats")
+    def seats(self, request, pk=None):
+        """Endpoint for seat occupancy of specific flight"""
+        flight = self.get_object()
+        airplane = flight.airplane
+        bitmap = flight.occupied_seats_bitmap()
+        data = {
+            "id": flight.id,
+            "rows": airplane.rows,
+            "seats_in_row": airplane.seats_in_row,
+        }
+
+        if request.query_params.get("layout") == "rows":
+            data["seats"] = [
+                [
+                    bool(bitmap[index >> 3] & (0x80 >> (index & 7)))
+                    for index in range(
+                        row * airplane.seats_in_row,
+                        (row + 1) * airplane.seats_in_row,
+                    )
+                ]
+                for row in range(airplane.rows)
+            ]
+        else:
+            data["occupied"] = base64.b64encode(bitmap).decode("ascii")
+
+        return Response(data, status=status.HTTP_200_OK)
+
+    @extend_schema(responses={200: OpenApiTypes.OBJECT})
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="roster",
+        permission_classes=[IsAdminUser],
+    )
+    def roster(self, request):
+        """Endpoint for assigning crew to many flights at once"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        created = serializer.save()
+        return Response({"created": created}, status=status.HTTP_200_OK)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -256,13 +463,75 @@ class FlightViewSet(viewsets.ModelViewSet):
                     "(ex. ?date=2025-10-23)"
                 ),
             ),
+            OpenApiParameter(
+                "date-from",
+                type=OpenApiTypes.DATE,
+                description=(
+                    "Flights departing on or after this date "
+                    "(ex. ?date-from=2025-10-23)"
+                ),
+            ),
+            OpenApiParameter(
+                "date-to",
+                type=OpenApiTypes.DATE,
+                description=(
+                    "Flights departing on or before this date "
+                    "(ex. ?date-to=2025-10-30)"
+                ),
+            ),
+            OpenApiParameter(
+                "pagination",
+                type=OpenApiTypes.STR,
+                enum=["cursor"],
+                description=(
+                    "Switch to keyset pagination: no total count, "
+                    "next/previous cursors (ex. ?pagination=cursor&limit=20)"
+                ),
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
 
+class FlightScheduleViewSet(viewsets.ModelViewSet):
+    queryset = FlightSchedule.objects.prefetch_related("crew")
+    serializer_class = FlightScheduleSerializer
+    permission_classes = (IsAdminOrReadOnly,)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "days",
+                type=OpenApiTypes.INT,
+                description="Generate up to this many days ahead "
+                            "(ex. ?days=30)",
+            ),
+        ],
+        request=None,
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    @action(
+        methods=["POST"],
+        detail=True,
+        url_path="generate",
+        permission_classes=[IsAdminUser],
+    )
+    def generate(self, request, pk=None):
+        """Endpoint for generating upcoming flights of specific schedule"""
+        schedule = self.get_object()
+        days = FlightViewSet._int_param(
+            request.query_params,
+            "days",
+            settings.FLIGHT_SCHEDULE_HORIZON_DAYS,
+        )
+        created = generate_flights(schedule_ids=[schedule.id], days=days)
+        return Response({"created": created}, status=status.HTTP_200_OK)
+
+
 class OrderViewSet(
+    KeysetPaginationMixin,
+    IdempotentCreateMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.CreateModelMixin,
@@ -270,14 +539,14 @@ class OrderViewSet(
 ):
     queryset = Order.objects.all()
     permission_classes = (IsAuthenticated,)
+    throttle_scope = "booking"
+    keyset_pagination_class = OrderKeysetPagination
 
     def get_queryset(self):
         queryset = self.queryset.filter(user=self.request.user)
-        if self.action == "list":
-            queryset = queryset.prefetch_related(
-                "tickets__flight__route",
-                "tickets__flight__airplane",
-                "tickets__flight__crew",
+        if self.action in ("list", "retrieve"):
+            queryset = prefetch_plan(self.get_serializer_class()).apply(
+                queryset
             )
 
         return queryset
@@ -291,3 +560,129 @@ class OrderViewSet(
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "Idempotency-Key",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.HEADER,
+                description=(
+                    "Client-generated unique key; retries with the same "
+                    "key and body replay the original response"
+                ),
+            ),
+        ]
+    )
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "pagination",
+                type=OpenApiTypes.STR,
+                enum=["cursor"],
+                description=(
+                    "Switch to keyset pagination: no total count, "
+                    "next/previous cursors (ex. ?pagination=cursor&limit=20)"
+                ),
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+
+class SeatHoldViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+    GenericViewSet,
+):
+    queryset = SeatHold.objects.select_related("flight__airplane")
+    permission_classes = (IsAuthenticated,)
+    throttle_scope = "booking"
+
+    def get_queryset(self):
+        return self.queryset.filter(
+            user=self.request.user,
+            expires_at__gt=timezone.now(),
+        )
+
+    def get_serializer_class(self):
+        if self.action == "confirm":
+            return OrderSerializer
+        return SeatHoldSerializer
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @action(methods=["POST"], detail=True, url_path="confirm")
+    def confirm(self, request, pk=None):
+        """Endpoint for turning a seat hold into an order"""
+        seat_hold = self.get_object()
+        serializer = OrderSerializer(
+            data={
+                "tickets": [
+                    {**seat, "flight": seat_hold.flight_id}
+                    for seat in seat_hold.seat_list
+                ]
+            },
+            context={
+                **self.get_serializer_context(),
+                "seat_hold": seat_hold,
+            },
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class ExportView(APIView):
+    """Streams a whole table as CSV or NDJSON for reconciliation"""
+
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "date-from",
+                type=OpenApiTypes.DATE,
+                description=(
+                    "Flights export only: departing on or after this date "
+                    "(ex. ?date-from=2025-10-23)"
+                ),
+            ),
+            OpenApiParameter(
+                "date-to",
+                type=OpenApiTypes.DATE,
+                description=(
+                    "Flights export only: departing on or before this date "
+                    "(ex. ?date-to=2025-10-30)"
+                ),
+            ),
+        ],
+        responses={
+            (200, content_type): OpenApiTypes.STR
+            for content_type in EXPORT_CONTENT_TYPES.values()
+        },
+    )
+    def get(self, request, dataset, file_format):
+        queryset = export_queryset(dataset)
+        if dataset == "flights":
+            try:
+                queryset = filter_flights(queryset, request.query_params)
+            except ValueError:
+                raise ValidationError({"detail": "Invalid filter value."})
+
+        rows = export_rows(dataset, queryset)
+        response = StreamingHttpResponse(
+            render_export(dataset, file_format, rows),
+            content_type=EXPORT_CONTENT_TYPES[file_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{dataset}.{file_format}"'
+        )
+        return response
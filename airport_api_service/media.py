@@ -0,0 +1,194 @@
+"""
+Serving MEDIA_ROOT and STATIC_ROOT.
+
+With MEDIA_SENDFILE set, Django only checks the path and hands the file
+to the front proxy: "x-accel-redirect" points nginx at the internal
+location MEDIA_ACCEL_PREFIX, "x-sendfile" gives Apache or lighttpd the
+file system path. Otherwise files are streamed with FileResponse, which
+WSGI servers such as gunicorn send with sendfile(), and single byte
+ranges are answered with 206.
+
+Upload names carry a uuid, so their content never changes and they are
+cached for MEDIA_CACHE_MAX_AGE as immutable.
+
+Files collected into STATIC_ROOT by collectstatic (admin, browsable API
+and Swagger assets) are streamed the same way when DEBUG is off and
+nothing in front of Django serves STATIC_URL. Their names don't change
+with their content, so clients revalidate them with the ETag.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+UUID_PATTERN = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+)
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeFile:
+    """File object that reads no further than the end of a byte range
+
+    fileno() is kept, so servers using sendfile() still send straight
+    from the file, limited by Content-Length.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def seek(self, *args):
+        return self.file.seek(*args)
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Return (start, end) of a single byte range, inclusive
+
+    None means the whole file should be sent, either because the header
+    is missing, malformed or asks for several ranges. ValueError means
+    the range lies past the end of the file.
+    """
+    match = RANGE_PATTERN.match(header or "")
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        if not int(last) or not size:
+            raise ValueError("Unsatisfiable range")
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("Unsatisfiable range")
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def cache_control(path):
+    if UUID_PATTERN.search(posixpath.basename(path)):
+        return (
+            f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable"
+        )
+    return "public, no-cache"
+
+
+def content_type(full_path):
+    guessed, _ = mimetypes.guess_type(full_path)
+    return guessed or "application/octet-stream"
+
+
+def sendfile_response(path, full_path, sendfile):
+    response = HttpResponse(content_type=content_type(full_path))
+    if sendfile == "x-accel-redirect":
+        response["X-Accel-Redirect"] = quote(
+            settings.MEDIA_ACCEL_PREFIX + path
+        )
+    else:
+        response["X-Sendfile"] = full_path
+    return response
+
+
+def file_response(request, full_path, size, validators):
+    if_range = request.headers.get("If-Range")
+    try:
+        byte_range = (
+            None if if_range and if_range not in validators
+            else parse_range(request.headers.get("Range"), size)
+        )
+    except ValueError:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1
+    if request.method == "HEAD":
+        response = HttpResponse(content_type=content_type(full_path))
+    else:
+        response = FileResponse(
+            RangeFile(open(full_path, "rb"), start, length),
+            content_type=content_type(full_path),
+        )
+    response["Content-Length"] = length
+    if byte_range:
+        response.status_code = 206
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def serve_file(request, root, path, sendfile=None):
+    if not root:
+        raise Http404("File not found")
+    try:
+        full_path = safe_join(root, path)
+    except SuspiciousFileOperation:
+        raise Http404("File not found")
+    try:
+        file_stat = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404("File not found")
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404("File not found")
+
+    etag = f'"{file_stat.st_size:x}-{file_stat.st_mtime_ns:x}"'
+    last_modified = int(file_stat.st_mtime)
+    validators = (etag, http_date(last_modified))
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        if sendfile:
+            response = sendfile_response(path, full_path, sendfile)
+        else:
+            response = file_response(
+                request, full_path, file_stat.st_size, validators
+            )
+    response["Cache-Control"] = cache_control(path)
+    response["ETag"], response["Last-Modified"] = validators
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve a file below MEDIA_ROOT, or hand it to the front proxy"""
+    return serve_file(
+        request, settings.MEDIA_ROOT, path, settings.MEDIA_SENDFILE
+    )
+
+
+@require_safe
+def serve_static(request, path):
+    """Serve a file collected into STATIC_ROOT"""
+    return serve_file(request, settings.STATIC_ROOT, path)
@@ -62,6 +62,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "airport_api_service.throttling.RateLimitHeadersMiddleware",
 ]
 
 ROOT_URLCONF = "airport_api_service.urls"
@@ -95,9 +96,93 @@ DATABASES = {
         "PASSWORD": os.environ["POSTGRES_PASSWORD"],
         "HOST": os.environ["POSTGRES_HOST"],
         "PORT": os.environ["POSTGRES_PORT"],
+        # Seconds to keep a connection open between requests
+        # (0: close it after every request)
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 0)),
+        "CONN_HEALTH_CHECKS": (
+            os.environ.get("DB_CONN_HEALTH_CHECKS", "false").lower() == "true"
+        ),
     }
 }
 
+# DB_POOL_MAX_SIZE switches to psycopg's connection pool, which replaces
+# persistent connections (CONN_MAX_AGE must then be 0)
+if os.environ.get("DB_POOL_MAX_SIZE"):
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ["DB_POOL_MAX_SIZE"]),
+            "timeout": int(os.environ.get("DB_POOL_TIMEOUT", 10)),
+        },
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# CACHE_BACKEND: locmem (default, per process), file, redis or dummy.
+# Use redis (or any Redis-compatible server) when running several workers
+# so throttles, versions and cached responses are shared between them.
+
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "dummy": "django.core.cache.backends.dummy.DummyCache",
+}
+CACHE_DEFAULT_LOCATIONS = {
+    "locmem": "airport-api-service",
+    "file": str(BASE_DIR / ".cache"),
+    "redis": "redis://localhost:6379/0",
+    "dummy": "",
+}
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "locmem")
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": os.environ.get(
+            "CACHE_LOCATION", CACHE_DEFAULT_LOCATIONS[CACHE_BACKEND]
+        ),
+        "KEY_PREFIX": os.environ.get("CACHE_KEY_PREFIX", "airport"),
+        "TIMEOUT": int(os.environ.get("CACHE_TIMEOUT", 300)),
+    }
+}
+
+FLIGHT_SEARCH_CACHE_TIMEOUT = int(
+    os.environ.get("FLIGHT_SEARCH_CACHE_TIMEOUT", 300)
+)
+
+# Seconds JWT authentication keeps a user's id, email and flags cached
+USER_PRINCIPAL_CACHE_TIMEOUT = int(
+    os.environ.get("USER_PRINCIPAL_CACHE_TIMEOUT", 60)
+)
+
+SEAT_HOLD_MINUTES = int(os.environ.get("SEAT_HOLD_MINUTES", 10))
+SEAT_HOLD_MAX_MINUTES = int(os.environ.get("SEAT_HOLD_MAX_MINUTES", 30))
+
+# Days ahead generate_flights materializes flights of recurring schedules
+FLIGHT_SCHEDULE_HORIZON_DAYS = int(
+    os.environ.get("FLIGHT_SCHEDULE_HORIZON_DAYS", 90)
+)
+
+# Rows fetched per server-side cursor round trip by the streaming exports
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 2000))
+
+# Seconds a stored order response can be replayed for an Idempotency-Key
+IDEMPOTENCY_KEY_TTL = int(os.environ.get("IDEMPOTENCY_KEY_TTL", 86400))
+
+# Seconds a key stays reserved by a request that has not answered yet;
+# a retry after that takes the key over from a crashed worker
+IDEMPOTENCY_KEY_LEASE = int(os.environ.get("IDEMPOTENCY_KEY_LEASE", 60))
+
+# Per-endpoint metrics benchmark_endpoints compares against; {vendor} is
+# the database vendor, as query counts differ between backends
+BENCHMARK_BASELINE = os.environ.get(
+    "BENCHMARK_BASELINE",
+    str(BASE_DIR / "benchmarks" / "baseline.{vendor}.json"),
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -137,6 +222,33 @@ STATIC_URL = "static/"
 
 MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_URL = "/media/"
+# Hand media files to the front proxy: "x-accel-redirect" (nginx) or
+# "x-sendfile" (Apache, lighttpd); empty serves them from Django
+MEDIA_SENDFILE = os.environ.get("MEDIA_SENDFILE", "")
+# Internal nginx location aliased to MEDIA_ROOT
+MEDIA_ACCEL_PREFIX = os.environ.get("MEDIA_ACCEL_PREFIX", "/protected-media/")
+# Browser and proxy cache lifetime of uploads, whose names carry a uuid
+MEDIA_CACHE_MAX_AGE = int(
+    os.environ.get("MEDIA_CACHE_MAX_AGE", 365 * 24 * 60 * 60)
+)
+
+# Fixed-size (width, height) variants rendered from uploaded images
+IMAGE_RENDITIONS = {"thumbnail": (160, 160), "medium": (640, 480)}
+IMAGE_RENDITION_FORMATS = ("webp", "jpeg")
+IMAGE_RENDITION_QUALITY = int(os.environ.get("IMAGE_RENDITION_QUALITY", 80))
+# Background threads rendering them; 0 renders during the upload request
+IMAGE_RENDITION_WORKERS = int(os.environ.get("IMAGE_RENDITION_WORKERS", 2))
+
+# Limits checked while an image upload streams in, before any decoding
+IMAGE_UPLOAD_MAX_BYTES = int(
+    os.environ.get("IMAGE_UPLOAD_MAX_BYTES", 10 * 1024 * 1024)
+)
+IMAGE_UPLOAD_MAX_DIMENSION = int(
+    os.environ.get("IMAGE_UPLOAD_MAX_DIMENSION", 10000)
+)
+IMAGE_UPLOAD_MAX_PIXELS = int(
+    os.environ.get("IMAGE_UPLOAD_MAX_PIXELS", 40_000_000)
+)
 
 
 # Default primary key field type
@@ -147,14 +259,24 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "airport_api_service.throttling.AnonThrottle",
+        "airport_api_service.throttling.UserThrottle",
+        "airport_api_service.throttling.ScopedThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "40/min", "user": "60/min"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": "40/min",
+        "user": "60/min",
+        # Views with a throttle_scope, on top of the anon/user limits
+        "search": "30/min",
+        "booking": "20/min",
+        "auth": "10/min",
+    },
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
+    ),
+    "DEFAULT_PAGINATION_CLASS": (
+        "rest_framework.pagination.LimitOffsetPagination"
     ),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 6
 }
 
@@ -0,0 +1,39 @@
+"""
+Production settings for airport_api_service project.
+
+Used by entrypoint.sh together with gunicorn.conf.py. Everything not set
+here comes from settings.py and the same environment variables.
+"""
+import os
+
+from airport_api_service.settings import *  # noqa: F401,F403
+from airport_api_service.settings import (
+    BASE_DIR,
+    DATABASES,
+    INSTALLED_APPS,
+    MIDDLEWARE,
+)
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.environ.get("ALLOWED_HOSTS", "localhost").split(",")
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != "debug_toolbar"]
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if not middleware.startswith("debug_toolbar.")
+]
+
+STATIC_ROOT = BASE_DIR / "static"
+
+
+# Database
+# Keep connections open between requests unless psycopg's pool is used
+
+if "pool" not in DATABASES["default"].get("OPTIONS", {}):
+    DATABASES["default"]["CONN_MAX_AGE"] = int(
+        os.environ.get("DB_CONN_MAX_AGE", 60)
+    )
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = (
+        os.environ.get("DB_CONN_HEALTH_CHECKS", "true").lower() == "true"
+    )
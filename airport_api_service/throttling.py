@@ -0,0 +1,109 @@
+"""
+Sliding window counter throttles.
+
+DRF's throttles keep the timestamp of every request in the window, so
+their cache entries and the work per request grow with the rate. These
+keep two counters per client and scope instead, one for the current
+fixed window and one for the previous, and weight the previous by how
+much of it still overlaps the sliding window. Counters are changed with
+cache.incr(), which is atomic on Redis, so limits hold across workers as
+long as the default cache is shared.
+
+RateLimitHeadersMiddleware reports the tightest limit a request was
+checked against in RateLimit-Limit, RateLimit-Remaining and
+RateLimit-Reset (seconds until the current window ends).
+"""
+import math
+
+from rest_framework import throttling
+
+
+class SlidingWindowThrottle(throttling.SimpleRateThrottle):
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        window = int(now // self.duration)
+        self.elapsed = now - window * self.duration
+        current_key = f"{self.key}:{window}"
+        self.count = self.increment(current_key)
+        self.previous = self.cache.get(f"{self.key}:{window - 1}", 0)
+        allowed = self.estimate(self.count) <= self.num_requests
+        if not allowed:
+            # Refused requests don't use up the allowance
+            self.count -= 1
+            try:
+                self.cache.decr(current_key)
+            except ValueError:
+                pass
+        record_rate_limit(
+            request,
+            self.num_requests,
+            max(self.num_requests - math.ceil(self.estimate(self.count)), 0),
+            math.ceil(self.duration - self.elapsed),
+        )
+        return allowed
+
+    def increment(self, key):
+        """Add one to a window counter and return the new count"""
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # The previous window stays readable for a whole window
+            if self.cache.add(key, 1, self.duration * 2):
+                return 1
+            return self.cache.incr(key)
+
+    def estimate(self, count):
+        """Requests in the sliding window ending now"""
+        overlap = 1 - self.elapsed / self.duration
+        return self.previous * overlap + count
+
+    def wait(self):
+        """Seconds until the estimate leaves room for one more request"""
+        if self.count + 1 <= self.num_requests and self.previous:
+            overlap = (self.num_requests - self.count - 1) / self.previous
+            return max(self.duration * (1 - overlap) - self.elapsed, 0)
+        # This window alone is full: wait for it to become the previous
+        # one and to slide far enough out
+        overlap = (self.num_requests - 1) / max(self.count, 1)
+        return self.duration - self.elapsed + self.duration * (1 - overlap)
+
+
+class AnonThrottle(throttling.AnonRateThrottle, SlidingWindowThrottle):
+    pass
+
+
+class UserThrottle(throttling.UserRateThrottle, SlidingWindowThrottle):
+    pass
+
+
+class ScopedThrottle(throttling.ScopedRateThrottle, SlidingWindowThrottle):
+    """Limits views by their throttle_scope, e.g. search or booking"""
+
+
+def record_rate_limit(request, limit, remaining, reset):
+    # Kept on the Django request, which the middleware sees
+    request = getattr(request, "_request", request)
+    current = getattr(request, "rate_limit", None)
+    if current is None or remaining < current[1]:
+        request.rate_limit = (limit, remaining, reset)
+
+
+class RateLimitHeadersMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        rate_limit = getattr(request, "rate_limit", None)
+        if rate_limit is not None:
+            limit, remaining, reset = rate_limit
+            response["RateLimit-Limit"] = limit
+            response["RateLimit-Remaining"] = remaining
+            response["RateLimit-Reset"] = reset
+        return response
@@ -0,0 +1,12 @@
+#!/bin/sh
+# Production entrypoint: apply migrations, collect static files and
+# start gunicorn with the settings from gunicorn.conf.py
+set -e
+
+export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:-airport_api_service.settings_production}"
+
+python manage.py wait_for_db
+python manage.py migrate --noinput
+python manage.py collectstatic --noinput
+
+exec gunicorn --config gunicorn.conf.py
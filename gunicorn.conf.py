@@ -0,0 +1,36 @@
+"""
+Gunicorn configuration, tuned through environment variables.
+
+SERVER_INTERFACE   wsgi (default): threaded sync workers
+                   asgi: uvicorn workers, needed for the async endpoints
+WEB_CONCURRENCY    worker processes (default: 2 * CPU cores + 1)
+GUNICORN_THREADS   threads per wsgi worker (default: 4)
+GUNICORN_BIND      address to listen on (default: 0.0.0.0:8000)
+GUNICORN_TIMEOUT   seconds before a silent worker is restarted (default: 30)
+GUNICORN_KEEPALIVE seconds to wait for requests on keep-alive connections
+                   (default: 5)
+GUNICORN_MAX_REQUESTS
+                   restart a worker after this many requests, 0 to never
+                   (default: 1000)
+"""
+import multiprocessing
+import os
+
+if os.environ.get("SERVER_INTERFACE", "wsgi") == "asgi":
+    wsgi_app = "airport_api_service.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "airport_api_service.wsgi:application"
+    worker_class = "gthread"
+    threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(
+    os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1)
+)
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = timeout
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = max_requests // 10
+accesslog = "-"
@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+KEY_PREFIX = "user-principal"
+PRINCIPAL_FIELDS = ("id", "email", "is_staff", "is_active")
+
+
+def _principal_key(user_id):
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+def invalidate_principal(user_id):
+    """Drop a cached principal now and again after commit
+
+    The second delete keeps a request that cached the row between the
+    change and its commit from serving the old principal.
+    """
+    key = _principal_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def get_principal(user_id):
+    """Return {field: value} of a user's PRINCIPAL_FIELDS
+
+    Cached for USER_PRINCIPAL_CACHE_TIMEOUT seconds. Returns None when
+    there is no such user.
+    """
+    key = _principal_key(user_id)
+    principal = cache.get(key)
+    if principal is None:
+        principal = (
+            get_user_model()
+            .objects.filter(pk=user_id)
+            .values(*PRINCIPAL_FIELDS)
+            .first()
+        )
+        if principal is None:
+            return None
+        cache.set(key, principal, settings.USER_PRINCIPAL_CACHE_TIMEOUT)
+    return principal
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT authentication without a user query on every request
+
+    The user is built from the cached principal with all other fields
+    deferred, so reading them loads the row and saving it only writes
+    the fields that were loaded or set. The principal is dropped
+    whenever the user is saved or deleted (see user.signals).
+    """
+
+    def get_user(self, validated_token):
+        if (
+            api_settings.CHECK_REVOKE_TOKEN
+            or api_settings.USER_ID_FIELD != "id"
+        ):
+            # Needs the password hash or another lookup field
+            return super(CachedJWTAuthentication, self).get_user(
+                validated_token
+            )
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+        principal = get_principal(user_id)
+        if principal is None:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            )
+        # from_db() takes the loaded values in model field order
+        field_names = [
+            field.attname for field in self.user_model._meta.concrete_fields
+            if field.attname in principal
+        ]
+        user = self.user_model.from_db(
+            router.db_for_read(self.user_model),
+            field_names,
+            [principal[name] for name in field_names],
+        )
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        return user
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Document CachedJWTAuthentication as the same bearer JWT scheme"""
+
+    target_class = CachedJWTAuthentication
@@ -0,0 +1,12 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from user.authentication import invalidate_principal
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_user_principal(sender, instance, **kwargs):
+    """Drop the cached principal, e.g. after deactivation or a new password"""
+    invalidate_principal(instance.pk)
@@ -1,3 +1,104 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+ME_URL = reverse("user:manage")
+ORDER_URL = reverse("airport:orders-list")
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test",
+            password="testpassword",
+            first_name="Taras",
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def user_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        table = get_user_model()._meta.db_table
+        return [
+            query["sql"] for query in context.captured_queries
+            if f'FROM "{table}"' in query["sql"]
+        ]
+
+    def test_authenticated_reads_need_no_user_query(self):
+        self.assertEqual(len(self.user_queries(ORDER_URL)), 1)
+
+        self.assertEqual(self.user_queries(ORDER_URL), [])
+        self.assertEqual(self.user_queries(ME_URL), [])
+
+    def test_user_save_refreshes_principal(self):
+        self.client.get(ME_URL)
+        self.user.is_staff = True
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertTrue(res.data["is_staff"])
+
+    def test_deferred_fields_load_on_access(self):
+        self.client.get(ME_URL)
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.wsgi_request.user.first_name, "Taras")
+
+    def test_update_keeps_fields_outside_principal(self):
+        self.client.get(ME_URL)
+
+        res = self.client.patch(ME_URL, {"email": "new@test.test"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, "new@test.test")
+        self.assertEqual(self.user.first_name, "Taras")
+        self.assertTrue(self.user.check_password("testpassword"))
+        self.assertEqual(self.client.get(ME_URL).data["email"],
+                         "new@test.test")
+
+    def test_password_change(self):
+        self.client.get(ME_URL)
+
+        res = self.client.patch(ME_URL, {"password": "newpassword"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("newpassword"))
+        self.assertEqual(self.user.email, "test@test.test")
+
+    def test_deactivation_rejects_token(self):
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+
+        self.assertEqual(
+            self.client.get(ME_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+    def test_account_cannot_be_deleted_through_api(self):
+        res = self.client.delete(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_deleted_user_rejected(self):
+        self.client.get(ME_URL)
+        self.user.delete()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)